@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
 application = get_asgi_application()
+
+# build the in-memory catalogs before the first request comes in
+from platform_api.catalog_cache import warm_catalogs  # noqa: E402
+
+warm_catalogs()
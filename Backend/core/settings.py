@@ -108,6 +108,82 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# In-process by default. Set REDIS_URL when running several worker processes so
+# cache invalidations (e.g. catalog version bumps) reach all of them.
+#
+# Trade-off for the authenticated user cache (platform_api/auth.py): with the
+# in-process cache a user saved on one worker (deactivated, new password) is
+# still cached by the others, so users are only kept AUTH_USER_LOCAL_CACHE_TTL
+# seconds there (0 turns the cache off) - one joined query per request after
+# that. With REDIS_URL the invalidation is shared and AUTH_USER_CACHE_TTL applies.
+# Sessions are only cached with REDIS_URL for the same reason: a logout on one
+# worker would leave the session cached, and valid, on the others. The same
+# goes for the access-token deny-list (platform_api/tokens.py), which every
+# worker reloads at most AUTH_USER_LOCAL_CACHE_TTL seconds after a revocation.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Per-process cache of rendered freelancer profiles (platform_api/profile_cache.py)
+FREELANCER_PROFILE_CACHE = {
+    "TTL": int(os.environ.get("FREELANCER_PROFILE_CACHE_TTL", 300)),
+    "MAX_ENTRIES": int(os.environ.get("FREELANCER_PROFILE_CACHE_MAX_ENTRIES", 5000)),
+}
+
+# Per-process freelancer feature matrix behind /requests/<id>/matches/ (platform_api/matching.py):
+# freelancers saved since the last check are patched in every DELTA_INTERVAL seconds,
+# everything (price history included) is reloaded every FULL_REFRESH seconds.
+MATCHING_ENGINE = {
+    "FULL_REFRESH": int(os.environ.get("MATCHING_FULL_REFRESH", 600)),
+    "DELTA_INTERVAL": int(os.environ.get("MATCHING_DELTA_INTERVAL", 5)),
+}
+
+# Notification broadcasts (platform_api/broadcasts.py): recipients inserted per bulk_create
+NOTIFICATION_BROADCASTS = {
+    "BATCH_SIZE": int(os.environ.get("BROADCAST_BATCH_SIZE", 5000)),
+}
+
+# Live events (platform_api/events.py): SSE stream and long-poll, in-process pub/sub.
+# Streams only see events published by the same process: run one ASGI worker per host.
+EVENTS = {
+    "HEARTBEAT": int(os.environ.get("EVENTS_HEARTBEAT", 15)),  # seconds between keep-alive comments
+    "RETRY_MS": 3000,  # client reconnect delay sent in the stream
+    "REPLAY_BUFFER": int(os.environ.get("EVENTS_REPLAY_BUFFER", 10000)),  # recent events kept for resume
+    "QUEUE_SIZE": 256,  # per-stream backlog before the oldest events are dropped
+    "LONG_POLL_TIMEOUT": 25,
+    "SOURCE_INTERVAL": 2,  # seconds between polls for events written by job workers
+}
+
+# Background jobs (platform_api/jobs.py): a table-backed queue run by `manage.py run_jobs`
+JOBS = {
+    "WORKERS": int(os.environ.get("JOB_WORKERS", 2)),  # worker processes
+    "POLL_INTERVAL": 1.0,  # seconds an idle worker waits before looking again
+    "LEASE": 300,  # seconds a claimed job may run before it is presumed dead and re-queued
+    "BACKOFF_BASE": 5,  # first retry delay in seconds, doubled on every further failure
+    "BACKOFF_MAX": 3600,
+    "MAX_ATTEMPTS": 5,
+}
+
+# Profile photo / company logo thumbnails (platform_api/images.py), rendered by the job workers
+IMAGES = {
+    "SIZES": (64, 256, 1024),  # square edge in pixels (logos: longest edge)
+    "QUALITY": 80,  # WebP quality
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -193,18 +269,45 @@ SESSION_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 SESSION_COOKIE_HTTPONLY = True
 
+# With a shared cache, sessions are read from the cache first (database fallback);
+# unchanged sessions are written to the database at most once per
+# SESSION_DB_WRITE_INTERVAL seconds. Without one they stay in the database (see CACHES).
+SESSION_ENGINE = "platform_api.session_store" if os.environ.get("REDIS_URL") else "django.contrib.sessions.backends.db"
+SESSION_DB_WRITE_INTERVAL = 60
+
+# The per-request user (with its role profile) is cached for AUTH_USER_CACHE_TTL seconds
+# with a shared cache, AUTH_USER_LOCAL_CACHE_TTL with the in-process one (see CACHES)
+AUTHENTICATION_BACKENDS = ["platform_api.auth.CachedModelBackend"]
+AUTH_USER_CACHE_TTL = 300
+AUTH_USER_LOCAL_CACHE_TTL = int(os.environ.get("AUTH_USER_LOCAL_CACHE_TTL", 5))
+
+# Signed access/refresh tokens for API clients (platform_api/tokens.py), in seconds
+SIGNED_TOKENS = {
+    "ACCESS_LIFETIME": int(os.environ.get("ACCESS_TOKEN_LIFETIME", 15 * 60)),
+    "REFRESH_LIFETIME": int(os.environ.get("REFRESH_TOKEN_LIFETIME", 7 * 24 * 3600)),
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.BasicAuthentication",
+        # signed bearer tokens from /auth/login/; replaces BasicAuthentication,
+        # which re-ran the password hasher on every request
+        "platform_api.authentication.SignedTokenAuthentication",
     ],
+    # orjson-backed when installed; the browsable API is only rendered in DEBUG
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
+        "platform_api.renderers.FastJSONRenderer",
+    ] + (["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
+    "DEFAULT_PARSER_CLASSES": [
+        "platform_api.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
+    "DEFAULT_PAGINATION_CLASS": "platform_api.pagination.KeysetCursorPagination",
+    "PAGE_SIZE": 20,
 }
 
 # Default primary key field type
@@ -19,6 +19,8 @@ from django.urls import path , include
 from django.conf.urls.static  import static
 from django.conf import settings
 
+# Let unmatched admin/... paths fall through to the platform_api admin endpoints
+admin.site.final_catch_all_view = False
 
 urlpatterns = [
 
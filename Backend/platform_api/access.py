@@ -0,0 +1,68 @@
+from collections import namedtuple
+
+from .models import Negotiation, NegotiationPhase, Project, ProjectPhase
+
+
+class Access(namedtuple('Access', ['object', 'client_user_id', 'freelancer_user_id'])):
+    """An object of a negotiation together with the user ids of its client and freelancer
+
+    Client and Freelancer use their user as primary key, so the negotiation's
+    ``client_id``/``freelancer_id`` columns already are the user ids.
+    """
+    __slots__ = ()
+
+    def is_client(self, user):
+        return user.id is not None and user.id == self.client_user_id
+
+    def is_freelancer(self, user):
+        return user.id is not None and user.id == self.freelancer_user_id
+
+    def allows(self, user, role=None):
+        """Staff, or a participant of the negotiation; ``role`` ('client'/'freelancer') narrows it to one side"""
+        if user.is_staff:
+            return True
+        if role == 'client':
+            return self.is_client(user)
+        if role == 'freelancer':
+            return self.is_freelancer(user)
+        return self.is_client(user) or self.is_freelancer(user)
+
+
+def _resolve(request, model, negotiation_path, **filters):
+    """Load one ``model`` row and its negotiation's participants with a single ``values()`` query
+
+    The instance is rebuilt from the row (no further query), and the result is
+    memoized on the request so repeated checks within it are free.
+    """
+    memo = request.__dict__.setdefault('_access_memo', {})
+    key = (model, tuple(sorted(filters.items())))
+    if key in memo:
+        return memo[key]
+
+    field_names = [field.attname for field in model._meta.concrete_fields]
+    participants = [f'{negotiation_path}client_id', f'{negotiation_path}freelancer_id']
+    queryset = model.objects.filter(**filters)
+    row = queryset.values(*field_names, *[name for name in participants if name not in field_names]).first()
+    access = None
+    if row is not None:
+        instance = model.from_db(queryset.db, field_names, [row[name] for name in field_names])
+        access = Access(instance, row[participants[0]], row[participants[1]])
+    memo[key] = access
+    return access
+
+
+def negotiation_access(request, id):
+    return _resolve(request, Negotiation, '', id=id)
+
+
+def negotiation_phase_access(request, phase_id):
+    return _resolve(request, NegotiationPhase, 'negotiation__', id=phase_id)
+
+
+def project_access(request, id):
+    return _resolve(request, Project, 'negotiation__', id=id)
+
+
+def project_phase_access(request, phase_id, project_id=None):
+    filters = {'id': phase_id} if project_id is None else {'id': phase_id, 'project_id': project_id}
+    return _resolve(request, ProjectPhase, 'project__negotiation__', **filters)
@@ -3,7 +3,7 @@ from django.contrib import admin
 from .models import (
     User, Admin, Client, Freelancer, 
     Skill, Category, Review, FAQ ,MediaFile , Report ,Notification , Help , JobInternshipOffer , Request
-    , Negotiation , NegotiationFloatingComment , NegotiationPhase  , Project  , ProjectPhase , Deliverable  , Company )
+    , Negotiation , NegotiationFloatingComment , NegotiationPhase  , Project  , ProjectPhase , Deliverable  , Company , Job )
 
 admin.site.register(User)
 admin.site .register(Admin)
@@ -26,5 +26,4 @@ admin.site.register(NegotiationPhase)
 admin.site.register(Project)
 admin.site.register(ProjectPhase)
 admin.site.register(Deliverable)
-
-
+admin.site.register(Job)
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache, caches
+from django.core.exceptions import ObjectDoesNotExist
+
+# reverse one-to-one accessors of the role profiles
+PROFILE_RELATIONS = ('admin_profile', 'client_profile', 'freelancer_profile', 'company_profile')
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+# backends that keep entries inside one process; invalidations never reach the other workers
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def user_cache_ttl():
+    """Seconds a loaded user is cached: AUTH_USER_CACHE_TTL with a shared cache, else AUTH_USER_LOCAL_CACHE_TTL
+
+    ``invalidate_user`` only clears the cache it runs against, so with an
+    in-process cache a deactivated user or a changed password is only seen by
+    the other workers once their copy expires.
+    """
+    if caches.settings['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        return getattr(settings, 'AUTH_USER_LOCAL_CACHE_TTL', 5)
+    return getattr(settings, 'AUTH_USER_CACHE_TTL', 300)
+
+
+def load_user(user_id):
+    """User ``user_id`` with its role profile, from the cache or one joined query"""
+    ttl = user_cache_ttl()
+    key = _user_key(user_id)
+    user = cache.get(key) if ttl else None
+    if user is None:
+        user = get_user_model()._default_manager.select_related(*PROFILE_RELATIONS).filter(pk=user_id).first()
+        if user is not None and ttl:
+            cache.set(key, user, ttl)
+    return user
+
+
+def invalidate_user(user_id):
+    cache.delete(_user_key(user_id))
+
+
+def get_profile(user, relation):
+    """The user's profile behind ``relation`` (e.g. 'client_profile'), or None
+
+    Users loaded by ``CachedModelBackend`` carry their profile already, so this
+    costs no query for the authenticated user.
+    """
+    try:
+        return getattr(user, relation)
+    except ObjectDoesNotExist:
+        return None
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose per-request user lookup is served by ``load_user``
+
+    The cached user is dropped whenever the user or one of its profiles is
+    saved or deleted (see signals.py), so password changes and deactivation
+    take effect on the next request. That only holds for every worker when the
+    cache is shared (REDIS_URL); otherwise users are cached for a few seconds
+    at most (see ``user_cache_ttl``).
+    """
+
+    def get_user(self, user_id):
+        user = load_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,47 @@
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from . import tokens
+from .auth import load_user
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """``Authorization: Bearer <access token>`` issued by the login endpoint
+
+    The signature, expiry and deny-list are checked without the database (see
+    tokens.is_revoked); the user comes from the same cache as session users
+    (see auth.load_user). ``request.auth`` is the token payload.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header')
+        try:
+            payload = tokens.decode(auth[1].decode(), tokens.ACCESS)
+        except (tokens.TokenError, UnicodeError) as exc:
+            raise exceptions.AuthenticationFailed(str(exc))
+        user = load_user(payload['u'])
+        if not tokens.check_user(payload, user):
+            raise exceptions.AuthenticationFailed('Invalid token')
+        return user, payload
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+async def aauthenticate(request):
+    """User of a plain (non-DRF) async view: a Bearer token, else the session; None if anonymous
+
+    Raises:
+        AuthenticationFailed: for a malformed, forged, expired or revoked token
+    """
+    result = await sync_to_async(SignedTokenAuthentication().authenticate)(request)
+    if result is not None:
+        return result[0]
+    user = await request.auser()
+    return user if user.is_authenticated else None
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import events, jobs, notifications
+from .events import hub
+from .freelancer_index import resolve_terms
+from .models import Broadcast, FreelancerSkill, Notification, Project, Skill, User
+
+logger = logging.getLogger(__name__)
+
+AUDIENCE_KEYS = ('role', 'wilaya', 'skill', 'project')
+
+
+class AudienceError(ValueError):
+    pass
+
+
+class BroadcastBusy(RuntimeError):
+    pass
+
+
+def get_batch_size():
+    return getattr(settings, 'NOTIFICATION_BROADCASTS', {}).get('BATCH_SIZE', 5000)
+
+
+def audience_queryset(audience):
+    """Active users matching every filter of ``audience``
+
+    Args:
+        audience: Dict with any of ``role`` (User.role), ``wilaya`` (client or
+            freelancer profile, case-insensitive), ``skill`` (Skill id or name)
+            and ``project`` (project id: its client and freelancer)
+
+    Raises:
+        AudienceError: on unknown keys or values that match nothing
+    """
+    unknown = set(audience) - set(AUDIENCE_KEYS)
+    if unknown:
+        raise AudienceError(f'Unknown audience filter: {", ".join(sorted(unknown))}')
+    users = User.objects.filter(is_active=True)
+    if audience.get('role'):
+        if audience['role'] not in dict(User.ROLE_CHOICES):
+            raise AudienceError(f'Unknown role: {audience["role"]}')
+        users = users.filter(role=audience['role'])
+    if audience.get('wilaya'):
+        users = users.filter(Q(client_profile__wilaya__iexact=audience['wilaya']) |
+                             Q(freelancer_profile__wilaya__iexact=audience['wilaya']))
+    if audience.get('skill'):
+        skill_ids = resolve_terms(Skill, [audience['skill']])
+        if not skill_ids:
+            raise AudienceError(f'Unknown skill: {audience["skill"]}')
+        users = users.filter(id__in=FreelancerSkill.objects.filter(skill_id__in=skill_ids).values('freelancer_id'))
+    if audience.get('project'):
+        participants = (Project.objects.filter(id=audience['project'])
+                        .values_list('negotiation__client_id', 'negotiation__freelancer_id').first())
+        if participants is None:
+            raise AudienceError(f'Unknown project: {audience["project"]}')
+        users = users.filter(id__in=participants)
+    return users
+
+
+def create(content, audience, created_by, broadcast_id=None):
+    """Create a broadcast and queue its fan-out; returns ``(broadcast, created)``
+
+    A ``broadcast_id`` that already exists returns that broadcast untouched,
+    so clients can retry a submission safely.
+
+    Raises:
+        AudienceError: if ``audience`` is invalid
+    """
+    if broadcast_id is not None:
+        existing = Broadcast.objects.filter(id=broadcast_id).first()
+        if existing is not None:
+            return existing, False
+    fields = {'content': content, 'audience': audience, 'total': audience_queryset(audience).count(),
+              'created_by': created_by}
+    with transaction.atomic():
+        if broadcast_id is None:
+            broadcast, created = Broadcast.objects.create(**fields), True
+        else:
+            # a concurrent retry of the same submission gets the row the first one created
+            broadcast, created = Broadcast.objects.get_or_create(id=broadcast_id, defaults=fields)
+        if created:
+            submit(broadcast.id)
+    return broadcast, created
+
+
+def submit(broadcast_id):
+    """Queue the fan-out of ``broadcast_id`` for the job workers (in the caller's transaction)"""
+    return jobs.enqueue(run, {'broadcast_id': str(broadcast_id)})
+
+
+def _new_notifications(after_id, user_ids, limit=1000):
+    return list(Notification.objects.filter(id__gt=after_id, broadcast__isnull=False, receiver_id__in=user_ids)
+                .order_by('id').values('id', 'receiver_id', 'content', 'seen', 'created_at', 'broadcast_id')[:limit])
+
+
+def _last_notification_id():
+    return Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+async def relay(hub):
+    """Event source: publish broadcast notifications to the open streams of this process
+
+    The fan-out runs on a job worker, whose hub has no subscribers, and
+    bulk_create sends no signals; so while streams are open the server
+    process polls for new broadcast notifications of their users.
+    """
+    last_id = await sync_to_async(_last_notification_id)()
+    while hub.connected_users():
+        await asyncio.sleep(events.get_config('SOURCE_INTERVAL'))
+        try:
+            rows = await sync_to_async(_new_notifications)(last_id, hub.connected_users())
+        except DatabaseError:
+            logger.warning("Broadcast relay poll failed", exc_info=True)
+            continue
+        for row in rows:
+            last_id = row['id']
+            receiver_id = row.pop('receiver_id')
+            row['broadcast'] = row.pop('broadcast_id')
+            hub.publish([receiver_id], 'notification', row)
+
+
+hub.add_source(relay)
+
+
+@jobs.task(priority=50, max_attempts=10)
+def run(broadcast_id):
+    """Insert the notifications of a pending/failed broadcast, resuming from its checkpoint
+
+    Recipients are walked in user id order, ``get_batch_size()`` at a time; each
+    batch is one ``bulk_create``, one counter update and one progress update
+    in a single transaction, so the checkpoint never runs ahead of the inserted rows. The
+    (broadcast, receiver) unique constraint makes a replayed batch harmless,
+    and only newly reached users have their unread counter bumped.
+    Runs as a job, which owns the broadcast (``Broadcast.job_id``): a failed
+    run is retried by the queue, and a retry of the owning job also takes
+    back a broadcast left 'running' by an attempt whose worker died, resuming
+    from the checkpoint. Returns False when there is nothing left to do.
+
+    Raises:
+        BroadcastBusy: if another job or process is running the broadcast
+    """
+    job = jobs.current_job()
+    claimable = Q(status__in=('pending', 'failed'))
+    if job is not None:
+        # only one attempt of a job runs at a time: a 'running' broadcast owned by
+        # this job was left by an earlier attempt that died
+        claimable |= Q(status='running', job_id=job.id)
+    claimed = Broadcast.objects.filter(claimable, id=broadcast_id).update(
+        status='running', error='', job_id=job.id if job is not None else None)
+    if not claimed:
+        current = Broadcast.objects.filter(id=broadcast_id).values_list('status', flat=True).first()
+        if current == 'running':
+            # not a success: the queue retries later, when the holder may be gone
+            raise BroadcastBusy(f'Broadcast {broadcast_id} is being run by another worker')
+        return False
+    broadcast = Broadcast.objects.get(id=broadcast_id)
+    try:
+        recipients = audience_queryset(broadcast.audience).order_by('id').values_list('id', flat=True)
+        batch_size = get_batch_size()
+        last_user_id = broadcast.last_user_id
+        while True:
+            user_ids = list(recipients.filter(id__gt=last_user_id)[:batch_size])
+            if not user_ids:
+                break
+            with transaction.atomic():
+                # users a replayed batch already reached keep their notification and their count
+                reached = set(Notification.objects.filter(broadcast_id=broadcast.id, receiver_id__in=user_ids)
+                              .values_list('receiver_id', flat=True))
+                fresh = [user_id for user_id in user_ids if user_id not in reached]
+                Notification.objects.bulk_create(
+                    [Notification(receiver_id=user_id, content=broadcast.content, broadcast_id=broadcast.id)
+                     for user_id in fresh],
+                    ignore_conflicts=True,
+                )
+                notifications.bump(fresh, 1)
+                last_user_id = user_ids[-1]
+                Broadcast.objects.filter(id=broadcast.id).update(
+                    processed=F('processed') + len(user_ids), last_user_id=last_user_id)
+    except Exception as exc:
+        Broadcast.objects.filter(id=broadcast.id).update(status='failed', error=str(exc)[:1000])
+        raise
+    # the audience may have moved since ``total`` was estimated at creation
+    Broadcast.objects.filter(id=broadcast.id).update(status='done', total=F('processed'), finished_at=timezone.now())
+    return True
@@ -0,0 +1,90 @@
+import hashlib
+import logging
+import uuid
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from .conditional import ConditionalGet
+from .models import FAQ, Category, Skill
+from .renderers import FastJSONRenderer
+from .serializers import CategorySerializer, FAQSerializer, SkillSerializer, get_sparse_spec
+
+logger = logging.getLogger(__name__)
+
+CATALOGS = {
+    'skills': (Skill, SkillSerializer),
+    'categories': (Category, CategorySerializer),
+    'faq': (FAQ, FAQSerializer),
+}
+
+CatalogEntry = namedtuple('CatalogEntry', ['version', 'data', 'content', 'digest'])
+
+# rendered catalogs of this process, keyed by catalog name
+_entries = {}
+
+
+def _version_key(name):
+    return f'catalog:{name}:version'
+
+
+def get_version(name):
+    """Current version token of catalog ``name``
+
+    The token lives in the default cache, so with a shared backend every
+    process sees a bump. A token lost to eviction is replaced by a new one,
+    which only costs a rebuild.
+    """
+    return cache.get_or_set(_version_key(name), uuid.uuid4().hex, timeout=None)
+
+
+def bump_version(name):
+    """Invalidate catalog ``name`` everywhere once the current transaction commits"""
+    transaction.on_commit(lambda: cache.set(_version_key(name), uuid.uuid4().hex, timeout=None))
+
+
+def get_catalog(name):
+    """Rendered catalog ``name``, rebuilt only when its version has moved"""
+    version = get_version(name)
+    entry = _entries.get(name)
+    if entry is None or entry.version != version:
+        # the version is read before the rows, so a write racing the rebuild
+        # leaves a stale version behind and triggers another rebuild
+        model, serializer_class = CATALOGS[name]
+        data = serializer_class(model.objects.all(), many=True).data
+        content = FastJSONRenderer().render(data)
+        entry = CatalogEntry(version, data, content, hashlib.md5(content, usedforsecurity=False).hexdigest())
+        _entries[name] = entry
+    return entry
+
+
+def warm_catalogs():
+    """Build every catalog up front so the first requests are served from memory"""
+    for name in CATALOGS:
+        try:
+            get_catalog(name)
+        except DatabaseError:  # e.g. tables not migrated yet; built on first use instead
+            logger.warning("Could not warm the %s catalog", name, exc_info=True)
+
+
+def catalog_response(request, name):
+    """Serve catalog ``name`` from memory: no query for the full JSON body or a 304
+
+    ``?fields=``/``?expand=`` variants and non-JSON renderers (the browsable
+    API) are serialized as usual, but still revalidate against the cached entry.
+    """
+    entry = get_catalog(name)
+    conditional = ConditionalGet(request, entry.digest)
+    not_modified = conditional.not_modified()
+    if not_modified:
+        return not_modified
+    if get_sparse_spec(request=request) is not None:
+        model, serializer_class = CATALOGS[name]
+        data = serializer_class(model.objects.all(), many=True, context={'request': request}).data
+        return conditional.finalize(Response(data))
+    if request.accepted_media_type != FastJSONRenderer.media_type:
+        return conditional.finalize(Response(entry.data))
+    return conditional.finalize(HttpResponse(entry.content, content_type=FastJSONRenderer.media_type))
@@ -0,0 +1,44 @@
+import hashlib
+from datetime import datetime
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+class ConditionalGet:
+    """Conditional GET answered from cheap validators instead of the rendered body
+
+    ``parts`` are values that change whenever the representation does:
+    ``updated_at`` stamps, ``max(updated_at)`` and row counts of child tables
+    (counts catch deletions, which never move a max). They are hashed together
+    with the full path (``?fields=``, ``?expand=``...) and the negotiated media
+    type into a weak ETag, so a revalidation costs the query that produced the
+    parts and nothing is serialized.
+
+    ``last_modified`` should only be given when one timestamp covers every
+    change, i.e. single rows; collections rely on the ETag alone.
+    """
+
+    def __init__(self, request, *parts, last_modified=None):
+        self.request = request
+        raw = repr((parts, request.get_full_path(), getattr(request, 'accepted_media_type', None)))
+        self.etag = 'W/"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+        self.last_modified = int(last_modified.timestamp()) if isinstance(last_modified, datetime) else None
+
+    def not_modified(self):
+        """304 (or 412) response when the client's cached copy is current, else None"""
+        response = get_conditional_response(self.request, etag=self.etag, last_modified=self.last_modified)
+        return self.finalize(response) if response is not None else None
+
+    def finalize(self, response):
+        """Attach the validators to ``response``; clients must revalidate before reuse"""
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def newest(*stamps):
+    """Most recent of ``stamps``, ignoring missing ones"""
+    return max((stamp for stamp in stamps if stamp is not None), default=None)
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+Event = namedtuple('Event', ['id', 'type', 'data'])
+
+_id_lock = threading.Lock()
+_last_id = 0
+
+
+def _next_id():
+    # microsecond clock, forced strictly increasing: ids from different
+    # processes stay roughly comparable, so a ``since`` cursor survives a
+    # reconnect to another worker
+    global _last_id
+    with _id_lock:
+        _last_id = max(_last_id + 1, time.time_ns() // 1000)
+        return _last_id
+
+
+def get_config(name):
+    defaults = {'HEARTBEAT': 15, 'RETRY_MS': 3000, 'REPLAY_BUFFER': 10000, 'QUEUE_SIZE': 256, 'LONG_POLL_TIMEOUT': 25,
+                'SOURCE_INTERVAL': 2}
+    return getattr(settings, 'EVENTS', {}).get(name, defaults[name])
+
+
+class Subscription:
+    """One connected client: a bounded asyncio queue fed from any thread"""
+
+    def __init__(self, user_id, loop, size):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+        self.dropped = 0
+
+    def push(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:  # loop already closed: the client is gone
+            pass
+
+    def _put(self, event):
+        if self.queue.full():
+            # a client that stopped reading loses its oldest events, not the worker's memory
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class EventHub:
+    """In-process pub/sub: events published for users reach their open streams
+
+    ``publish`` may be called from any thread (sync views, signal handlers,
+    background workers); delivery hops onto each subscriber's event loop. The
+    most recent events are kept in a ring buffer for ``Last-Event-ID`` replay
+    and the long-poll ``since`` cursor. Only streams held by this process are
+    reached: run a single ASGI worker per host, or put a broker in front of
+    ``publish`` for more. Events written by other processes (job workers)
+    are picked up by sources registered with ``add_source``.
+    """
+
+    def __init__(self, buffer_size=10000, queue_size=256):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._recent = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._sources = []
+        self._running_sources = set()
+        self.published = 0
+
+    def publish(self, user_ids, type, data):
+        event = Event(_next_id(), type, data)
+        with self._lock:
+            targets = []
+            for user_id in set(user_ids):
+                self._recent.append((user_id, event))
+                targets.extend(self._subscribers.get(user_id, ()))
+            self.published += 1
+        for subscription in targets:
+            subscription.push(event)
+        return event
+
+    def add_source(self, source):
+        """Register ``source(hub)``, a coroutine function that publishes events made outside this process
+
+        Sources run on the event loop of the streams while any stream is open,
+        and should return once ``connected_users()`` is empty.
+        """
+        self._sources.append(source)
+
+    def subscribe(self, user_id):
+        """Register a stream for ``user_id`` on the running event loop"""
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, loop, self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+            idle = [source for source in self._sources if source not in self._running_sources]
+            self._running_sources.update(idle)
+        for source in idle:
+            loop.create_task(self._run_source(source))
+        return subscription
+
+    async def _run_source(self, source):
+        try:
+            await source(self)
+        except Exception:
+            logger.exception("Event source %s failed", source.__qualname__)
+        finally:
+            with self._lock:
+                self._running_sources.discard(source)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            streams = self._subscribers.get(subscription.user_id)
+            if streams is not None:
+                streams.discard(subscription)
+                if not streams:
+                    del self._subscribers[subscription.user_id]
+
+    def since(self, user_id, cursor):
+        """Buffered events of ``user_id`` newer than ``cursor``, oldest first"""
+        with self._lock:
+            return [event for owner, event in self._recent if owner == user_id and event.id > cursor]
+
+    def head(self):
+        """Cursor of the newest event so far (a starting point for long-polling)"""
+        with self._lock:
+            return self._recent[-1][1].id if self._recent else _next_id()
+
+    def connected_users(self):
+        with self._lock:
+            return set(self._subscribers)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._subscribers),
+                'streams': sum(len(streams) for streams in self._subscribers.values()),
+                'buffered': len(self._recent),
+                'published': self.published,
+            }
+
+
+hub = EventHub(buffer_size=get_config('REPLAY_BUFFER'), queue_size=get_config('QUEUE_SIZE'))
+
+
+def encode(event):
+    """An event as an SSE frame"""
+    data = json.dumps(event.data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return f'id: {event.id}\nevent: {event.type}\ndata: {data}\n\n'
+
+
+def as_dict(event):
+    return {'id': event.id, 'type': event.type, 'data': event.data}
+
+
+async def stream(user_id, last_event_id=None):
+    """SSE frames for ``user_id``: replay after ``last_event_id``, then live events and heartbeats, until cancelled"""
+    subscription = hub.subscribe(user_id)
+    heartbeat = get_config('HEARTBEAT')
+    try:
+        yield f'retry: {get_config("RETRY_MS")}\n\n'
+        sent = last_event_id or 0
+        if last_event_id is not None:
+            for event in hub.since(user_id, last_event_id):
+                yield encode(event)
+                sent = event.id
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # keeps proxies from closing an idle connection and reveals dead clients
+                yield ': ping\n\n'
+                continue
+            if event.id > sent:  # already replayed
+                yield encode(event)
+                sent = event.id
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def wait_for_events(user_id, since, timeout):
+    """Events of ``user_id`` after cursor ``since``; waits up to ``timeout`` seconds for the first one"""
+    events = hub.since(user_id, since)
+    if events:
+        return events
+    subscription = hub.subscribe(user_id)
+    try:
+        # anything published between the check above and subscribing
+        events = hub.since(user_id, since)
+        if events:
+            return events
+        try:
+            events = [await asyncio.wait_for(subscription.queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        return [event for event in events if event.id > since]
+    finally:
+        hub.unsubscribe(subscription)
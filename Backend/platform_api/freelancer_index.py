@@ -0,0 +1,105 @@
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Category, Freelancer, FreelancerCategory, FreelancerSkill, Skill
+
+# (JSON field on Freelancer, catalog model, index model, index FK column)
+INDEXES = (
+    ('skills', Skill, FreelancerSkill, 'skill_id'),
+    ('categories', Category, FreelancerCategory, 'category_id'),
+)
+
+
+def parse_terms(value):
+    """Catalog ids and lower-cased names from a JSON list, a comma-separated string or a query param"""
+    if value is None:
+        return set(), set()
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+    ids, names = set(), set()
+    for item in value:
+        if isinstance(item, bool):
+            continue
+        if isinstance(item, int) or (isinstance(item, str) and item.strip().isdigit()):
+            ids.add(int(item))
+        elif isinstance(item, str) and item.strip():
+            names.add(item.strip().lower())
+    return ids, names
+
+
+def resolve_terms(catalog, value):
+    """Ids of the ``catalog`` rows (Skill/Category) named or numbered in ``value``, in one query"""
+    ids, names = parse_terms(value)
+    if not ids and not names:
+        return set()
+    condition = Q(id__in=ids)
+    for name in names:
+        condition |= Q(name__iexact=name)
+    return set(catalog.objects.filter(condition).values_list('id', flat=True))
+
+
+def sync_freelancer(freelancer):
+    """Bring the freelancer's index rows in line with its ``skills``/``categories`` JSON"""
+    with transaction.atomic():
+        for field, catalog, index, column in INDEXES:
+            wanted = resolve_terms(catalog, getattr(freelancer, field))
+            rows = index.objects.filter(freelancer_id=freelancer.pk)
+            current = set(rows.values_list(column, flat=True))
+            if current - wanted:
+                rows.filter(**{f'{column}__in': current - wanted}).delete()
+            index.objects.bulk_create(
+                [index(freelancer_id=freelancer.pk, **{column: term}) for term in wanted - current],
+                ignore_conflicts=True,
+            )
+
+
+def rebuild(batch_size=1000):
+    """Re-index every freelancer; returns the number of freelancers processed"""
+    total = 0
+    freelancers = Freelancer.objects.only('user', 'skills', 'categories').order_by('user')
+    for freelancer in freelancers.iterator(chunk_size=batch_size):
+        sync_freelancer(freelancer)
+        total += 1
+    return total
+
+
+def _matching(index, column, term_ids, match_all):
+    """Subquery of freelancer ids indexed under any (or all) of ``term_ids``"""
+    rows = index.objects.filter(**{f'{column}__in': term_ids})
+    if match_all:
+        rows = rows.values('freelancer_id').annotate(matched=Count(column)).filter(matched=len(term_ids))
+    return rows.values('freelancer_id')
+
+
+def search_queryset(skills=(), skills_all=False, categories=(), categories_all=False,
+                    wilaya=None, city=None, min_experience=None, min_rate=None):
+    """Freelancers matching every given filter, as semi-joins on the normalized index
+
+    Args:
+        skills: Skill ids; freelancers need any of them (all of them with ``skills_all``)
+        categories: Category ids, matched like ``skills``
+        wilaya: Exact wilaya
+        city: Exact city
+        min_experience: Minimum ``years_experience``
+        min_rate: Minimum ``rate``
+
+    Returns:
+        QuerySet[Freelancer]: The unordered, unevaluated matches
+    """
+    queryset = Freelancer.objects.all()
+    if skills:
+        queryset = queryset.filter(user__in=_matching(FreelancerSkill, 'skill_id', list(skills), skills_all))
+    if categories:
+        queryset = queryset.filter(
+            user__in=_matching(FreelancerCategory, 'category_id', list(categories), categories_all))
+    if wilaya:
+        queryset = queryset.filter(wilaya=wilaya)
+    if city:
+        queryset = queryset.filter(city=city)
+    if min_experience is not None:
+        queryset = queryset.filter(years_experience__gte=min_experience)
+    if min_rate is not None:
+        queryset = queryset.filter(rate__gte=min_rate)
+    return queryset
@@ -0,0 +1,127 @@
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import jobs
+
+logger = logging.getLogger(__name__)
+
+# model name -> (image field, fit); thumbnail names are kept in ``<field>_sizes``.
+# Photos are cropped to a centred square, logos are scaled to fit without cropping.
+IMAGE_FIELDS = {
+    'Freelancer': ('profile_picture', 'cover'),
+    'Client': ('profile_picture', 'cover'),
+    'Company': ('logo', 'contain'),
+}
+
+THUMBNAIL_DIR = 'thumbs'
+
+
+def get_config(name):
+    defaults = {'SIZES': (64, 256, 1024), 'QUALITY': 80}
+    return getattr(settings, 'IMAGES', {}).get(name, defaults[name])
+
+
+def is_image(upload):
+    """True when Pillow can decode ``upload`` (the file is rewound afterwards)"""
+    try:
+        with Image.open(upload) as image:
+            image.verify()
+        return True
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return False
+    finally:
+        upload.seek(0)
+
+
+def _render(image, size, fit):
+    if fit == 'cover':
+        # never upscale: a small photo gives a smaller square
+        side = min(size, *image.size)
+        return ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+    thumbnail = image.copy()
+    thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return thumbnail
+
+
+def make_thumbnails(name, fit='cover'):
+    """Write WebP thumbnails of the stored image ``name``, one per configured size
+
+    EXIF orientation is applied, then every bit of metadata (EXIF, GPS, ICC,
+    XMP) is left behind: only pixels are re-encoded.
+
+    Returns:
+        dict: ``{str(size): stored name}``
+
+    Raises:
+        UnidentifiedImageError: if ``name`` is not an image Pillow can decode
+    """
+    with default_storage.open(name, 'rb') as source:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info else 'RGB')
+    stem = os.path.splitext(name)[0]
+    sizes = {}
+    for size in get_config('SIZES'):
+        buffer = BytesIO()
+        _render(image, size, fit).save(buffer, 'WEBP', quality=get_config('QUALITY'), method=6)
+        path = f'{THUMBNAIL_DIR}/{stem}_{size}.webp'
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        sizes[str(size)] = default_storage.save(path, ContentFile(buffer.getvalue()))
+    return sizes
+
+
+@jobs.task(priority=80, max_attempts=3)
+def process(model, pk, name):
+    """Job: thumbnails of the image ``name`` of a Freelancer/Client/Company, stored on the row
+
+    The result is dropped when the row has another image by then (a newer
+    upload queued its own job).
+    """
+    model_class = apps.get_model('platform_api', model)
+    field, fit = IMAGE_FIELDS[model]
+    if not model_class.objects.filter(pk=pk, **{field: name}).exists():
+        return
+    try:
+        sizes = make_thumbnails(name, fit)
+    except (UnidentifiedImageError, Image.DecompressionBombError, FileNotFoundError) as exc:
+        # retrying would fail the same way
+        logger.warning("No thumbnails for %s %s (%s): %s", model, pk, name, exc)
+        return
+    with transaction.atomic():
+        instance = model_class.objects.select_for_update().filter(pk=pk, **{field: name}).first()
+        if instance is None:
+            discard(list(sizes.values()))
+            return
+        setattr(instance, f'{field}_sizes', sizes)
+        # a real save: updated_at moves (conditional GETs) and the profile caches are invalidated
+        instance.save(update_fields=[f'{field}_sizes', 'updated_at'])
+
+
+@jobs.task(priority=200)
+def discard(names):
+    """Job: delete stored thumbnails that no row points at any more"""
+    for name in names:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def queue_missing():
+    """Queue thumbnails for every image without them (e.g. uploaded before the pipeline); returns the count"""
+    queued = 0
+    for model, (field, _) in IMAGE_FIELDS.items():
+        rows = (apps.get_model('platform_api', model).objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                .filter(**{f'{field}_sizes': {}}).values_list('pk', field))
+        with transaction.atomic():
+            for pk, name in rows.iterator():
+                jobs.enqueue(process, {'model': model, 'pk': pk, 'name': name})
+                queued += 1
+    return queued
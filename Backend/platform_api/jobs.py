@@ -0,0 +1,258 @@
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection, connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+_running = threading.local()
+
+
+def get_config(name):
+    defaults = {
+        'WORKERS': 2, 'POLL_INTERVAL': 1.0, 'LEASE': 300,
+        'BACKOFF_BASE': 5, 'BACKOFF_MAX': 3600, 'MAX_ATTEMPTS': 5,
+    }
+    return getattr(settings, 'JOBS', {}).get(name, defaults[name])
+
+
+def _name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def task(priority=100, max_attempts=None):
+    """Register a function as a job task; ``enqueue`` it to run on a worker
+
+    Tasks run at least once: a worker that dies mid-job has the job run
+    again after its lease expires, so they must be safe to repeat.
+    """
+    def register(func):
+        func.job_options = {'priority': priority, 'max_attempts': max_attempts}
+        _tasks[_name(func)] = func
+        return func
+    return register
+
+
+def get_task(name):
+    """The registered task called ``name``; importing its module registers it"""
+    if name not in _tasks:
+        try:
+            import_string(name)
+        except ImportError:
+            pass
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f'Unknown task: {name}')
+
+
+def enqueue(func, kwargs=None, priority=None, delay=0, max_attempts=None):
+    """Queue ``func(**kwargs)`` for a worker; returns the Job
+
+    The row is written in the caller's transaction: the job only exists if
+    the surrounding writes commit, and a worker never sees it earlier.
+
+    Args:
+        func: A function registered with ``@task``
+        kwargs: JSON-serializable keyword arguments
+        priority: Overrides the task's priority (lower runs first)
+        delay: Seconds before the job may start
+        max_attempts: Overrides the task's (or JOBS['MAX_ATTEMPTS']) retry limit
+    """
+    options = getattr(func, 'job_options', None)
+    if options is None:
+        raise LookupError(f'{_name(func)} is not a registered task')
+    return Job.objects.create(
+        task=_name(func),
+        kwargs=kwargs or {},
+        priority=options['priority'] if priority is None else priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or options['max_attempts'] or get_config('MAX_ATTEMPTS'),
+    )
+
+
+def claim(worker, limit=1):
+    """Lock up to ``limit`` ready jobs for ``worker``, best priority first
+
+    PostgreSQL hands each worker different rows with ``FOR UPDATE SKIP
+    LOCKED``. SQLite has no row locks but runs one writer at a time, so each
+    candidate is taken with a conditional UPDATE that only one worker can win.
+    """
+    now = timezone.now()
+    ready = Job.objects.filter(status='queued', run_at__lte=now).order_by('priority', 'run_at', 'id')
+    claimed = {'status': 'running', 'locked_by': worker, 'attempts': F('attempts') + 1,
+               'locked_until': now + timedelta(seconds=get_config('LEASE'))}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(ready.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**claimed)
+    else:
+        ids = []
+        # a few spare candidates, in case other workers win some of them
+        for job_id in ready.values_list('id', flat=True)[:limit * 2]:
+            if Job.objects.filter(id=job_id, status='queued').update(**claimed):
+                ids.append(job_id)
+                if len(ids) == limit:
+                    break
+    return list(Job.objects.filter(id__in=ids, locked_by=worker).order_by('priority', 'run_at', 'id'))
+
+
+def backoff(attempts):
+    """Seconds before retry number ``attempts``: exponential, capped, with up to 10% jitter"""
+    delay = min(get_config('BACKOFF_BASE') * 2 ** (attempts - 1), get_config('BACKOFF_MAX'))
+    return delay * (1 + random.random() / 10)
+
+
+def current_job():
+    """The Job being executed on this thread, or None outside a worker"""
+    return getattr(_running, 'job', None)
+
+
+def execute(job):
+    """Run a claimed job; delete it on success, schedule a retry or mark it failed otherwise"""
+    mine = Job.objects.filter(id=job.id, locked_by=job.locked_by, status='running')
+    _running.job = job
+    try:
+        get_task(job.task)(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed for good after %s attempts", job.id, job.task, job.attempts)
+            mine.update(status='failed', locked_by='', locked_until=None, last_error=error)
+        else:
+            delay = backoff(job.attempts)
+            logger.warning("Job %s (%s) failed, retry in %.0fs", job.id, job.task, delay)
+            mine.update(status='queued', locked_by='', locked_until=None, last_error=error,
+                        run_at=timezone.now() + timedelta(seconds=delay))
+        return False
+    finally:
+        _running.job = None
+    mine.delete()
+    return True
+
+
+def requeue_expired():
+    """Put back jobs whose worker died mid-run (lease expired); returns how many were released"""
+    expired = Job.objects.filter(status='running', locked_until__lt=timezone.now())
+    dead = expired.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', locked_by='', locked_until=None, last_error='Lease expired')
+    return dead + expired.update(status='queued', locked_by='', locked_until=None, last_error='Lease expired')
+
+
+def retry(job_id):
+    """Queue a failed job again with a fresh attempt budget; False if it is not failed"""
+    return bool(Job.objects.filter(id=job_id, status='failed').update(
+        status='queued', attempts=0, run_at=timezone.now()))
+
+
+def depth():
+    """Queue depth for the admin dashboard: totals by status and per task"""
+    now = timezone.now()
+    totals = Job.objects.aggregate(
+        queued=Count('id', filter=Q(status='queued')),
+        ready=Count('id', filter=Q(status='queued', run_at__lte=now)),
+        retrying=Count('id', filter=Q(status='queued', attempts__gt=0)),
+        running=Count('id', filter=Q(status='running')),
+        failed=Count('id', filter=Q(status='failed')),
+        oldest_ready=Min('run_at', filter=Q(status='queued', run_at__lte=now)),
+    )
+    oldest = totals.pop('oldest_ready')
+    totals['oldest_ready_seconds'] = round((now - oldest).total_seconds(), 1) if oldest else 0
+    tasks = {}
+    for name, job_status, total in Job.objects.values_list('task', 'status').annotate(total=Count('id')).order_by():
+        tasks.setdefault(name, {'queued': 0, 'running': 0, 'failed': 0})[job_status] = total
+    totals['tasks'] = tasks
+    return totals
+
+
+def work(worker=None, stop=None, burst=False):
+    """Claim and run jobs until ``stop`` is set (or, with ``burst``, until none are ready)
+
+    Jobs are claimed one at a time, so a job's lease starts when it does.
+
+    Args:
+        worker: Name recorded on claimed jobs (default host:pid)
+        stop: threading/multiprocessing Event ending the loop after the current job
+        burst: Return once the queue has no ready job
+    """
+    worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+    stop = stop or threading.Event()
+    poll = get_config('POLL_INTERVAL')
+    sweep_every, swept = get_config('LEASE') / 4, 0.0
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                if time.monotonic() - swept >= sweep_every:
+                    requeue_expired()
+                    swept = time.monotonic()
+                jobs = claim(worker)
+            except OperationalError:
+                # SQLite busy with another writer, or the database went away: try again shortly
+                logger.warning("Job claim failed", exc_info=True)
+                stop.wait(poll)
+                continue
+            if not jobs:
+                if burst:
+                    return
+                stop.wait(poll)
+                continue
+            execute(jobs[0])
+    finally:
+        connections.close_all()
+
+
+def _child(stop, burst):
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stop.set())
+    work(f'{socket.gethostname()}:{os.getpid()}', stop, burst)
+
+
+def run_workers(count, burst=False):
+    """Run ``count`` worker processes until SIGINT/SIGTERM, restarting any that die
+
+    Processes, not threads, so CPU-bound tasks (image processing) use every
+    core. Forked from this process after its connections are closed; each
+    child opens its own. With ``count`` 1 the work runs in this process.
+    """
+    context = multiprocessing.get_context('fork')
+    stop = context.Event() if count > 1 else threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stop.set())
+    if count <= 1:
+        work(stop=stop, burst=burst)
+        return
+    connections.close_all()
+
+    def spawn(index):
+        process = context.Process(target=_child, args=(stop, burst), name=f'jobs-{index}', daemon=True)
+        process.start()
+        return process
+
+    processes = [spawn(index) for index in range(count)]
+    while processes:
+        for index, process in enumerate(processes):
+            process.join(0.5)
+            if process.is_alive() or process.exitcode is None:
+                continue
+            if stop.is_set() or burst or process.exitcode == 0:
+                processes[index] = None
+            else:
+                logger.error("Job worker %s exited with %s, restarting", process.name, process.exitcode)
+                processes[index] = spawn(index)
+        processes = [process for process in processes if process is not None]
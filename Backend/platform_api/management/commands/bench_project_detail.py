@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from platform_api.models import (
+    User, Client, Freelancer, Negotiation, Project, ProjectPhase, Deliverable,
+)
+from platform_api.serializers import ProjectSerializer, ProjectPhaseSerializer, DeliverableSerializer
+from platform_api.views import get_project_detail
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark GET /projects/<id>/ on synthetic projects of growing size. "
+        "Runs inside a transaction that is rolled back, so no data is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--phases', default='1,10,50', help="Comma-separated phase counts")
+        parser.add_argument('--deliverables', type=int, default=5, help="Deliverables per phase")
+
+    def handle(self, *args, **options):
+        phase_counts = [int(n) for n in options['phases'].split(',')]
+        per_phase = options['deliverables']
+
+        self.stdout.write(f"{'phases':>7} {'deliverables':>13} {'queries':>8} {'bytes':>10} {'legacy bytes':>13} {'ms':>8}")
+        with transaction.atomic():
+            owner = self._make_participants()
+            for phase_count in phase_counts:
+                project = self._make_project(owner, phase_count, per_phase)
+                queries, size, elapsed = self._measure(project, owner[0])
+                legacy = self._legacy_size(project)
+                self.stdout.write(
+                    f"{phase_count:>7} {phase_count * per_phase:>13} {queries:>8} {size:>10} {legacy:>13} {elapsed:>8.1f}"
+                )
+            transaction.set_rollback(True)
+
+    def _make_participants(self):
+        client_user = User.objects.create_user(
+            email='bench-client@example.com', password=None, first_name='Bench', last_name='Client', role='client')
+        freelancer_user = User.objects.create_user(
+            email='bench-free@example.com', password=None, first_name='Bench', last_name='Freelancer', role='freelancer')
+        client = Client.objects.create(user=client_user)
+        freelancer = Freelancer.objects.create(user=freelancer_user)
+        return client_user, client, freelancer
+
+    def _make_project(self, owner, phase_count, per_phase):
+        _, client, freelancer = owner
+        negotiation = Negotiation.objects.create(
+            origin_type='direct_hire', client=client, freelancer=freelancer, status='agreed')
+        project = Project.objects.create(negotiation=negotiation, title=f'Bench project ({phase_count} phases)')
+        phases = ProjectPhase.objects.bulk_create(
+            ProjectPhase(project=project, title=f'Phase {i}') for i in range(phase_count))
+        Deliverable.objects.bulk_create(
+            Deliverable(phase=phase, title=f'Deliverable {j}', textcontent='x' * 200)
+            for phase in phases for j in range(per_phase))
+        return project
+
+    def _measure(self, project, user):
+        request = APIRequestFactory().get(f'/projects/{project.id}/')
+        force_authenticate(request, user=user)
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = get_project_detail(request, id=project.id)
+            response.render()
+            elapsed = (time.perf_counter() - started) * 1000
+        return len(ctx.captured_queries), len(response.content), elapsed
+
+    def _legacy_size(self, project):
+        """Payload size of the previous shape, where every phase and deliverable re-embeds the project"""
+        data = ProjectSerializer(project).data
+        data['phases'] = ProjectPhaseSerializer(ProjectPhase.objects.filter(project=project), many=True).data
+        deliverables = DeliverableSerializer(Deliverable.objects.filter(phase__project=project), many=True).data
+        for phase in data['phases']:
+            phase['deliverables'] = [item for item in deliverables if item['phase'] == phase['id']]
+        return len(JSONRenderer().render(data))
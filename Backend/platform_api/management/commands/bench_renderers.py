@@ -0,0 +1,80 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from platform_api.models import (
+    User, Client, Freelancer, Request, Negotiation, NegotiationPhase, Project, ProjectPhase, Deliverable,
+)
+from platform_api.renderers import FastJSONRenderer, orjson
+from platform_api.serializers import NegotiationSerializer, NegotiationPhaseSerializer, ProjectDetailSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSONRenderer with FastJSONRenderer on negotiation and project detail "
+        "payloads. Runs inside a transaction that is rolled back, so no data is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--phases', type=int, default=50, help="Phases per negotiation/project")
+        parser.add_argument('--deliverables', type=int, default=5, help="Deliverables per project phase")
+        parser.add_argument('--repeat', type=int, default=20, help="Renders per measurement")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write("orjson is not installed: FastJSONRenderer falls back to the stdlib renderer")
+        with transaction.atomic():
+            payloads = self._make_payloads(options['phases'], options['deliverables'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'payload':<20} {'renderer':<18} {'bytes':>10} {'ms/render':>10} {'peak KiB':>10}")
+        for name, data in payloads.items():
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                size, elapsed, peak = self._measure(renderer, data, options['repeat'])
+                self.stdout.write(
+                    f"{name:<20} {type(renderer).__name__:<18} {size:>10} {elapsed:>10.2f} {peak / 1024:>10.1f}"
+                )
+
+    def _make_payloads(self, phase_count, per_phase):
+        client_user = User.objects.create_user(
+            email='bench-client@example.com', password=None, first_name='Bench', last_name='Client', role='client')
+        freelancer_user = User.objects.create_user(
+            email='bench-free@example.com', password=None, first_name='Bench', last_name='Freelancer', role='freelancer')
+        client = Client.objects.create(user=client_user)
+        freelancer = Freelancer.objects.create(user=freelancer_user, skills=['python', 'django'])
+        request = Request.objects.create(client=client, title='Bench request', budget_min='100.00', budget_max='2500.50')
+        negotiation = Negotiation.objects.create(
+            origin_type='request', request=request, client=client, freelancer=freelancer, status='agreed')
+        NegotiationPhase.objects.bulk_create(
+            NegotiationPhase(negotiation=negotiation, title=f'Phase {i}', budget='150.25', description='x' * 200)
+            for i in range(phase_count))
+        project = Project.objects.create(negotiation=negotiation, title='Bench project')
+        phases = ProjectPhase.objects.bulk_create(
+            ProjectPhase(project=project, title=f'Phase {i}', budget='150.25') for i in range(phase_count))
+        Deliverable.objects.bulk_create(
+            Deliverable(phase=phase, title=f'Deliverable {j}', textcontent='x' * 200)
+            for phase in phases for j in range(per_phase))
+
+        negotiation_data = NegotiationSerializer(negotiation).data
+        negotiation_data['phases'] = NegotiationPhaseSerializer(
+            NegotiationPhase.objects.filter(negotiation=negotiation), many=True).data
+        project = ProjectDetailSerializer.setup_eager_loading(Project.objects.filter(id=project.id)).get()
+        return {
+            'negotiation detail': negotiation_data,
+            'project detail': ProjectDetailSerializer(project).data,
+        }
+
+    def _measure(self, renderer, data, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            content = renderer.render(data)
+        elapsed = (time.perf_counter() - started) * 1000 / repeat
+
+        tracemalloc.start()
+        renderer.render(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return len(content), elapsed, peak
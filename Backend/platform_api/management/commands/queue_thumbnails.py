@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from platform_api import images
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue thumbnail jobs for every profile photo and company logo that has none yet "
+        "(e.g. uploaded before the image pipeline); run_jobs renders them."
+    )
+
+    def handle(self, *args, **options):
+        queued = images.queue_missing()
+        self.stdout.write(self.style.SUCCESS(f"{queued} image(s) queued"))
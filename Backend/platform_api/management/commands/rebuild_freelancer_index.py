@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from platform_api import freelancer_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the freelancer skill/category search index from Freelancer.skills/categories. "
+        "Run after renaming or adding catalog skills/categories that profiles already refer to by name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Freelancers loaded per query")
+
+    def handle(self, *args, **options):
+        total = freelancer_index.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} freelancer(s)"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from platform_api import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text search documents (requests, offers, community posts, freelancer bios) "
+        "from the source tables, e.g. after bulk imports that bypassed model signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows loaded and inserted per query")
+
+    def handle(self, *args, **options):
+        counts = search.rebuild(batch_size=options['batch_size'])
+        for kind, total in counts.items():
+            self.stdout.write(f"{kind}: {total}")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {sum(counts.values())} document(s)"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from platform_api import notifications
+
+
+class Command(BaseCommand):
+    help = "Rebuild every user's unread notification counter from the notifications table."
+
+    def handle(self, *args, **options):
+        written = notifications.recompute()
+        self.stdout.write(self.style.SUCCESS(f"{written} user(s) with unread notifications"))
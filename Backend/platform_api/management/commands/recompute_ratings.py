@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from platform_api import ratings
+from platform_api.models import Freelancer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare Freelancer.rating_sum/rating_count with the reviews table and rebuild the totals "
+        "and rate of freelancers whose counters drifted (or of all freelancers with --all)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report drifted freelancers")
+        parser.add_argument('--all', action='store_true', help="Recompute every freelancer, e.g. after a backfill")
+
+    def handle(self, *args, **options):
+        if options['all'] and not options['dry_run']:
+            updated = ratings.recompute()
+            self.stdout.write(self.style.SUCCESS(f"Recomputed {updated} freelancer(s)"))
+            return
+
+        total, count = ratings.live_totals()
+        drifted = Freelancer.objects.annotate(actual_sum=total, actual_count=count).filter(
+            ~Q(rating_sum=F('actual_sum')) | ~Q(rating_count=F('actual_count')))
+        rows = list(drifted.values_list('pk', 'rating_sum', 'actual_sum', 'rating_count', 'actual_count'))
+        for freelancer_id, rating_sum, actual_sum, rating_count, actual_count in rows:
+            self.stdout.write(
+                f"freelancer {freelancer_id}: sum {rating_sum} -> {actual_sum}, count {rating_count} -> {actual_count}")
+        if options['dry_run'] or not rows:
+            self.stdout.write(f"{len(rows)} drifted freelancer(s)")
+            return
+
+        repaired = ratings.recompute(Freelancer.objects.filter(pk__in=[row[0] for row in rows]))
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} freelancer(s)"))
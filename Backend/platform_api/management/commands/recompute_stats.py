@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from platform_api import stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the admin dashboard counters from the source tables, repairing any drift "
+        "(e.g. after bulk imports or queryset.update() calls that bypass the save hooks)."
+    )
+
+    def handle(self, *args, **options):
+        before = stats.dashboard()
+        after = stats.recompute()
+        for name in stats.COUNTER_NAMES:
+            drift = after[name] - before[name]
+            note = f" (was {before[name]}, drift {drift:+d})" if drift else ""
+            self.stdout.write(f"{name:<24} {after[name]:>12}{note}")
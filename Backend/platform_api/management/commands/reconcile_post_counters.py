@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from platform_api.models import CommunityComment, CommunityLike, CommunityPost
+
+
+def actual_count(model):
+    """Live row count of ``model`` for the outer post, as a subquery expression"""
+    rows = model.objects.filter(post=OuterRef('pk')).order_by().values('post')
+    return Coalesce(Subquery(rows.annotate(total=Count('id')).values('total')), Value(0))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare CommunityPost.likes_count/comments_count with the likes and comments tables "
+        "and repair posts whose counters drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report drifted posts")
+
+    def handle(self, *args, **options):
+        drifted = CommunityPost.objects.annotate(
+            actual_likes=actual_count(CommunityLike),
+            actual_comments=actual_count(CommunityComment),
+        ).exclude(likes_count=F('actual_likes'), comments_count=F('actual_comments'))
+
+        rows = list(drifted.values_list('id', 'likes_count', 'actual_likes', 'comments_count', 'actual_comments'))
+        for post_id, likes, actual_likes, comments, actual_comments in rows:
+            self.stdout.write(
+                f"post {post_id}: likes {likes} -> {actual_likes}, comments {comments} -> {actual_comments}")
+        if options['dry_run'] or not rows:
+            self.stdout.write(f"{len(rows)} drifted post(s)")
+            return
+
+        repaired = CommunityPost.objects.filter(id__in=[row[0] for row in rows]).update(
+            likes_count=actual_count(CommunityLike),
+            comments_count=actual_count(CommunityComment),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} post(s)"))
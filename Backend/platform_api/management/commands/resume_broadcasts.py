@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from platform_api import broadcasts
+from platform_api.models import Broadcast
+
+
+class Command(BaseCommand):
+    help = (
+        "Run pending or failed notification broadcasts to completion in this process, resuming each "
+        "from its checkpoint, without going through the job queue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--include-running', action='store_true',
+            help="Also take over broadcasts left 'running' by a worker that died; only when no worker is alive")
+
+    def handle(self, *args, **options):
+        if options['include_running']:
+            Broadcast.objects.filter(status='running').update(status='failed', error='Interrupted')
+        for broadcast_id in Broadcast.objects.filter(status__in=('pending', 'failed')).order_by('created_at') \
+                .values_list('id', flat=True):
+            try:
+                broadcasts.run(broadcast_id)
+            except Exception as exc:
+                self.stderr.write(f"{broadcast_id}: failed ({exc})")
+                continue
+            broadcast = Broadcast.objects.get(id=broadcast_id)
+            self.stdout.write(f"{broadcast_id}: {broadcast.status}, {broadcast.processed} recipient(s)")
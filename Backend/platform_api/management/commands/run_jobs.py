@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from platform_api import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the jobs table until SIGINT/SIGTERM: one or more worker processes, "
+        "each finishing its current job before it exits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=jobs.get_config('WORKERS'),
+                            help="Worker processes (default JOBS['WORKERS'])")
+        parser.add_argument('--burst', action='store_true', help="Exit once no job is ready to run")
+
+    def handle(self, *args, **options):
+        released = jobs.requeue_expired()
+        if released:
+            self.stdout.write(f"{released} job(s) with an expired lease released")
+        self.stdout.write(f"Running jobs with {options['workers']} worker process(es)")
+        jobs.run_workers(options['workers'], burst=options['burst'])
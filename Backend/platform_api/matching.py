@@ -0,0 +1,285 @@
+import math
+import re
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Sum
+
+from .catalog_cache import get_catalog
+from .models import Freelancer, FreelancerCategory, FreelancerSkill, NegotiationPhase
+
+# share of each signal in the final score (they sum to 1, so scores are in [0, 1])
+WEIGHTS = {
+    'category': 0.30,
+    'skills': 0.35,
+    'budget': 0.15,
+    'rate': 0.10,
+    'wilaya': 0.10,
+}
+# budget fit of a freelancer without agreed work yet, or of a request without a budget
+NEUTRAL_BUDGET_FIT = 0.5
+# negotiation statuses whose phase budgets count as the freelancer's price history
+HISTORY_STATUSES = ('agreed', 'completed')
+
+RequestFeatures = namedtuple('RequestFeatures', ['category_ids', 'skill_ids', 'budget_min', 'budget_max', 'wilaya'])
+Match = namedtuple('Match', ['freelancer_id', 'score', 'breakdown'])
+
+
+def _normalize(text):
+    return ' '.join(re.findall(r'[^\W_]+', (text or '').lower()))
+
+
+class FeatureMatrix:
+    """Column arrays describing every freelancer, one row each
+
+    Skills and categories are kept as (row, id) entry pairs, a sparse
+    incidence matrix: overlap with a request is one ``isin`` over the entries
+    and one ``bincount`` into rows. Instances are never mutated once published;
+    ``with_rows`` returns an updated copy.
+
+    ``watermark`` is the latest ``updated_at`` loaded and ``watermark_ids`` the
+    freelancers loaded with exactly that stamp, so a delta can tell them apart
+    from rows saved later in the same instant.
+    """
+
+    def __init__(self, ids, rate, wilaya, budget_log, skill_entries, category_entries, wilaya_codes, watermark,
+                 watermark_ids=frozenset()):
+        self.ids = ids
+        self.row_of = {int(freelancer_id): row for row, freelancer_id in enumerate(ids)}
+        self.rate = rate
+        self.wilaya = wilaya
+        self.budget_log = budget_log
+        self.skill_rows, self.skill_ids = skill_entries
+        self.category_rows, self.category_ids = category_entries
+        self.wilaya_codes = wilaya_codes
+        self.watermark = watermark
+        self.watermark_ids = watermark_ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _entries(pairs, row_of):
+        pairs = [(row_of[freelancer_id], term) for freelancer_id, term in pairs if freelancer_id in row_of]
+        if not pairs:
+            return np.empty(0, np.int32), np.empty(0, np.int32)
+        rows, terms = zip(*pairs)
+        return np.array(rows, np.int32), np.array(terms, np.int32)
+
+    @classmethod
+    def load(cls):
+        """Build the matrix from the database (four queries)"""
+        freelancers = list(Freelancer.objects.values_list('user_id', 'rate', 'wilaya', 'updated_at'))
+        wilaya_codes = {}
+        ids = np.array([row[0] for row in freelancers], np.int64)
+        rate = np.array([(row[1] or 0.0) / 5.0 for row in freelancers], np.float32)
+        wilaya = np.array([wilaya_codes.setdefault(_normalize(row[2]), len(wilaya_codes)) if row[2] else -1
+                           for row in freelancers], np.int32)
+        row_of = {int(freelancer_id): row for row, freelancer_id in enumerate(ids)}
+        budget_log = np.full(len(ids), np.nan, np.float32)
+        for freelancer_id, value in _budget_history().items():
+            if freelancer_id in row_of:
+                budget_log[row_of[freelancer_id]] = value
+        watermark = max((row[3] for row in freelancers if row[3] is not None), default=None)
+        return cls(
+            ids, rate, wilaya, budget_log,
+            cls._entries(FreelancerSkill.objects.values_list('freelancer_id', 'skill_id'), row_of),
+            cls._entries(FreelancerCategory.objects.values_list('freelancer_id', 'category_id'), row_of),
+            wilaya_codes, watermark, frozenset(row[0] for row in freelancers if row[3] == watermark),
+        )
+
+    def with_rows(self, freelancers):
+        """Copy of the matrix with ``freelancers`` ((id, rate, wilaya, updated_at) tuples) added or replaced
+
+        Their price history is reloaded too (one query); other rows keep theirs
+        until the next full load.
+        """
+        ids, rate, wilaya = self.ids, self.rate.copy(), self.wilaya.copy()
+        wilaya_codes = dict(self.wilaya_codes)
+        new_ids = [row[0] for row in freelancers if row[0] not in self.row_of]
+        if new_ids:
+            ids = np.concatenate([ids, np.array(new_ids, np.int64)])
+            rate = np.concatenate([rate, np.zeros(len(new_ids), np.float32)])
+            wilaya = np.concatenate([wilaya, np.full(len(new_ids), -1, np.int32)])
+        budget_log = np.concatenate([self.budget_log, np.full(len(new_ids), np.nan, np.float32)])
+        row_of = dict(self.row_of)
+        row_of.update({freelancer_id: len(self.ids) + offset for offset, freelancer_id in enumerate(new_ids)})
+
+        changed = np.array([row_of[row[0]] for row in freelancers], np.int32)
+        for freelancer_id, freelancer_rate, freelancer_wilaya, _ in freelancers:
+            row = row_of[freelancer_id]
+            rate[row] = (freelancer_rate or 0.0) / 5.0
+            wilaya[row] = (wilaya_codes.setdefault(_normalize(freelancer_wilaya), len(wilaya_codes))
+                           if freelancer_wilaya else -1)
+
+        changed_ids = [row[0] for row in freelancers]
+        history = _budget_history(changed_ids)
+        for freelancer_id in changed_ids:
+            budget_log[row_of[freelancer_id]] = history.get(freelancer_id, np.nan)
+
+        def replace(rows, terms, model, column):
+            keep = ~np.isin(rows, changed)
+            pairs = model.objects.filter(freelancer_id__in=changed_ids).values_list('freelancer_id', column)
+            fresh_rows, fresh_terms = self._entries(pairs, row_of)
+            return np.concatenate([rows[keep], fresh_rows]), np.concatenate([terms[keep], fresh_terms])
+
+        stamps = [row[3] for row in freelancers if row[3] is not None]
+        if self.watermark is not None:
+            stamps.append(self.watermark)
+        watermark = max(stamps, default=None)
+        watermark_ids = {row[0] for row in freelancers if row[3] == watermark}
+        if watermark == self.watermark:
+            watermark_ids |= self.watermark_ids
+        return FeatureMatrix(
+            ids, rate, wilaya, budget_log,
+            replace(self.skill_rows, self.skill_ids, FreelancerSkill, 'skill_id'),
+            replace(self.category_rows, self.category_ids, FreelancerCategory, 'category_id'),
+            wilaya_codes, watermark, frozenset(watermark_ids),
+        )
+
+    def _membership(self, rows, terms, wanted):
+        """Per freelancer, how many of ``wanted`` ids their entries hold"""
+        if not wanted:
+            return np.zeros(len(self), np.float32)
+        hit = np.isin(terms, np.fromiter(wanted, np.int32))
+        return np.bincount(rows[hit], minlength=len(self)).astype(np.float32)
+
+    def score(self, features):
+        """Score vector (one float per row) and its per-signal components"""
+        skills = self._membership(self.skill_rows, self.skill_ids, features.skill_ids)
+        wilaya_code = self.wilaya_codes.get(features.wilaya, -2)  # -2 never matches (-1 is "unknown")
+        parts = {
+            'category': np.minimum(self._membership(self.category_rows, self.category_ids, features.category_ids), 1),
+            'skills': skills / max(len(features.skill_ids), 1),
+            'budget': self._budget_fit(features),
+            'rate': self.rate,
+            'wilaya': (self.wilaya == wilaya_code).astype(np.float32),
+        }
+        total = np.zeros(len(self), np.float32)
+        for name, values in parts.items():
+            total += WEIGHTS[name] * values
+        return total, parts
+
+    def _budget_fit(self, features):
+        """exp(-distance) between a freelancer's typical price and the request's budget range, in log space"""
+        if features.budget_min is None and features.budget_max is None:
+            return np.full(len(self), NEUTRAL_BUDGET_FIT, np.float32)
+        low = math.log(features.budget_min) if features.budget_min else -np.inf
+        high = math.log(features.budget_max) if features.budget_max else np.inf
+        distance = np.abs(self.budget_log - np.clip(self.budget_log, low, high))
+        return np.where(np.isnan(self.budget_log), NEUTRAL_BUDGET_FIT, np.exp(-distance)).astype(np.float32)
+
+    def top(self, features, k):
+        """The ``k`` best rows as Match tuples, best first (ties broken by freelancer id)"""
+        if not len(self) or k <= 0:
+            return []
+        total, parts = self.score(features)
+        k = min(k, len(self))
+        # every row tied with the k-th score competes, so the cut-off tie is also broken by id
+        kth = total[np.argpartition(-total, k - 1)[k - 1]]
+        best = np.flatnonzero(total >= kth)
+        best = best[np.lexsort((self.ids[best], -total[best]))][:k]
+        return [
+            Match(int(self.ids[row]), round(float(total[row]), 4),
+                  {name: round(float(values[row]), 4) for name, values in parts.items()})
+            for row in best
+        ]
+
+
+def _budget_history(freelancer_ids=None):
+    """Mean log of each freelancer's agreed negotiation totals (sum of phase budgets), by freelancer id
+
+    Args:
+        freelancer_ids: Only these freelancers (all when None)
+    """
+    phases = NegotiationPhase.objects.filter(negotiation__status__in=HISTORY_STATUSES, budget__gt=0)
+    if freelancer_ids is not None:
+        phases = phases.filter(negotiation__freelancer_id__in=freelancer_ids)
+    totals = (phases
+              .values('negotiation_id')
+              .annotate(total=Sum('budget'))
+              .values_list('negotiation__freelancer_id', 'total'))
+    rows = [(freelancer_id, math.log(total)) for freelancer_id, total in totals if total]
+    if not rows:
+        return {}
+    freelancer_ids, logs = map(np.array, zip(*rows))
+    unique, inverse = np.unique(freelancer_ids, return_inverse=True)
+    means = np.bincount(inverse, weights=logs) / np.bincount(inverse)
+    return dict(zip(unique.tolist(), means.tolist()))
+
+
+class MatchingEngine:
+    """Per-process freelancer feature matrix, refreshed in place
+
+    Rows of freelancers saved since the last look (``updated_at`` past the
+    matrix watermark) are patched in, price history included, at most every
+    ``DELTA_INTERVAL`` seconds; the whole matrix is reloaded every
+    ``FULL_REFRESH`` seconds. Deleted or deactivated freelancers may linger in
+    the matrix until then and are dropped when results are loaded.
+    """
+
+    def __init__(self, full_refresh=600, delta_interval=5):
+        self.full_refresh = full_refresh
+        self.delta_interval = delta_interval
+        self._matrix = None
+        self._loaded_at = self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def matrix(self):
+        now = time.monotonic()
+        matrix = self._matrix
+        if matrix is not None and now - self._checked_at < self.delta_interval:
+            return matrix
+        with self._lock:
+            if self._matrix is None or now - self._loaded_at >= self.full_refresh:
+                self._matrix = FeatureMatrix.load()
+                self._loaded_at = self._checked_at = now
+            elif now - self._checked_at >= self.delta_interval:
+                self._matrix = self._apply_delta(self._matrix)
+                self._checked_at = now
+            return self._matrix
+
+    @staticmethod
+    def _apply_delta(matrix):
+        changed = Freelancer.objects.values_list('user_id', 'rate', 'wilaya', 'updated_at')
+        if matrix.watermark is not None:
+            # >= so rows saved in the same instant as the watermark are not missed;
+            # the ones the matrix already holds at that instant are skipped
+            changed = changed.filter(updated_at__gte=matrix.watermark)
+        changed = [row for row in changed if row[3] != matrix.watermark or row[0] not in matrix.watermark_ids]
+        return matrix.with_rows(changed) if changed else matrix
+
+    def reset(self):
+        with self._lock:
+            self._matrix = None
+
+    def top(self, features, k):
+        return self.matrix().top(features, k)
+
+
+def request_features(title, category, budget_min, budget_max, wilaya):
+    """RequestFeatures of a request: catalog category and skills named in its title/category, budget, client wilaya"""
+    category_name = _normalize(category)
+    category_ids = {row['id'] for row in get_catalog('categories').data if _normalize(row['name']) == category_name} \
+        if category_name else set()
+    text = f" {_normalize(title)} {category_name} "
+    skill_ids = set()
+    for row in get_catalog('skills').data:
+        name = _normalize(row['name'])
+        if name and f' {name} ' in text:
+            skill_ids.add(row['id'])
+    return RequestFeatures(
+        category_ids, skill_ids,
+        float(budget_min) if budget_min else None,
+        float(budget_max) if budget_max else None,
+        _normalize(wilaya) or None,
+    )
+
+
+engine = MatchingEngine(
+    full_refresh=getattr(settings, 'MATCHING_ENGINE', {}).get('FULL_REFRESH', 600),
+    delta_interval=getattr(settings, 'MATCHING_ENGINE', {}).get('DELTA_INTERVAL', 5),
+)
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('platform_api', '0005_deliverable_title'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobinternshipoffer',
+            index=models.Index(fields=['created_at'], name='job_interns_created_fe3753_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediafile',
+            index=models.Index(fields=['entity_type', 'entity_id', 'created_at'], name='media_files_entity__92f9bb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['receiver', 'created_at'], name='notificatio_receive_b72807_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['created_at'], name='reports_created_c5f642_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['created_at'], name='requests_created_4c1c4c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['freelancer', 'created_at'], name='reviews_freelan_2795e8_idx'),
+        ),
+    ]
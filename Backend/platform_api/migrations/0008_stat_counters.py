@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:41
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def seed_counters(apps, schema_editor):
+    """Start the counters from the current table contents"""
+    def model(name):
+        return apps.get_model('platform_api', name)
+
+    projects = model('Project').objects
+    counters = {
+        'freelancers': model('Freelancer').objects.count(),
+        'clients': model('Client').objects.count(),
+        'companies': model('Company').objects.count(),
+        'posted_jobs': model('JobInternshipOffer').objects.count(),
+        'active_requests': model('Request').objects.filter(status__in=['pending', 'accepted']).count(),
+        'active_negotiations': model('Negotiation').objects.filter(
+            status__in=['in_progress', 'agreed', 'completed']).count(),
+        'declined_negotiations': model('Negotiation').objects.filter(status='declined').count(),
+        'active_projects': projects.filter(~Q(negotiation__status='declined')).count(),
+        'declined_projects': projects.filter(negotiation__status='declined').count(),
+    }
+    model('StatCounter').objects.bulk_create(
+        model('StatCounter')(name=name, value=value) for name, value in counters.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_api', '0007_conditional_get_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'stat_counters',
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
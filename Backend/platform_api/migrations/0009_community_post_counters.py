@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:42
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    CommunityPost = apps.get_model('platform_api', 'CommunityPost')
+    CommunityLike = apps.get_model('platform_api', 'CommunityLike')
+    CommunityComment = apps.get_model('platform_api', 'CommunityComment')
+
+    def count_of(model):
+        rows = model.objects.filter(post=OuterRef('pk')).order_by().values('post')
+        return Coalesce(Subquery(rows.annotate(total=Count('id')).values('total')), Value(0))
+
+    CommunityPost.objects.update(likes_count=count_of(CommunityLike), comments_count=count_of(CommunityComment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_api', '0008_stat_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='communitypost',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='communitypost',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def _resolve(catalog, value):
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, (list, tuple)):
+        value = [] if value is None else [value]
+    condition = Q(pk__in=[])
+    for item in value:
+        if isinstance(item, bool):
+            continue
+        if isinstance(item, int) or (isinstance(item, str) and item.strip().isdigit()):
+            condition |= Q(id=int(item))
+        elif isinstance(item, str) and item.strip():
+            condition |= Q(name__iexact=item.strip())
+    return set(catalog.objects.filter(condition).values_list('id', flat=True))
+
+
+def backfill_index(apps, schema_editor):
+    Freelancer = apps.get_model('platform_api', 'Freelancer')
+    Skill = apps.get_model('platform_api', 'Skill')
+    Category = apps.get_model('platform_api', 'Category')
+    FreelancerSkill = apps.get_model('platform_api', 'FreelancerSkill')
+    FreelancerCategory = apps.get_model('platform_api', 'FreelancerCategory')
+
+    skills, categories = [], []
+    for freelancer in Freelancer.objects.only('user', 'skills', 'categories').iterator():
+        skills += [FreelancerSkill(freelancer_id=freelancer.pk, skill_id=pk)
+                   for pk in _resolve(Skill, freelancer.skills)]
+        categories += [FreelancerCategory(freelancer_id=freelancer.pk, category_id=pk)
+                       for pk in _resolve(Category, freelancer.categories)]
+    FreelancerSkill.objects.bulk_create(skills, batch_size=1000, ignore_conflicts=True)
+    FreelancerCategory.objects.bulk_create(categories, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_api', '0009_community_post_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreelancerCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'freelancer_categories',
+            },
+        ),
+        migrations.CreateModel(
+            name='FreelancerSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'freelancer_skills',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='freelancer',
+            index=models.Index(fields=['wilaya', 'city'], name='freelancers_wilaya_0978e4_idx'),
+        ),
+        migrations.AddField(
+            model_name='freelancercategory',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='freelancer_index', to='platform_api.category'),
+        ),
+        migrations.AddField(
+            model_name='freelancercategory',
+            name='freelancer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_index', to='platform_api.freelancer'),
+        ),
+        migrations.AddField(
+            model_name='freelancerskill',
+            name='freelancer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_index', to='platform_api.freelancer'),
+        ),
+        migrations.AddField(
+            model_name='freelancerskill',
+            name='skill',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='freelancer_index', to='platform_api.skill'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='freelancercategory',
+            unique_together={('category', 'freelancer')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='freelancerskill',
+            unique_together={('skill', 'freelancer')},
+        ),
+        migrations.RunPython(backfill_index, migrations.RunPython.noop),
+    ]
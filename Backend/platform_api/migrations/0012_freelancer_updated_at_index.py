@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_api', '0011_search_documents'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='freelancer',
+            index=models.Index(fields=['updated_at'], name='freelancers_updated_2b8b28_idx'),
+        ),
+    ]
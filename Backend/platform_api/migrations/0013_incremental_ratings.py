@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:54
+
+from django.db import migrations, models
+from django.db.models import Count, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def backfill_ratings(apps, schema_editor):
+    Freelancer = apps.get_model('platform_api', 'Freelancer')
+    Review = apps.get_model('platform_api', 'Review')
+
+    reviews = Review.objects.filter(freelancer=OuterRef('pk')).order_by().values('freelancer')
+    total = Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), Value(0))
+    count = Coalesce(Subquery(reviews.annotate(total=Count('id')).values('total')), Value(0))
+    Freelancer.objects.update(
+        rating_sum=total, rating_count=count, rate=Cast(total, FloatField()) / NullIf(count, Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_api', '0012_freelancer_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='freelancer',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='freelancer',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_api', '0016_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='profile_picture_sizes',
+            field=models.JSONField(blank=True, default=dict, help_text='WebP thumbnails by size (images.py)'),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='logo_sizes',
+            field=models.JSONField(blank=True, default=dict, help_text='WebP thumbnails by size (images.py)'),
+        ),
+        migrations.AddField(
+            model_name='freelancer',
+            name='profile_picture_sizes',
+            field=models.JSONField(blank=True, default=dict, help_text='WebP thumbnails by size (images.py)'),
+        ),
+    ]
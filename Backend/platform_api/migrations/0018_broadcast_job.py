@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_api', '0017_image_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='broadcast',
+            name='job_id',
+            field=models.BigIntegerField(blank=True, help_text='Job running the fan-out (jobs.py)', null=True),
+        ),
+    ]
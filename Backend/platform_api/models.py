@@ -1,4 +1,7 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -80,10 +83,12 @@ class Company(models.Model):
     representative = models.TextField(max_length=65535, blank=True, null=True)
     business_type = models.CharField(max_length=50, blank=True, null=True)
     logo = models.ImageField(upload_to='Company_logos/', null=True, blank=True)
+    logo_sizes = models.JSONField(default=dict, blank=True, help_text="WebP thumbnails by size (images.py)")
 
     description = models.TextField(max_length=65535, blank=True, null=True)
     industry = models.CharField(max_length=255, blank=True, null=True)
     is_verified = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'companies'
@@ -97,9 +102,11 @@ class Company(models.Model):
 class Client(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='client_profile')
     profile_picture = models.ImageField(upload_to='user_photos/', null=True, blank=True)
+    profile_picture_sizes = models.JSONField(default=dict, blank=True, help_text="WebP thumbnails by size (images.py)")
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     city = models.CharField(max_length=120, blank=True, null=True)
     wilaya = models.CharField(max_length=120, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'clients'
@@ -112,6 +119,7 @@ class Client(models.Model):
 class Freelancer(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='freelancer_profile')
     profile_picture = models.ImageField(upload_to='user_photos/', null=True, blank=True)
+    profile_picture_sizes = models.JSONField(default=dict, blank=True, help_text="WebP thumbnails by size (images.py)")
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     description = models.TextField(max_length=65535, blank=True, null=True)
     categories = models.JSONField(blank=True, null=True)  
@@ -127,13 +135,21 @@ class Freelancer(models.Model):
         validators=[MinValueValidator(0.0), MaxValueValidator(5.0)],
         help_text="Rating on 5 stars scale (decimal [0, 2])"
     )
+    # running totals of the freelancer's live reviews; rate = rating_sum / rating_count (see ratings.py)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
     education = models.JSONField(blank=True, null=True)
     ccp_account = models.CharField(max_length=50, blank=True, null=True)
     barid_account = models.CharField(max_length=50, blank=True, null=True)
     cvatta = models.CharField(max_length=255, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'freelancers'
+        indexes = [
+            models.Index(fields=['wilaya', 'city']),
+            models.Index(fields=['updated_at']),  # matching engine delta refresh
+        ]
     
     def __str__(self):
         return f"Freelancer: {self.user.email}"
@@ -144,6 +160,7 @@ class FAQ(models.Model):
     question = models.TextField()
     answer = models.TextField(max_length=65535)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'faq'
@@ -161,6 +178,7 @@ class FAQ(models.Model):
 class Skill(models.Model):
     """Skills that freelancers can have"""
     name = models.CharField(max_length=100, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'skills'
@@ -176,6 +194,7 @@ class Skill(models.Model):
 class Category(models.Model):
     """Categories for freelancer profiles"""
     name = models.CharField(max_length=120)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'categories'
@@ -186,6 +205,34 @@ class Category(models.Model):
         return self.name
     
 
+# Freelancer Skill/Category Index Models ----------------------------------------
+
+class FreelancerSkill(models.Model):
+    """Normalized index of ``Freelancer.skills`` against the Skill catalog (kept in sync on save)"""
+    freelancer = models.ForeignKey(Freelancer, on_delete=models.CASCADE, related_name='skill_index')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='freelancer_index')
+
+    class Meta:
+        db_table = 'freelancer_skills'
+        unique_together = ('skill', 'freelancer')  # also the index used by search
+
+    def __str__(self):
+        return f"{self.freelancer_id} - {self.skill_id}"
+
+
+class FreelancerCategory(models.Model):
+    """Normalized index of ``Freelancer.categories`` against the Category catalog (kept in sync on save)"""
+    freelancer = models.ForeignKey(Freelancer, on_delete=models.CASCADE, related_name='category_index')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='freelancer_index')
+
+    class Meta:
+        db_table = 'freelancer_categories'
+        unique_together = ('category', 'freelancer')  # also the index used by search
+
+    def __str__(self):
+        return f"{self.freelancer_id} - {self.category_id}"
+
+
 # Review Model ----------------------------------------------
 
 class Review(models.Model):
@@ -205,20 +252,19 @@ class Review(models.Model):
         help_text="Rating from 1 to 5 stars"
     )
     feedback = models.TextField(max_length=65535, blank=True, null=True)
+    is_deleted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         db_table = 'reviews'
         ordering = ['-created_at']
         unique_together = ['client', 'freelancer']  
+        indexes = [
+            models.Index(fields=['freelancer', 'created_at']),
+        ]
     
     def __str__(self):
         return f"Review by {self.client.user.email} for {self.freelancer.user.email} - {self.rating}★"
-    
-    def save(self, *args, **kwargs):
-        """Override save to update freelancer rating"""
-        super().save(*args, **kwargs)
-        self.freelancer_id.update_rating()
 
 
 
@@ -257,6 +303,7 @@ class MediaFile(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['entity_type', 'entity_id']),
+            models.Index(fields=['entity_type', 'entity_id', 'created_at']),
             models.Index(fields=['owner', 'created_at']),
         ]
     
@@ -296,6 +343,7 @@ class Report(models.Model):
         indexes = [
             models.Index(fields=['type', 'created_at']),
             models.Index(fields=['reporter', 'created_at']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
@@ -314,13 +362,22 @@ class Notification(models.Model):
     )
     content = models.TextField(max_length=65535)
     seen = models.BooleanField(default=False)
+    broadcast = models.ForeignKey(
+        'Broadcast',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         db_table = 'notifications'
         ordering = ['-created_at']
+        unique_together = ('broadcast', 'receiver')  # a broadcast reaches each user once, however often it runs
         indexes = [
             models.Index(fields=['receiver', 'seen', 'created_at']),
+            models.Index(fields=['receiver', 'created_at']),
         ]
     
     def __str__(self):
@@ -333,6 +390,70 @@ class Notification(models.Model):
         self.save()
 
 
+class RevokedToken(models.Model):
+    """Deny-list entry of a signed token (tokens.py), kept until the token would have expired anyway"""
+    jti = models.CharField(max_length=32, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'revoked_tokens'
+
+    def __str__(self):
+        return f"{self.jti} (until {self.expires_at})"
+
+
+class NotificationCounter(models.Model):
+    """Unread notifications of a user, kept current by notifications.py so the badge is one primary-key read"""
+    user = models.OneToOneField('User', on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'notification_counters'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+
+class Broadcast(models.Model):
+    """One notification sent to every user of an audience, fanned out by a background worker
+
+    ``id`` may be chosen by the caller, which makes re-submitting the same
+    broadcast a no-op. ``last_user_id`` is the fan-out checkpoint: recipients
+    are processed in user id order, so an interrupted run resumes after it.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    content = models.TextField(max_length=65535)
+    audience = models.JSONField(default=dict, blank=True, help_text="Filters: role, wilaya, skill, project")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    last_user_id = models.IntegerField(default=0)
+    job_id = models.BigIntegerField(blank=True, null=True, help_text="Job running the fan-out (jobs.py)")
+    error = models.TextField(blank=True, default='')
+    created_by = models.ForeignKey(
+        'User',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='broadcasts'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'broadcasts'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Broadcast {self.id} - {self.status} ({self.processed}/{self.total})"
+
+
 
 # Help Model  --------------------------------------------
 class Help(models.Model):
@@ -403,6 +524,7 @@ class JobInternshipOffer(models.Model):
         indexes = [
             models.Index(fields=['company', 'type', 'created_at']),
             models.Index(fields=['type', 'created_at']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
@@ -462,6 +584,7 @@ class Request(models.Model):
             models.Index(fields=['client', 'status', 'created_at']),
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['category', 'created_at']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
@@ -664,6 +787,7 @@ class Project(models.Model):
     start_date = models.DateField(blank=True, null=True)
     end_date = models.DateField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'projects'
@@ -773,6 +897,9 @@ class CommunityPost(models.Model):
     )
     description = models.TextField(max_length=65535)
     attachments = models.JSONField(default=list, blank=True, null=True)
+    # denormalized, kept current with F() updates by the like/comment receivers in signals.py
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -787,6 +914,39 @@ class CommunityPost(models.Model):
     def __str__(self):
         return f"Post by {self.owner.email}: {self.description[:50]}..."
 
+    def comment_tree(self, parent_id=None, max_depth=None, page_size=None):
+        """Load the post's comment thread with a single query
+        
+        Every comment of the post is fetched at once (with its author) and the
+        reply tree is assembled in memory. Each returned comment carries
+        ``loaded_replies`` (its children, limited by depth and page size) and
+        ``loaded_replies_count`` (the total number of direct replies).
+        
+        Args:
+            parent_id: Root the tree at this comment instead of the top level
+            max_depth: Number of levels to return; deeper replies are counted but not loaded
+            page_size: Maximum number of comments returned per level, oldest first
+            
+        Returns:
+            list[CommunityComment]: The comments of the first level
+        """
+        children = {}
+        for comment in self.comments.select_related('user').order_by('created_at', 'id'):
+            children.setdefault(comment.parent_id, []).append(comment)
+
+        def build(nodes, depth):
+            nodes = nodes[:page_size] if page_size is not None else nodes
+            for node in nodes:
+                replies = children.get(node.id, [])
+                node.loaded_replies_count = len(replies)
+                if max_depth is not None and depth >= max_depth:
+                    node.loaded_replies = []
+                else:
+                    node.loaded_replies = build(replies, depth + 1)
+            return nodes
+
+        return build(children.get(parent_id, []), 1)
+
 
 # Community Comments Model ----------------------------------------
 class CommunityComment(models.Model):
@@ -873,3 +1033,83 @@ class CommunityLike(models.Model):
     
     def __str__(self):
         return f"{self.user.email} liked post {self.post.id}"
+
+
+# Dashboard Counters Model ----------------------------------------
+class StatCounter(models.Model):
+    """Running totals behind the admin dashboard
+
+    Kept current by the save/delete receivers in signals.py and rebuilt from
+    the source tables by the ``recompute_stats`` command.
+    """
+    name = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'stat_counters'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+# Search Document Model ----------------------------------------
+class SearchDocument(models.Model):
+    """Searchable text of one request, offer, community post or freelancer bio
+
+    The full-text index lives beside this table and is maintained by the
+    database: a generated ``tsvector`` column with a GIN index on PostgreSQL,
+    an external-content FTS5 table fed by triggers on SQLite (see migration
+    0011 and search.py).
+    """
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    title = models.TextField(blank=True, default='')
+    body = models.TextField(blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'search_documents'
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
+
+
+# Job Model ----------------------------------------
+class Job(models.Model):
+    """A unit of background work, run by the ``run_jobs`` worker processes (see jobs.py)
+
+    Rows are claimed by priority, then ``run_at``; a failed attempt is put back
+    with a later ``run_at`` until ``max_attempts`` is reached. Finished jobs
+    are deleted, so the table only holds pending, running and dead work.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    ]
+
+    task = models.CharField(max_length=200, help_text="Dotted path of the task function")
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=100, help_text="Lower runs first")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            # the claim query: ready jobs in priority order, a small partial index
+            models.Index(fields=['priority', 'run_at', 'id'], condition=models.Q(status='queued'),
+                         name='jobs_ready_idx'),
+            # lease expiry sweep
+            models.Index(fields=['locked_until'], condition=models.Q(status='running'), name='jobs_lease_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.id} {self.task} - {self.status}"
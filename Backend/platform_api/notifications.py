@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Notification, NotificationCounter, User
+
+
+def bump(user_ids, delta):
+    """Add ``delta`` to the unread counters of ``user_ids`` in one UPDATE (floored at 0)
+
+    Counter rows are created on a user's first notification.
+    """
+    user_ids = list(user_ids)
+    if not user_ids or not delta:
+        return
+    if delta > 0:
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+    NotificationCounter.objects.filter(user_id__in=user_ids).update(unread=Greatest(F('unread') + delta, 0))
+
+
+def unread_count(user_id):
+    """Unread notifications of ``user_id``: a single primary-key read"""
+    return NotificationCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).first() or 0
+
+
+def mark_read(user_id, up_to=None):
+    """Mark the user's unread notifications seen, all of them or those up to notification ``up_to``
+
+    Args:
+        user_id: Receiver whose notifications are marked
+        up_to: Notification id; it and every older notification of the user
+            are marked (by ``created_at``, so one range on the
+            (receiver, seen, created_at) index)
+
+    Returns:
+        int: Number of notifications that were unread
+    """
+    unread = Notification.objects.filter(receiver_id=user_id, seen=False)
+    if up_to is not None:
+        unread = unread.filter(created_at__lte=Subquery(
+            Notification.objects.filter(pk=up_to, receiver_id=user_id).values('created_at')))
+    with transaction.atomic():
+        marked = unread.update(seen=True)
+        bump([user_id], -marked)
+    return marked
+
+
+def recompute():
+    """Rebuild every counter from the notifications table; returns the number of counters written"""
+    unread = (Notification.objects.filter(receiver=OuterRef('pk'), seen=False).order_by().values('receiver')
+              .annotate(total=Count('id')).values('total'))
+    rows = User.objects.annotate(unread=Coalesce(Subquery(unread), Value(0))).values_list('pk', 'unread')
+    with transaction.atomic():
+        NotificationCounter.objects.all().delete()
+        created = NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id, unread=total) for user_id, total in rows.iterator() if total],
+            batch_size=1000,
+        )
+    return len(created)
@@ -0,0 +1,100 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Freelancer
+from .serializers import FreelancerSerializer
+
+CachedProfile = namedtuple('CachedProfile', ['stamps', 'data'])
+
+
+class VersionedLRUCache:
+    """Per-process LRU cache with a TTL, invalidated through shared version tokens
+
+    Entries live in this process (no round trip to read them). Each key also
+    has a version token in the default cache, so an ``invalidate()`` made by
+    any process sharing that cache drops the entry everywhere; the TTL bounds
+    staleness should a token be lost.
+
+    ``loader(key, request)`` builds the value, or returns None for a missing
+    object (not cached). Values may depend on the request host (absolute media
+    URLs), so entries are kept per key and host; they share the key's token.
+    """
+
+    def __init__(self, name, loader, ttl=300, max_entries=5000):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _version_key(self, key):
+        return f'{self.name}:{key}:version'
+
+    def get(self, key, request):
+        version = cache.get_or_set(self._version_key(key), uuid.uuid4().hex, timeout=self.ttl)
+        entry_key = (key, request.get_host())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        value = self.loader(key, request)
+        if value is None:
+            return None
+        with self._lock:
+            self._entries[entry_key] = (version, now + self.ttl, value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, key):
+        """Drop ``key`` in every process once the current transaction commits"""
+        transaction.on_commit(
+            lambda: cache.set(self._version_key(key), uuid.uuid4().hex, timeout=self.ttl))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            'entries': size,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def _load_freelancer(id, request):
+    freelancer = FreelancerSerializer.setup_eager_loading(Freelancer.objects.filter(user=id)).first()
+    if freelancer is None:
+        return None
+    data = FreelancerSerializer(freelancer, context={'request': request}).data
+    return CachedProfile((freelancer.updated_at, freelancer.user.updated_at), data)
+
+
+_config = getattr(settings, 'FREELANCER_PROFILE_CACHE', {})
+freelancer_profiles = VersionedLRUCache(
+    'freelancer_profile', _load_freelancer,
+    ttl=_config.get('TTL', 300), max_entries=_config.get('MAX_ENTRIES', 5000),
+)
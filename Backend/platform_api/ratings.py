@@ -0,0 +1,50 @@
+from django.db.models import Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from .models import Freelancer, Review
+
+STARS = (1, 2, 3, 4, 5)
+
+
+def _mean(total, count):
+    # NULL (no rating) rather than a division by zero when the count is 0
+    return Cast(total, FloatField()) / NullIf(count, Value(0))
+
+
+def apply(freelancer_id, rating_delta, count_delta):
+    """Move a freelancer's running rating totals and ``rate`` in one UPDATE
+
+    Args:
+        freelancer_id: Primary key (user id) of the reviewed freelancer
+        rating_delta: Stars added to (or removed from) ``rating_sum``
+        count_delta: Reviews added to (or removed from) ``rating_count``
+    """
+    if not rating_delta and not count_delta:
+        return
+    total = F('rating_sum') + rating_delta
+    count = F('rating_count') + count_delta
+    # the right-hand sides all read the row as it was, so ``rate`` uses the new totals
+    Freelancer.objects.filter(pk=freelancer_id).update(
+        rating_sum=total, rating_count=count, rate=_mean(total, count), updated_at=timezone.now())
+
+
+def live_totals():
+    """``rating_sum``/``rating_count`` of the outer freelancer recomputed from its reviews, as subqueries"""
+    reviews = Review.objects.filter(freelancer=OuterRef('pk'), is_deleted=False).order_by().values('freelancer')
+    total = Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), Value(0))
+    count = Coalesce(Subquery(reviews.annotate(total=Count('id')).values('total')), Value(0))
+    return total, count
+
+
+def recompute(queryset=None):
+    """Rebuild the running totals and ``rate`` of ``queryset`` (all freelancers) from the reviews table"""
+    total, count = live_totals()
+    queryset = Freelancer.objects.all() if queryset is None else queryset
+    return queryset.update(rating_sum=total, rating_count=count, rate=_mean(total, count), updated_at=timezone.now())
+
+
+def histogram(freelancer_id):
+    """Live review count per star ('1'..'5') for a freelancer, in one aggregate query"""
+    return Review.objects.filter(freelancer_id=freelancer_id, is_deleted=False).aggregate(
+        **{str(star): Count('id', filter=Q(rating=star)) for star in STARS})
@@ -0,0 +1,62 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional speedup, the stdlib-based DRF classes are used instead
+    orjson = None
+
+
+def _default(obj):
+    """Types orjson does not handle natively (it already covers datetime, date, time and UUID)
+
+    Encoded as DRF's JSONEncoder does, so the output does not depend on orjson
+    being installed (a bare Decimal, e.g. an aggregate, is a number; serializer
+    DecimalFields are already strings by then).
+    """
+    return JSONEncoder().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson, falling back to DRF's renderer without it"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """Newline-delimited JSON for the views that stream with ``Accept: application/x-ndjson``
+
+    Lets content negotiation accept that media type; the streamed body is written
+    by streaming.py, so this only renders the other responses (errors, a list as
+    one line per item).
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(super(NDJSONRenderer, self).render(row, None, renderer_context) + b'\n' for row in rows)
+
+
+class FastJSONParser(JSONParser):
+    """JSON parser backed by orjson, falling back to DRF's parser without it"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,193 @@
+import html
+import re
+from collections import namedtuple
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+
+from .models import CommunityPost, Freelancer, JobInternshipOffer, Request, SearchDocument
+
+# kind -> (model, title field, body field); a migration mirrors this for the backfill
+SOURCES = {
+    'request': (Request, 'title', None),
+    'offer': (JobInternshipOffer, 'title', 'requirements'),
+    'post': (CommunityPost, None, 'description'),
+    'freelancer': (Freelancer, None, 'description'),
+}
+KIND_BY_MODEL = {model: kind for kind, (model, _, _) in SOURCES.items()}
+
+MAX_TERMS = 8
+# highlight markers: control characters cannot come from the indexed text, so
+# the text can be escaped before they are turned into <mark> tags
+_OPEN, _CLOSE = '\x02', '\x03'
+
+SearchHit = namedtuple('SearchHit', 'kind object_id rank title snippet')
+
+
+def document_text(instance):
+    """``(title, body)`` of ``instance`` as indexed; deferred fields read as empty"""
+    _, title_field, body_field = SOURCES[KIND_BY_MODEL[type(instance)]]
+    title = instance.__dict__.get(title_field) if title_field else None
+    body = instance.__dict__.get(body_field) if body_field else None
+    return title or '', body or ''
+
+
+def index_object(instance):
+    """Create, update or drop the search document of a saved request/offer/post/freelancer"""
+    kind = KIND_BY_MODEL[type(instance)]
+    title, body = document_text(instance)
+    if not title and not body:
+        remove_object(instance)
+        return
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=instance.pk, defaults={'title': title, 'body': body})
+
+
+def remove_object(instance):
+    SearchDocument.objects.filter(kind=KIND_BY_MODEL[type(instance)], object_id=instance.pk).delete()
+
+
+def rebuild(batch_size=1000):
+    """Re-create every search document from the source tables; returns ``{kind: count}``"""
+    counts = {}
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        for kind, (model, title_field, body_field) in SOURCES.items():
+            fields = [name for name in (title_field, body_field) if name]
+            batch, counts[kind] = [], 0
+            for instance in model.objects.only(model._meta.pk.name, *fields).iterator(chunk_size=batch_size):
+                title, body = document_text(instance)
+                if title or body:
+                    batch.append(SearchDocument(kind=kind, object_id=instance.pk, title=title, body=body))
+                if len(batch) >= batch_size:
+                    counts[kind] += len(SearchDocument.objects.bulk_create(batch))
+                    batch = []
+            counts[kind] += len(SearchDocument.objects.bulk_create(batch))
+        get_backend().after_rebuild()
+    return counts
+
+
+def query_terms(query):
+    """Lower-cased words of a user query, capped at ``MAX_TERMS``"""
+    return re.findall(r'[^\W_]+', query.lower())[:MAX_TERMS]
+
+
+def _highlight(text):
+    return html.escape(text or '').replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+
+def _only_filter(only, kind_column, id_column):
+    """SQL keeping, for each kind of ``only``, the documents whose object is in its queryset"""
+    clauses, params = [], []
+    for kind, queryset in (only or {}).items():
+        try:
+            subquery, subparams = queryset.values('pk').query.sql_with_params()
+        except EmptyResultSet:
+            clauses.append(f'AND {kind_column} <> %s')
+            params.append(kind)
+            continue
+        clauses.append(f'AND ({kind_column} <> %s OR {id_column} IN ({subquery}))')
+        params += [kind, *subparams]
+    return ' '.join(clauses), params
+
+
+class PostgresBackend:
+    """``tsvector`` column (title weighted above body) with a GIN index; ranked by ``ts_rank_cd``"""
+
+    headline_options = f'StartSel={_OPEN}, StopSel={_CLOSE}, MaxWords=35, MinWords=15, MaxFragments=2'
+
+    def search(self, terms, kinds, limit, offset, only=None):
+        # every term must match, each as a word prefix
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        kind_filter = 'AND kind = ANY(%s)' if kinds else ''
+        only_filter, only_params = _only_filter(only, 'kind', 'object_id')
+        # headlines are computed for the returned page only
+        sql = f"""
+            SELECT page.kind, page.object_id, page.rank,
+                   ts_headline('simple', page.title, page.query, %s),
+                   ts_headline('simple', page.body, page.query, %s)
+            FROM (
+                SELECT kind, object_id, title, body, query, ts_rank_cd(search_vector, query) AS rank, id
+                FROM search_documents, to_tsquery('simple', %s) query
+                WHERE search_vector @@ query {kind_filter} {only_filter}
+                ORDER BY rank DESC, id
+                LIMIT %s OFFSET %s
+            ) page
+            ORDER BY page.rank DESC, page.id
+        """
+        params = [self.headline_options, self.headline_options, tsquery]
+        if kinds:
+            params.append(list(kinds))
+        params += [*only_params, limit, offset]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def after_rebuild(self):
+        pass
+
+
+class SQLiteBackend:
+    """External-content FTS5 table kept current by triggers; ranked by ``bm25``"""
+
+    # bm25 column weights: a title match counts four times a body match
+    title_weight, body_weight = 4.0, 1.0
+
+    def search(self, terms, kinds, limit, offset, only=None):
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        kind_filter = f"AND d.kind IN ({', '.join(['%s'] * len(kinds))})" if kinds else ''
+        only_filter, only_params = _only_filter(only, 'd.kind', 'd.object_id')
+        sql = f"""
+            SELECT d.kind, d.object_id, -bm25(search_documents_fts, %s, %s) AS rank,
+                   highlight(search_documents_fts, 0, %s, %s),
+                   snippet(search_documents_fts, 1, %s, %s, '…', 24)
+            FROM search_documents_fts
+            JOIN search_documents d ON d.id = search_documents_fts.rowid
+            WHERE search_documents_fts MATCH %s {kind_filter} {only_filter}
+            ORDER BY rank DESC, d.id
+            LIMIT %s OFFSET %s
+        """
+        params = [self.title_weight, self.body_weight, _OPEN, _CLOSE, _OPEN, _CLOSE, match, *kinds, *only_params, limit, offset]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def after_rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO search_documents_fts(search_documents_fts) VALUES ('rebuild')")
+            cursor.execute("INSERT INTO search_documents_fts(search_documents_fts) VALUES ('optimize')")
+
+
+_BACKENDS = {'postgresql': PostgresBackend, 'sqlite': SQLiteBackend}
+
+
+def get_backend():
+    """Full-text backend for the default database (PostgreSQL when POSTGRES_DB is set, else SQLite)"""
+    try:
+        return _BACKENDS[connection.vendor]()
+    except KeyError:
+        raise NotImplementedError(f'Full-text search is not available on {connection.vendor}')
+
+
+def search(query, kinds=(), limit=20, offset=0, only=None):
+    """Ranked documents matching every word of ``query`` (prefix match), with highlighted title and snippet
+
+    Args:
+        query: Free text; words are matched by prefix, all of them required
+        kinds: Restrict to these kinds of SOURCES (all when empty)
+        limit: Page size
+        offset: Rows to skip
+        only: ``{kind: queryset}`` - documents of these kinds are kept only
+            when their object is in the queryset (e.g. the caller's own requests)
+
+    Returns:
+        list[SearchHit]: Best match first; ``title``/``snippet`` are HTML-escaped with ``<mark>`` around matches
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    rows = get_backend().search(terms, list(kinds), limit, offset, only)
+    return [
+        SearchHit(kind, object_id, round(rank, 6), _highlight(title), _highlight(snippet))
+        for kind, object_id, rank, title, snippet in rows
+    ]
@@ -1,7 +1,10 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch, QuerySet
 from rest_framework import serializers
 from .models import (
     User, Admin, Company, Client, Freelancer,
-    Skill, Category, Review, FAQ, MediaFile, Report, Notification,
+    Skill, Category, Review, FAQ, MediaFile, Report, Notification, Broadcast,
     Help, JobInternshipOffer, Request,
     Negotiation, NegotiationPhase, NegotiationFloatingComment,
     Project, ProjectPhase, Deliverable,
@@ -9,88 +12,326 @@ from .models import (
 )
 
 
-class UserSerializer(serializers.ModelSerializer):
+def parse_field_paths(value):
+    """Turn ``'id,negotiation.status'`` into ``{'id': {}, 'negotiation': {'status': {}}}``"""
+    if isinstance(value, str):
+        value = value.split(',')
+    tree = {}
+    for path in value:
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def get_sparse_spec(fields=None, expand=None, request=None):
+    """Return the ``(fields, expand)`` trees asked for, or None for the full representation
+
+    Explicit ``fields``/``expand`` arguments win over the ``?fields=``/``?expand=``
+    query params of ``request``. ``fields`` is None when every field is wanted.
+    """
+    if fields is None and expand is None and request is not None:
+        params = getattr(request, 'query_params', request.GET)
+        fields, expand = params.get('fields'), params.get('expand')
+    if fields is None and expand is None:
+        return None
+    return (parse_field_paths(fields) if fields is not None else None,
+            parse_field_paths(expand) if expand is not None else {})
+
+
+def get_nested_sparse_spec(name, sparse):
+    """Spec for the nested serializer field ``name``, or None when it renders as a primary key"""
+    fields, expand = sparse
+    nested_fields = (fields or {}).get(name) or None
+    if name not in expand and not nested_fields:
+        return None
+    return nested_fields, expand.get(name, {})
+
+
+class SparseFieldsMixin:
+    """Supports sparse fieldsets through ``?fields=`` and ``?expand=``.
+
+    Without either parameter the full representation is returned. Once one is
+    given the output is sparse: only the listed ``fields`` are kept (all of
+    them when omitted) and nested relations are rendered as primary keys
+    unless listed in ``expand`` or given sub-fields. Both take comma-separated,
+    dot-nested paths, e.g. ``?fields=id,status,negotiation.status``.
+
+    The parameters are read from ``context['request']``, or can be passed as
+    ``fields=``/``expand=`` keyword arguments. Fields left out of the output
+    stay writable so sparse responses never change what a PUT/POST accepts.
+    """
+    def __init__(self, *args, **kwargs):
+        fields, expand = kwargs.pop('fields', None), kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None or expand is not None:
+            self._sparse_spec = get_sparse_spec(fields, expand)
+
+    def get_sparse_spec(self):
+        if hasattr(self, '_sparse_spec'):
+            return self._sparse_spec
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            # nested serializers are configured by their parent
+            return None
+        return get_sparse_spec(request=self.context.get('request'))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse = self.get_sparse_spec()
+        if sparse is None:
+            return fields
+        only = sparse[0]
+        for name, field in list(fields.items()):
+            if field.write_only:
+                continue
+            if only is not None and name not in only:
+                if field.read_only:
+                    del fields[name]
+                else:
+                    field.write_only = True
+                continue
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, serializers.BaseSerializer) or field.source == '*':
+                continue
+            nested_sparse = get_nested_sparse_spec(name, sparse)
+            if nested_sparse is not None:
+                nested._sparse_spec = nested_sparse
+            else:
+                fields[name] = serializers.PrimaryKeyRelatedField(source=field.source, many=many, read_only=True)
+        return fields
+
+
+class EagerLoadingMixin:
+    """Lets a serializer declare the relations it reads.
+
+    Nested serializer fields contribute their own plan under their source path
+    (``select_related`` for single objects, a ``Prefetch`` for ``many=True``);
+    ``select_related_fields``/``prefetch_related_fields`` cover what cannot be
+    discovered from the declared fields, e.g. ``SerializerMethodField`` reads.
+
+    Querysets passed with ``many=True`` get the plan applied automatically;
+    detail views load their instance through ``setup_eager_loading``. With a
+    sparse spec (see ``SparseFieldsMixin``) only expanded relations are joined
+    and the selected columns are loaded with ``only()``.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def get_eager_loading_plan(cls, prefix='', sparse=None):
+        select = [prefix + path for path in cls.select_related_fields]
+        prefetch = [prefix + path for path in cls.prefetch_related_fields]
+        for name, field in cls._declared_fields.items():
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            source = field.source or name
+            if not isinstance(nested, EagerLoadingMixin) or source == '*':
+                continue
+            path = prefix + source.replace('.', '__')
+            nested_sparse = None
+            if sparse is not None:
+                if sparse[0] is not None and name not in sparse[0]:
+                    continue
+                nested_sparse = get_nested_sparse_spec(name, sparse)
+                if nested_sparse is None:
+                    if many:
+                        # rendered as a list of primary keys
+                        prefetch.append(path)
+                    continue
+            if many:
+                queryset = nested.setup_eager_loading(nested.Meta.model._default_manager.all(), nested_sparse)
+                prefetch.append(Prefetch(path, queryset=queryset))
+                continue
+            select.append(path)
+            nested_select, nested_prefetch = nested.get_eager_loading_plan(path + '__', nested_sparse)
+            select.extend(nested_select)
+            prefetch.extend(nested_prefetch)
+        return list(dict.fromkeys(select)), prefetch
+
+    @classmethod
+    def get_only_fields(cls, sparse, prefix=''):
+        """Columns needed to render ``sparse``, or None when they cannot be determined"""
+        only, expand = sparse
+        if only is None:
+            return None
+        opts = cls.Meta.model._meta
+        columns = [prefix + opts.pk.name] + [prefix + path for path in cls.select_related_fields]
+        for name in only:
+            field = cls._declared_fields.get(name)
+            if field is not None and field.write_only:
+                continue
+            source = field.source if field is not None and field.source else name
+            if '.' in source or source == '*' or isinstance(field, serializers.SerializerMethodField):
+                return None
+            try:
+                model_field = opts.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete:
+                # reverse relations are loaded by their prefetch
+                continue
+            columns.append(prefix + source)
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            nested_sparse = get_nested_sparse_spec(name, sparse) if isinstance(nested, EagerLoadingMixin) else None
+            if nested_sparse is not None:
+                columns.extend(nested.get_only_fields(nested_sparse, prefix + source + '__') or [])
+        return columns
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, sparse=None):
+        select, prefetch = cls.get_eager_loading_plan(sparse=sparse)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        columns = cls.get_only_fields(sparse) if sparse is not None else None
+        if columns is not None:
+            # keep the ordering columns loaded, keyset pagination reads them
+            ordering = [f.lstrip('-') for f in queryset.query.order_by if isinstance(f, str) and '__' not in f]
+            queryset = queryset.only(*columns, *ordering)
+        return queryset
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        context = kwargs.get('context') or {}
+        sparse = get_sparse_spec(kwargs.get('fields'), kwargs.get('expand'), context.get('request'))
+        if args and isinstance(args[0], QuerySet) and args[0]._result_cache is None:
+            args = (cls.setup_eager_loading(args[0], sparse),) + args[1:]
+        elif isinstance(kwargs.get('instance'), QuerySet) and kwargs['instance']._result_cache is None:
+            kwargs['instance'] = cls.setup_eager_loading(kwargs['instance'], sparse)
+        return super().many_init(*args, **kwargs)
+
+
+class ImageSizesField(serializers.ReadOnlyField):
+    """``{size: url}`` of the thumbnails in a ``*_sizes`` column; empty until the image job has run"""
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        urls = {}
+        for size, name in (value or {}).items():
+            url = default_storage.url(name)
+            urls[size] = request.build_absolute_uri(url) if request is not None else url
+        return urls
+
+
+class UserSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = '__all__'
+        extra_kwargs = {'password': {'write_only': True}}
 
 
-class AdminSerializer(serializers.ModelSerializer):
+class PublicUserSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    """Read-only user card embedded in other payloads.
+
+    Only plain columns of the ``users`` row are exposed, so a parent queryset
+    using ``select_related('<user fk>')`` serializes each user without extra
+    queries (no ``groups``/``user_permissions`` lookups, no password hash).
+    """
+    class Meta:
+        model = User
+        fields = ['id', 'first_name', 'last_name', 'email', 'role', 'is_active', 'created_at']
+        read_only_fields = fields
+
+
+class AdminSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = Admin
         fields = '__all__'
 
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    logo_sizes = ImageSizesField()
+
     class Meta:
         model = Company
         fields = '__all__'
 
 
-class ClientSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+class ClientSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    user = PublicUserSerializer(read_only=True)
+    profile_picture_sizes = ImageSizesField()
 
     class Meta:
         model = Client
         fields = '__all__'
 
-class FreelancerSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+class FreelancerSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    user = PublicUserSerializer(read_only=True)
+    profile_picture_sizes = ImageSizesField()
     
     class Meta:
         model = Freelancer
         fields = '__all__'
+        # maintained from the reviews (ratings.py)
+        read_only_fields = ('rate', 'rating_sum', 'rating_count')
 
 
-class FAQSerializer(serializers.ModelSerializer):
+class FAQSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = FAQ
         fields = '__all__'
 
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = Skill
         fields = '__all__'
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
 
-class ReviewSerializer(serializers.ModelSerializer):
-    client_id = ClientSerializer(read_only=True)
-    freelancer_id = FreelancerSerializer(read_only=True)
+class ReviewSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    client = ClientSerializer(read_only=True)
+    client_id = serializers.IntegerField(write_only=True)
+    freelancer = FreelancerSerializer(read_only=True)
+    freelancer_id = serializers.IntegerField(write_only=True)
+
     class Meta:
         model = Review
         fields = '__all__'
+        read_only_fields = ('is_deleted',)
 
 
-class MediaFileSerializer(serializers.ModelSerializer):
-    owner = UserSerializer(read_only=True)
+class MediaFileSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    owner = PublicUserSerializer(read_only=True)
     class Meta:
         model = MediaFile
         fields = '__all__'
 
 
-class ReportSerializer(serializers.ModelSerializer):
-    reporter = UserSerializer(read_only=True)
+class ReportSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    reporter = PublicUserSerializer(read_only=True)
     class Meta:
         model = Report
         fields = '__all__'
 
 
-class NotificationSerializer(serializers.ModelSerializer):
-    receiver = UserSerializer(read_only=True)
+class NotificationSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    receiver = PublicUserSerializer(read_only=True)
     class Meta:
         model = Notification
         fields = '__all__'
 
 
-class HelpSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+class BroadcastSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Broadcast
+        fields = ['id', 'content', 'audience', 'status', 'total', 'processed', 'error', 'created_at', 'finished_at']
+        read_only_fields = ['status', 'total', 'processed', 'error', 'created_at', 'finished_at']
+
+
+class HelpSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    user = PublicUserSerializer(read_only=True)
     user_id = serializers.IntegerField(write_only=True)
     
     class Meta:
@@ -98,7 +339,7 @@ class HelpSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'user_id', 'problem', 'created_at']
 
 
-class JobInternshipOfferSerializer(serializers.ModelSerializer):
+class JobInternshipOfferSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     company = CompanySerializer(read_only=True)
     company_id = serializers.IntegerField(write_only=True, required=False)
 
@@ -113,7 +354,7 @@ class JobInternshipOfferSerializer(serializers.ModelSerializer):
 
 
 
-class RequestSerializer(serializers.ModelSerializer):
+class RequestSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     client = ClientSerializer(read_only=True)
 
     class Meta:
@@ -121,37 +362,39 @@ class RequestSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class NegotiationSerializer(serializers.ModelSerializer):
-    request_id = RequestSerializer(read_only =True)
-    client_id = ClientSerializer(read_only =True)
-    freelancer_id = FreelancerSerializer(read_only =True)
-    declined_by = UserSerializer(read_only = True)
-
+class NegotiationSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    request = RequestSerializer(read_only=True)
+    request_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
+    client = ClientSerializer(read_only=True)
+    client_id = serializers.IntegerField(write_only=True)
+    freelancer = FreelancerSerializer(read_only=True)
+    freelancer_id = serializers.IntegerField(write_only=True)
+    declined_by = PublicUserSerializer(read_only=True)
 
     class Meta:
         model = Negotiation
         fields = '__all__'
 
 
-class NegotiationPhaseSerializer(serializers.ModelSerializer):
-    negotiation_id = NegotiationSerializer(read_only =True)
+class NegotiationPhaseSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    negotiation = NegotiationSerializer(read_only=True)
+    negotiation_id = serializers.IntegerField(write_only=True)
+
     class Meta:
         model = NegotiationPhase
         fields = '__all__'
 
 
-class NegotiationFloatingCommentSerializer(serializers.ModelSerializer):
-    negotiation_id = NegotiationSerializer(read_only =True)
-    user_id = UserSerializer(read_only = True)
-
-
+class NegotiationFloatingCommentSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    negotiation = NegotiationSerializer(read_only=True)
+    user = PublicUserSerializer(read_only=True)
 
     class Meta:
         model = NegotiationFloatingComment
         fields = '__all__'
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     negotiation = NegotiationSerializer(read_only=True)
 
     class Meta:
@@ -159,40 +402,61 @@ class ProjectSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ProjectPhaseSerializer(serializers.ModelSerializer):
+class ProjectPhaseSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     project = ProjectSerializer(read_only=True)
+    project_id = serializers.IntegerField(write_only=True)
+
     class Meta:
         model = ProjectPhase
         fields = '__all__'
 
 
-class DeliverableSerializer(serializers.ModelSerializer):
+class DeliverableSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     phase_detail = ProjectPhaseSerializer(source='phase', read_only=True)
     class Meta:
         model = Deliverable
         fields = '__all__'
 
 
+# Project read model: the project graph is embedded once at the top, phases and
+# deliverables only reference their parent by id.
+
+class DeliverableSummarySerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Deliverable
+        fields = '__all__'
+
+
+class ProjectPhaseSummarySerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    deliverables = DeliverableSummarySerializer(source='deliverable_items', many=True, read_only=True)
+
+    class Meta:
+        model = ProjectPhase
+        exclude = ['project']
+
+
+class ProjectDetailSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    negotiation = NegotiationSerializer(read_only=True)
+    phases = ProjectPhaseSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Project
+        fields = '__all__'
+
+
 # Community System Serializers =====================================================
 
-class CommunityPostSerializer(serializers.ModelSerializer):
-    owner = UserSerializer(read_only=True)
-    comments_count = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
+class CommunityPostSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    owner = PublicUserSerializer(read_only=True)
     
     class Meta:
         model = CommunityPost
         fields = ['id', 'owner', 'description', 'attachments', 'comments_count', 'likes_count', 'updated_at', 'created_at']
-    
-    def get_comments_count(self, obj):
-        return obj.comments.count()
-    
-    def get_likes_count(self, obj):
-        return obj.likes.count()
+        read_only_fields = ['comments_count', 'likes_count']
 
 
-class CommunityCommentSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+class CommunityCommentSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    user = PublicUserSerializer(read_only=True)
     replies_count = serializers.SerializerMethodField()
     
     class Meta:
@@ -200,11 +464,13 @@ class CommunityCommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'post', 'user', 'parent', 'comment', 'replies_count', 'updated_at', 'created_at']
     
     def get_replies_count(self, obj):
+        if hasattr(obj, 'loaded_replies_count'):
+            return obj.loaded_replies_count
         return obj.replies.count()
 
 
-class CommunityCommentDetailSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+class CommunityCommentDetailSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    user = PublicUserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
     replies_count = serializers.SerializerMethodField()
     
@@ -213,16 +479,21 @@ class CommunityCommentDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'post', 'user', 'parent', 'comment', 'replies', 'replies_count', 'updated_at', 'created_at']
     
     def get_replies(self, obj):
+        # Trees built by CommunityPost.comment_tree already hold their replies
+        if hasattr(obj, 'loaded_replies'):
+            return CommunityCommentDetailSerializer(obj.loaded_replies, many=True, context=self.context).data
         # Get child comments (replies) for this comment
         child_comments = obj.replies.all()
         return CommunityCommentSerializer(child_comments, many=True).data
     
     def get_replies_count(self, obj):
+        if hasattr(obj, 'loaded_replies_count'):
+            return obj.loaded_replies_count
         return obj.replies.count()
 
 
-class CommunityLikeSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+class CommunityLikeSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    user = PublicUserSerializer(read_only=True)
     
     class Meta:
         model = CommunityLike
@@ -0,0 +1,44 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBSessionStore
+
+
+class SessionStore(CachedDBSessionStore):
+    """Cache-first sessions (``cached_db``) with coalesced database writes
+
+    Reads are served from the cache and fall back to the database. Every save
+    refreshes the cache, but a save that leaves the session data unchanged only
+    reaches the database once per ``SESSION_DB_WRITE_INTERVAL`` seconds; those
+    saves just push the expiry forward, so the database copy (only read when
+    the cache lost the session) lags by at most that interval.
+    """
+    cache_key_prefix = 'platform_api.session'
+
+    @property
+    def _persisted_key(self):
+        return f'{self.cache_key}:persisted'
+
+    def _digest(self):
+        return hashlib.md5(self.serializer().dumps(self._get_session()), usedforsecurity=False).hexdigest()
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None:
+            super().save(must_create=must_create)
+            self._remember_persisted()
+            return
+        interval = getattr(settings, 'SESSION_DB_WRITE_INTERVAL', 60)
+        persisted = self._cache.get(self._persisted_key)
+        if persisted and persisted[0] == self._digest() and time.time() - persisted[1] < interval:
+            self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+            return
+        super().save(must_create=must_create)
+        self._remember_persisted()
+
+    def _remember_persisted(self):
+        self._cache.set(self._persisted_key, (self._digest(), time.time()), self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        self._cache.delete(f'{self.cache_key_prefix}{session_key or self.session_key}:persisted')
+        super().delete(session_key)
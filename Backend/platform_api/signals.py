@@ -0,0 +1,420 @@
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import images, jobs, notifications, ratings, search, stats
+from .auth import invalidate_user
+from .catalog_cache import bump_version
+from .events import hub
+from .freelancer_index import sync_freelancer
+from .models import (
+    FAQ, Admin, Category, Client, CommunityComment, CommunityLike, CommunityPost, Company, Freelancer, Negotiation,
+    NegotiationFloatingComment, NegotiationPhase, Notification, Project, ProjectPhase, Request, Review, Skill, User,
+)
+from .profile_cache import freelancer_profiles
+
+
+# ---------- Catalog cache invalidation ----------
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def skills_changed(sender, **kwargs):
+    bump_version('skills')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def categories_changed(sender, **kwargs):
+    bump_version('categories')
+
+
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=FAQ)
+def faq_changed(sender, **kwargs):
+    bump_version('faq')
+
+
+# ---------- Freelancer profile cache invalidation ----------
+@receiver(post_save, sender=Freelancer)
+@receiver(post_delete, sender=Freelancer)
+def freelancer_changed(sender, instance, **kwargs):
+    freelancer_profiles.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # the profile embeds the user card (name, is_active...)
+    if instance.role == 'freelancer':
+        freelancer_profiles.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    # reviews move the freelancer's rating
+    freelancer_profiles.invalidate(instance.freelancer_id)
+
+
+# ---------- Freelancer search index ----------
+@receiver(post_init, sender=Freelancer)
+def remember_index_terms(sender, instance, **kwargs):
+    # the skills/categories the index currently reflects (None when deferred)
+    instance._indexed_terms = (instance.__dict__.get('skills'), instance.__dict__.get('categories'))
+
+
+@receiver(post_save, sender=Freelancer)
+def freelancer_indexed(sender, instance, created, **kwargs):
+    terms = (instance.__dict__.get('skills'), instance.__dict__.get('categories'))
+    if created or terms != instance._indexed_terms:
+        sync_freelancer(instance)
+        instance._indexed_terms = terms
+
+
+# ---------- Full-text search documents ----------
+def remember_search_text(sender, instance, **kwargs):
+    instance._search_text = search.document_text(instance)
+
+
+def search_source_saved(sender, instance, created, **kwargs):
+    # saves that leave the indexed text alone (status changes...) cost nothing
+    text = search.document_text(instance)
+    if created or text != instance._search_text:
+        search.index_object(instance)
+        instance._search_text = text
+
+
+def search_source_deleted(sender, instance, **kwargs):
+    search.remove_object(instance)
+
+
+for _model in search.KIND_BY_MODEL:
+    post_init.connect(remember_search_text, sender=_model, dispatch_uid=f'search_init_{_model.__name__}')
+    post_save.connect(search_source_saved, sender=_model, dispatch_uid=f'search_saved_{_model.__name__}')
+    post_delete.connect(search_source_deleted, sender=_model, dispatch_uid=f'search_deleted_{_model.__name__}')
+
+
+# ---------- Image thumbnails ----------
+def _image_name(value):
+    return getattr(value, 'name', value) or ''
+
+
+def remember_image(sender, instance, **kwargs):
+    field, _ = images.IMAGE_FIELDS[sender.__name__]
+    # None when the column was deferred
+    instance._thumbnailed_image = _image_name(instance.__dict__[field]) if field in instance.__dict__ else None
+
+
+def image_before_save(sender, instance, **kwargs):
+    field, _ = images.IMAGE_FIELDS[sender.__name__]
+    if field not in instance.__dict__:
+        return
+    value = instance.__dict__[field]
+    # a fresh upload is only committed (and renamed) by the field after this signal
+    if getattr(value, '_committed', True) and _image_name(value) == instance._thumbnailed_image:
+        return
+    stale = instance.__dict__.get(f'{field}_sizes') or {}
+    setattr(instance, f'{field}_sizes', {})
+    instance._stale_thumbnails = list(stale.values())
+
+
+def image_saved(sender, instance, **kwargs):
+    field, _ = images.IMAGE_FIELDS[sender.__name__]
+    stale = instance.__dict__.pop('_stale_thumbnails', None)
+    if stale is None:
+        return
+    name = _image_name(getattr(instance, field))
+    if name:
+        jobs.enqueue(images.process, {'model': sender.__name__, 'pk': instance.pk, 'name': name})
+    if stale:
+        jobs.enqueue(images.discard, {'names': stale})
+    instance._thumbnailed_image = name
+
+
+def image_owner_deleted(sender, instance, **kwargs):
+    field, _ = images.IMAGE_FIELDS[sender.__name__]
+    stale = list((instance.__dict__.get(f'{field}_sizes') or {}).values())
+    if stale:
+        jobs.enqueue(images.discard, {'names': stale})
+
+
+for _model in (Freelancer, Client, Company):
+    post_init.connect(remember_image, sender=_model, dispatch_uid=f'image_init_{_model.__name__}')
+    pre_save.connect(image_before_save, sender=_model, dispatch_uid=f'image_pre_save_{_model.__name__}')
+    post_save.connect(image_saved, sender=_model, dispatch_uid=f'image_saved_{_model.__name__}')
+    post_delete.connect(image_owner_deleted, sender=_model, dispatch_uid=f'image_deleted_{_model.__name__}')
+
+
+# ---------- Dashboard counters ----------
+def row_created(sender, instance, created, **kwargs):
+    if created:
+        stats.increment(stats.ROW_COUNTERS[sender])
+
+
+def row_deleted(sender, instance, **kwargs):
+    stats.increment(stats.ROW_COUNTERS[sender], -1)
+
+
+for _model in stats.ROW_COUNTERS:
+    post_save.connect(row_created, sender=_model, dispatch_uid=f'stats_created_{_model.__name__}')
+    post_delete.connect(row_deleted, sender=_model, dispatch_uid=f'stats_deleted_{_model.__name__}')
+
+
+@receiver(post_init, sender=Request)
+@receiver(post_init, sender=Negotiation)
+def remember_status(sender, instance, **kwargs):
+    # the status the row is currently counted under (None when deferred)
+    instance._counted_status = instance.__dict__.get('status')
+
+
+@receiver(pre_save, sender=Request)
+@receiver(pre_save, sender=Negotiation)
+def load_counted_status(sender, instance, **kwargs):
+    if not instance._state.adding and instance._counted_status is None:
+        instance._counted_status = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Request)
+def request_counted(sender, instance, created, **kwargs):
+    before = [] if created else stats.request_counters(instance._counted_status)
+    stats.move(before, stats.request_counters(instance.status))
+    instance._counted_status = instance.status
+
+
+@receiver(post_delete, sender=Request)
+def request_uncounted(sender, instance, **kwargs):
+    stats.move(stats.request_counters(instance.status), [])
+
+
+@receiver(post_save, sender=Negotiation)
+def negotiation_counted(sender, instance, created, **kwargs):
+    before = None if created else instance._counted_status
+    after = instance.status
+    stats.move([] if created else stats.negotiation_counters(before), stats.negotiation_counters(after))
+    # a project is counted as declined through its negotiation
+    if not created and stats.project_counters(before) != stats.project_counters(after):
+        if Project.objects.filter(negotiation=instance).exists():
+            stats.move(stats.project_counters(before), stats.project_counters(after))
+    instance._counted_status = after
+
+
+@receiver(post_delete, sender=Negotiation)
+def negotiation_uncounted(sender, instance, **kwargs):
+    stats.move(stats.negotiation_counters(instance.status), [])
+
+
+def _negotiation_status(project):
+    return Negotiation.objects.filter(pk=project.negotiation_id).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Project)
+def project_counted(sender, instance, created, **kwargs):
+    if created:
+        stats.move([], stats.project_counters(_negotiation_status(instance)))
+
+
+@receiver(post_delete, sender=Project)
+def project_uncounted(sender, instance, **kwargs):
+    # runs before a cascading negotiation delete removes the negotiation row
+    stats.move(stats.project_counters(_negotiation_status(instance)), [])
+
+
+# ---------- Community post counters ----------
+def _bump_post(post_id, field, delta):
+    # clamped so a drifted counter cannot break the column's >= 0 check
+    CommunityPost.objects.filter(pk=post_id).update(**{field: Greatest(F(field) + delta, Value(0))})
+
+
+def _deleting_post(origin):
+    # rows removed by a post's own cascade: the counters go with the post
+    return getattr(origin, 'model', type(origin)) is CommunityPost
+
+
+@receiver(post_save, sender=CommunityLike)
+def like_added(sender, instance, created, **kwargs):
+    if created:
+        _bump_post(instance.post_id, 'likes_count', 1)
+
+
+@receiver(post_delete, sender=CommunityLike)
+def like_removed(sender, instance, origin=None, **kwargs):
+    if not _deleting_post(origin):
+        _bump_post(instance.post_id, 'likes_count', -1)
+
+
+@receiver(post_save, sender=CommunityComment)
+def comment_added(sender, instance, created, **kwargs):
+    if created:
+        _bump_post(instance.post_id, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=CommunityComment)
+def comment_removed(sender, instance, origin=None, **kwargs):
+    # replies deleted along with their parent each send their own signal
+    if not _deleting_post(origin):
+        _bump_post(instance.post_id, 'comments_count', -1)
+
+
+# ---------- Freelancer ratings ----------
+def _counted_review(instance):
+    # (freelancer, stars) the review contributes to the totals, None once soft-deleted
+    if instance.__dict__.get('is_deleted') or 'rating' not in instance.__dict__:
+        return None
+    return instance.freelancer_id, instance.rating
+
+
+@receiver(post_init, sender=Review)
+def remember_review(sender, instance, **kwargs):
+    instance._counted_review = _counted_review(instance)
+    instance._counted_loaded = 'rating' in instance.__dict__ and 'is_deleted' in instance.__dict__
+
+
+@receiver(pre_save, sender=Review)
+@receiver(pre_delete, sender=Review)
+def load_counted_review(sender, instance, **kwargs):
+    # before a delete too: a deferred instance can no longer load its fields once the row is gone
+    if not instance._state.adding and not (instance._counted_loaded and 'freelancer_id' in instance.__dict__):
+        row = sender.objects.filter(pk=instance.pk).values('freelancer_id', 'rating', 'is_deleted').first()
+        instance._counted_review = None if row is None or row['is_deleted'] else (row['freelancer_id'], row['rating'])
+        if row is not None and 'freelancer_id' not in instance.__dict__:
+            instance.freelancer_id = row['freelancer_id']
+
+
+def _move_rating(before, after):
+    if before == after:
+        return
+    if before and after and before[0] == after[0]:
+        ratings.apply(after[0], after[1] - before[1], 0)
+    else:
+        if before:
+            ratings.apply(before[0], -before[1], -1)
+        if after:
+            ratings.apply(after[0], after[1], 1)
+    # the cached user carries its freelancer profile, rate included
+    for freelancer_id in {counted[0] for counted in (before, after) if counted}:
+        invalidate_user(freelancer_id)
+
+
+@receiver(post_save, sender=Review)
+def review_counted(sender, instance, created, **kwargs):
+    after = _counted_review(instance)
+    _move_rating(None if created else instance._counted_review, after)
+    instance._counted_review, instance._counted_loaded = after, True
+
+
+@receiver(post_delete, sender=Review)
+def review_uncounted(sender, instance, origin=None, **kwargs):
+    counted = instance._counted_review
+    # reviews removed by their freelancer's own cascade go with the totals
+    if counted and getattr(origin, 'pk', None) == counted[0] and isinstance(origin, (Freelancer, User)):
+        return
+    _move_rating(counted, None)
+
+
+# ---------- Unread notification counters ----------
+# Bulk writes (broadcast fan-out, mark-all-read) adjust the counters themselves.
+@receiver(post_init, sender=Notification)
+def remember_seen(sender, instance, **kwargs):
+    instance._counted_seen = instance.__dict__.get('seen')
+
+
+@receiver(pre_save, sender=Notification)
+def load_counted_seen(sender, instance, **kwargs):
+    if not instance._state.adding and instance._counted_seen is None:
+        instance._counted_seen = sender.objects.filter(pk=instance.pk).values_list('seen', flat=True).first()
+
+
+@receiver(post_save, sender=Notification)
+def notification_counted(sender, instance, created, **kwargs):
+    if created:
+        if not instance.seen:
+            notifications.bump([instance.receiver_id], 1)
+    elif instance._counted_seen is not None and instance.seen != instance._counted_seen:
+        notifications.bump([instance.receiver_id], -1 if instance.seen else 1)
+    instance._counted_seen = instance.seen
+
+
+@receiver(pre_delete, sender=Notification)
+def load_deleted_seen(sender, instance, **kwargs):
+    # a deferred instance can no longer load its fields once the row is gone
+    if instance._counted_seen is None or 'receiver_id' not in instance.__dict__:
+        row = sender.objects.filter(pk=instance.pk).values('seen', 'receiver_id').first()
+        if row is not None:
+            instance._counted_seen, instance.receiver_id = row['seen'], row['receiver_id']
+
+
+@receiver(post_delete, sender=Notification)
+def notification_uncounted(sender, instance, origin=None, **kwargs):
+    # a deleted user takes its counter along
+    if isinstance(origin, User) and origin.pk == instance.receiver_id:
+        return
+    if instance._counted_seen is False:
+        notifications.bump([instance.receiver_id], -1)
+
+
+# ---------- Live events (SSE / long-poll) ----------
+# Published once the write commits, so a client never sees a rolled-back row.
+def _publish(user_ids, type, data):
+    transaction.on_commit(lambda: hub.publish([user_id for user_id in user_ids if user_id], type, data))
+
+
+@receiver(post_save, sender=Notification)
+def notification_published(sender, instance, created, **kwargs):
+    if created:
+        _publish([instance.receiver_id], 'notification', {
+            'id': instance.id, 'content': instance.content, 'seen': instance.seen,
+            'created_at': instance.created_at, 'broadcast': instance.broadcast_id,
+        })
+
+
+@receiver(post_save, sender=NegotiationFloatingComment)
+def negotiation_comment_published(sender, instance, created, **kwargs):
+    if created:
+        participants = Negotiation.objects.filter(id=instance.negotiation_id).values_list(
+            'client_id', 'freelancer_id').first() or ()
+        _publish(participants, 'negotiation_comment', {
+            'id': instance.id, 'negotiation': instance.negotiation_id, 'user': instance.user_id,
+            'parent': instance.parent_id, 'comment': instance.comment, 'created_at': instance.created_at,
+        })
+
+
+@receiver(post_init, sender=NegotiationPhase)
+@receiver(post_init, sender=ProjectPhase)
+def remember_phase_status(sender, instance, **kwargs):
+    instance._published_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=NegotiationPhase)
+@receiver(post_save, sender=ProjectPhase)
+def phase_status_published(sender, instance, created, **kwargs):
+    previous = None if created else instance._published_status
+    if created or (previous is not None and previous != instance.status):
+        if sender is NegotiationPhase:
+            parent, participants = 'negotiation', Negotiation.objects.filter(id=instance.negotiation_id)
+        else:
+            parent, participants = 'project', Negotiation.objects.filter(project__id=instance.project_id)
+        _publish(participants.values_list('client_id', 'freelancer_id').first() or (), 'phase_status', {
+            'id': instance.id, 'kind': parent, parent: getattr(instance, f'{parent}_id'),
+            'status': instance.status, 'previous': previous,
+        })
+    instance._published_status = instance.status
+
+
+# ---------- Cached request users ----------
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def auth_user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Admin)
+@receiver(post_delete, sender=Admin)
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+@receiver(post_save, sender=Freelancer)
+@receiver(post_delete, sender=Freelancer)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def auth_profile_changed(sender, instance, **kwargs):
+    # the cached user carries its role profile
+    invalidate_user(instance.user_id)
@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import (
+    Client, Company, Freelancer, JobInternshipOffer, Negotiation, Project, Request, StatCounter,
+)
+
+# counters that are a plain row count of one table
+ROW_COUNTERS = {
+    Freelancer: 'freelancers',
+    Client: 'clients',
+    Company: 'companies',
+    JobInternshipOffer: 'posted_jobs',
+}
+
+ACTIVE_REQUEST_STATUSES = ('pending', 'accepted')
+ACTIVE_NEGOTIATION_STATUSES = ('in_progress', 'agreed', 'completed')
+
+COUNTER_NAMES = [
+    *ROW_COUNTERS.values(),
+    'active_requests',
+    'active_negotiations', 'declined_negotiations',
+    'active_projects', 'declined_projects',
+]
+
+
+def request_counters(status):
+    """Counters a request with ``status`` is part of"""
+    return ['active_requests'] if status in ACTIVE_REQUEST_STATUSES else []
+
+
+def negotiation_counters(status):
+    """Counters a negotiation with ``status`` is part of"""
+    if status in ACTIVE_NEGOTIATION_STATUSES:
+        return ['active_negotiations']
+    return ['declined_negotiations'] if status == 'declined' else []
+
+
+def project_counters(negotiation_status):
+    """Counters a project whose negotiation has ``negotiation_status`` is part of"""
+    return ['declined_projects'] if negotiation_status == 'declined' else ['active_projects']
+
+
+def increment(name, delta=1):
+    """Atomically add ``delta`` to counter ``name``"""
+    if not StatCounter.objects.filter(name=name).update(value=F('value') + delta):
+        StatCounter.objects.get_or_create(name=name)
+        StatCounter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def move(before, after):
+    """Move one row from the counters in ``before`` to those in ``after``"""
+    for name in before:
+        if name not in after:
+            increment(name, -1)
+    for name in after:
+        if name not in before:
+            increment(name)
+
+
+def dashboard():
+    """Every counter in a single conditional aggregation over the counters table"""
+    return StatCounter.objects.aggregate(**{
+        name: Sum('value', filter=Q(name=name), default=0) for name in COUNTER_NAMES
+    })
+
+
+def compute_counters():
+    """Every counter recomputed from its source table, one aggregation per table"""
+    counters = {name: model.objects.count() for model, name in ROW_COUNTERS.items()}
+    counters['active_requests'] = Request.objects.filter(status__in=ACTIVE_REQUEST_STATUSES).count()
+    counters.update(Negotiation.objects.aggregate(
+        active_negotiations=Count('id', filter=Q(status__in=ACTIVE_NEGOTIATION_STATUSES)),
+        declined_negotiations=Count('id', filter=Q(status='declined')),
+    ))
+    counters.update(Project.objects.aggregate(
+        active_projects=Count('id', filter=~Q(negotiation__status='declined')),
+        declined_projects=Count('id', filter=Q(negotiation__status='declined')),
+    ))
+    return counters
+
+
+def recompute():
+    """Overwrite the counters table with freshly computed values and return them
+
+    The counter rows stay locked while the source tables are counted, so
+    concurrent increments wait instead of being overwritten.
+    """
+    with transaction.atomic():
+        list(StatCounter.objects.select_for_update())
+        counters = compute_counters()
+        for name, value in counters.items():
+            StatCounter.objects.update_or_create(name=name, defaults={'value': value})
+    return counters
@@ -0,0 +1,70 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .renderers import NDJSONRenderer
+from .serializers import get_sparse_spec
+
+
+STREAM_CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def stream_renderers():
+    """Renderers for a view that can stream: the defaults plus NDJSON, so that Accept header is not a 406"""
+    return [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+
+def get_stream_format(request):
+    """Streaming format asked for with ``?stream=json|ndjson`` (or an NDJSON Accept header), else None"""
+    fmt = request.query_params.get('stream')
+    if fmt is None:
+        accept = request.META.get('HTTP_ACCEPT', '')
+        return 'ndjson' if STREAM_CONTENT_TYPES['ndjson'] in accept else None
+    if fmt.lower() in ('1', 'true'):
+        return 'json'
+    return fmt.lower() if fmt.lower() in STREAM_CONTENT_TYPES else None
+
+
+def stream_queryset(request, queryset, serializer_class, fmt='json', chunk_size=1000):
+    """Stream ``queryset`` as a JSON array (or NDJSON) without materializing it
+
+    Rows are read ``chunk_size`` at a time (a server-side cursor on Postgres),
+    serialized one by one through a single serializer instance and flushed
+    once per chunk, so memory stays flat however large the table is.
+    """
+    queryset = serializer_class.setup_eager_loading(queryset, get_sparse_spec(request=request))
+    serializer = serializer_class(context={'request': request})
+
+    def encode(instance):
+        return json.dumps(serializer.to_representation(instance), cls=JSONEncoder,
+                          ensure_ascii=False, separators=(',', ':'))
+
+    def ndjson():
+        batch = []
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            batch.append(encode(instance) + '\n')
+            if len(batch) >= chunk_size:
+                yield ''.join(batch)
+                batch = []
+        if batch:
+            yield ''.join(batch)
+
+    def json_array():
+        yield '['
+        batch, first = [], True
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            batch.append(encode(instance))
+            if len(batch) >= chunk_size:
+                yield ('' if first else ',') + ','.join(batch)
+                batch, first = [], False
+        if batch:
+            yield ('' if first else ',') + ','.join(batch)
+        yield ']'
+
+    body = ndjson() if fmt == 'ndjson' else json_array()
+    return StreamingHttpResponse(body, content_type=STREAM_CONTENT_TYPES[fmt])
@@ -0,0 +1,84 @@
+import itertools
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import (
+    Client, Company, Deliverable, Freelancer, Negotiation, Project, ProjectPhase, Request, User,
+)
+
+_sequence = itertools.count(1)
+
+
+def make_user(role='client', **fields):
+    """A saved user with password ``pw``; the role profile is not created"""
+    fields.setdefault('email', f'{role}{next(_sequence)}@example.com')
+    fields.setdefault('first_name', 'First')
+    fields.setdefault('last_name', 'Last')
+    return User.objects.create_user(password='pw', role=role, **fields)
+
+
+def make_client(**fields):
+    return Client.objects.create(user=make_user('client'), **fields)
+
+
+def make_freelancer(**fields):
+    fields.setdefault('skills', ['python'])
+    fields.setdefault('categories', ['web'])
+    return Freelancer.objects.create(user=make_user('freelancer'), **fields)
+
+
+def make_company(**fields):
+    fields.setdefault('registration_number', f'RC-{next(_sequence)}')
+    return Company.objects.create(user=make_user('company'), **fields)
+
+
+def make_staff():
+    return make_user('admin', is_staff=True)
+
+
+def make_request(client=None, **fields):
+    fields.setdefault('title', 'Build a website')
+    fields.setdefault('category', 'web')
+    fields.setdefault('budget_min', 100)
+    fields.setdefault('budget_max', 500)
+    return Request.objects.create(client=client or make_client(), **fields)
+
+
+def make_project(client=None, freelancer=None, phases=2, deliverables=2):
+    """An agreed negotiation with its project, ``phases`` phases of ``deliverables`` deliverables each"""
+    client = client or make_client()
+    negotiation = Negotiation.objects.create(
+        origin_type='request', request=make_request(client), client=client,
+        freelancer=freelancer or make_freelancer(), status='agreed',
+    )
+    project = Project.objects.create(negotiation=negotiation, title='Project')
+    for index in range(phases):
+        phase = ProjectPhase.objects.create(project=project, title=f'Phase {index}')
+        for number in range(deliverables):
+            Deliverable.objects.create(phase=phase, title=f'Deliverable {number}')
+    return project
+
+
+# a fast hasher: the tests log in and set passwords a lot
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class APITestCase(TestCase):
+    """TestCase with an API client and an empty cache for every test"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.api = APIClient()
+
+    def login(self, user):
+        self.api.force_authenticate(user)
+        return user
+
+    def count_queries(self, path, **params):
+        """``(response, number of queries)`` of a GET to ``path``"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(path, params)
+        return response, len(queries)
@@ -0,0 +1,84 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from ..access import Access, negotiation_access, project_phase_access
+from ..models import Negotiation
+from .factories import APITestCase, make_client, make_project, make_staff, make_user
+
+
+class AccessTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = make_project(phases=2)
+        self.negotiation = self.project.negotiation
+        self.client_user = self.negotiation.client.user
+        self.freelancer_user = self.negotiation.freelancer.user
+        self.phase = self.project.phases.order_by('created_at').first()
+
+    def test_allows_matrix(self):
+        access = Access(None, self.client_user.id, self.freelancer_user.id)
+        cases = [
+            (self.client_user, None, True), (self.client_user, 'client', True),
+            (self.client_user, 'freelancer', False), (self.freelancer_user, 'freelancer', True),
+            (self.freelancer_user, 'client', False), (make_staff(), 'client', True),
+            (make_user(), None, False), (AnonymousUser(), None, False),
+        ]
+        for user, role, allowed in cases:
+            with self.subTest(user=user, role=role):
+                self.assertEqual(access.allows(user, role), allowed)
+
+    def test_one_query_and_memoized_per_request(self):
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(1):
+            access = project_phase_access(request, self.phase.pk)
+            self.assertIs(project_phase_access(request, self.phase.pk), access)
+        self.assertEqual(access.object.title, self.phase.title)
+        self.assertEqual((access.client_user_id, access.freelancer_user_id),
+                         (self.client_user.id, self.freelancer_user.id))
+        self.assertIsNone(negotiation_access(request, 999999))
+
+    def test_phase_of_another_project_is_not_found(self):
+        other = make_project()
+        self.login(self.client_user)
+        response = self.api.put(f'/projects/{other.pk}/phases/{self.phase.pk}/', {'title': 'moved'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_negotiation_views(self):
+        url = f'/negotiations/{self.negotiation.pk}/'
+        self.login(make_user())
+        self.assertEqual(self.api.get(url).status_code, 403)
+        self.assertEqual(self.api.post(url + 'agree/').status_code, 403)
+        self.assertEqual(self.api.post(url + 'decline/', {'reason': 'no'}).status_code, 403)
+        self.login(self.freelancer_user)
+        self.assertEqual(self.api.get(url).status_code, 200)
+        self.assertEqual(self.api.get('/negotiations/999999/').status_code, 404)
+
+    def test_decline_is_for_participants(self):
+        self.login(self.client_user)
+        response = self.api.post(f'/negotiations/{self.negotiation.pk}/decline/', {'reason': 'budget'})
+        self.assertEqual(response.status_code, 200)
+        negotiation = Negotiation.objects.get(pk=self.negotiation.pk)
+        self.assertEqual((negotiation.status, negotiation.declined_by_id), ('declined', self.client_user.id))
+
+    def test_agreement_needs_both_sides(self):
+        negotiation = Negotiation.objects.create(origin_type='direct_hire', client=self.negotiation.client,
+                                                 freelancer=self.negotiation.freelancer, status='in_progress')
+        url = f'/negotiations/{negotiation.pk}/agree/'
+        self.login(self.client_user)
+        self.assertEqual(self.api.post(url).data['status'], 'in_progress')
+        self.login(self.freelancer_user)
+        self.assertEqual(self.api.post(url).data['status'], 'agreed')
+
+    def test_phase_actions_are_role_specific(self):
+        base = f'/projects/phases/{self.phase.pk}/'
+        self.login(self.client_user)
+        self.assertEqual(self.api.post(base + 'start/').status_code, 403)
+        self.login(self.freelancer_user)
+        self.assertEqual(self.api.post(base + 'start/').data['status'], 'in_progress')
+        self.assertEqual(self.api.post(base + 'submit/').data['status'], 'waiting_client_review')
+        self.assertEqual(self.api.post(base + 'approve/').status_code, 403)
+        self.login(self.client_user)
+        self.assertEqual(self.api.post(base + 'approve/').data['status'], 'done')
+        self.assertEqual(self.api.post(base + 'next/').data['title'], 'Phase 1')
+        self.login(make_client().user)
+        self.assertEqual(self.api.post(base + 'reject/').status_code, 403)
@@ -0,0 +1,113 @@
+import time
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .. import auth
+from ..models import User
+from ..session_store import SessionStore
+from .factories import APITestCase, make_client
+
+REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}}
+PROTECTED = '/notifications/unread-count/'
+
+
+class CachedUserTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_client().user
+
+    def log_in(self):
+        response = self.api.post('/auth/login/', {'email': self.user.email, 'password': 'pw'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.api.get(PROTECTED).status_code, 200)
+
+    def test_deactivation_takes_effect_on_the_next_request(self):
+        self.log_in()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.api.get(PROTECTED).status_code, 403)
+
+    def test_password_change_ends_the_session_on_the_next_request(self):
+        self.log_in()
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertEqual(self.api.get(PROTECTED).status_code, 403)
+
+    @override_settings(AUTH_USER_LOCAL_CACHE_TTL=5)
+    def test_change_made_on_another_worker_is_seen_within_the_local_ttl(self):
+        self.log_in()
+        # a save on another worker: this process's cache is not told
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.api.get(PROTECTED).status_code, 200)
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=time.time() + 6):
+            self.assertEqual(self.api.get(PROTECTED).status_code, 403)
+
+    def test_profile_is_loaded_with_the_user(self):
+        auth.load_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = auth.load_user(self.user.pk)
+            self.assertEqual(auth.get_profile(user, 'client_profile').pk, self.user.pk)
+            self.assertIsNone(auth.get_profile(user, 'freelancer_profile'))
+
+    @override_settings(AUTH_USER_CACHE_TTL=300, AUTH_USER_LOCAL_CACHE_TTL=7)
+    def test_ttl_depends_on_the_cache_backend(self):
+        self.assertEqual(auth.user_cache_ttl(), 7)
+        with override_settings(CACHES=REDIS):
+            self.assertEqual(auth.user_cache_ttl(), 300)
+
+    @override_settings(AUTH_USER_LOCAL_CACHE_TTL=7)
+    def test_local_cache_keeps_users_for_the_short_ttl(self):
+        with mock.patch.object(auth.cache, 'set', wraps=cache.set) as cache_set:
+            auth.load_user(self.user.pk)
+        cache_set.assert_called_once_with(auth._user_key(self.user.pk), mock.ANY, 7)
+
+    @override_settings(AUTH_USER_LOCAL_CACHE_TTL=0)
+    def test_zero_ttl_turns_the_cache_off(self):
+        with self.assertNumQueries(2):
+            auth.load_user(self.user.pk)
+            auth.load_user(self.user.pk)
+
+    def test_missing_user(self):
+        self.assertIsNone(auth.load_user(999999))
+
+
+class SessionStoreTests(APITestCase):
+    def session_writes(self, store):
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+        return len([query for query in queries if 'django_session' in query['sql']])
+
+    @override_settings(SESSION_DB_WRITE_INTERVAL=60)
+    def test_unchanged_sessions_reach_the_database_once_per_interval(self):
+        store = SessionStore()
+        store['user'] = 1
+        store.save()
+        key = store.session_key
+        with self.assertNumQueries(0):
+            store.save()
+            store.save()
+        store['user'] = 2
+        self.assertEqual(self.session_writes(store), 1)
+        self.assertEqual(SessionStore(key).load(), {'user': 2})
+
+    def test_interval_elapsed_writes_again(self):
+        store = SessionStore()
+        store['user'] = 1
+        store.save()
+        persisted = cache.get(store._persisted_key)
+        cache.set(store._persisted_key, (persisted[0], persisted[1] - 3600))
+        self.assertEqual(self.session_writes(store), 1)
+
+    def test_delete_forgets_the_session_everywhere(self):
+        store = SessionStore()
+        store['user'] = 1
+        store.save()
+        key = store.session_key
+        store.delete()
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.assertEqual(SessionStore(key).load(), {})
@@ -0,0 +1,108 @@
+import uuid
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from .. import broadcasts, jobs, notifications
+from ..models import Broadcast, Notification, Skill
+from .factories import APITestCase, make_client, make_freelancer, make_project, make_staff
+
+
+class AudienceTests(APITestCase):
+    def audience(self, **filters):
+        return set(broadcasts.audience_queryset(filters).values_list('id', flat=True))
+
+    def test_filters_combine(self):
+        Skill.objects.create(name='python')
+        oran = make_client(wilaya='Oran')
+        make_client(wilaya='Alger')
+        coder = make_freelancer(wilaya='oran', skills=['python'])
+        make_freelancer(wilaya='Oran', skills=[])
+        self.assertEqual(self.audience(role='client', wilaya='ORAN'), {oran.pk})
+        self.assertEqual(self.audience(wilaya='oran', skill='Python'), {coder.pk})
+
+    def test_project_participants(self):
+        project = make_project()
+        make_client()
+        self.assertEqual(self.audience(project=project.pk),
+                         {project.negotiation.client_id, project.negotiation.freelancer_id})
+
+    def test_inactive_users_are_left_out(self):
+        client = make_client()
+        client.user.is_active = False
+        client.user.save()
+        self.assertEqual(self.audience(role='client'), set())
+
+    def test_invalid_audience(self):
+        for audience in ({'country': 'DZ'}, {'role': 'robot'}, {'skill': 'cobol'}, {'project': 999999}):
+            with self.subTest(audience=audience), self.assertRaises(broadcasts.AudienceError):
+                broadcasts.audience_queryset(audience)
+
+
+@override_settings(NOTIFICATION_BROADCASTS={'BATCH_SIZE': 2})
+class FanOutTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_staff()
+        self.clients = [make_client() for _ in range(5)]
+        self.client_ids = {client.pk for client in self.clients}
+
+    def unread(self):
+        return {client.pk: notifications.unread_count(client.pk) for client in self.clients}
+
+    def test_fan_out_in_batches(self):
+        broadcast, created = broadcasts.create('Maintenance tonight', {'role': 'client'}, self.admin)
+        self.assertTrue(created)
+        self.assertEqual(broadcast.total, 5)
+        jobs.work(burst=True)
+        broadcast.refresh_from_db()
+        self.assertEqual((broadcast.status, broadcast.processed, broadcast.total), ('done', 5, 5))
+        self.assertEqual(set(Notification.objects.filter(broadcast=broadcast).values_list('receiver_id', flat=True)),
+                         self.client_ids)
+        self.assertEqual(self.unread(), dict.fromkeys(self.client_ids, 1))
+
+    def test_resubmitting_an_id_is_a_no_op(self):
+        broadcast_id = uuid.uuid4()
+        first, created = broadcasts.create('Hello', {'role': 'client'}, self.admin, broadcast_id=broadcast_id)
+        again, created_again = broadcasts.create('Hello', {'role': 'client'}, self.admin, broadcast_id=broadcast_id)
+        self.assertEqual((first.pk, created, created_again), (again.pk, True, False))
+        self.assertEqual(jobs.depth()['queued'], 1)
+
+    def test_replayed_batch_does_not_notify_twice(self):
+        broadcast, _ = broadcasts.create('Hello', {'role': 'client'}, self.admin)
+        jobs.work(burst=True)
+        # a run interrupted after its inserts, before the checkpoint moved
+        Broadcast.objects.filter(pk=broadcast.pk).update(status='failed', last_user_id=0, processed=0)
+        self.assertTrue(broadcasts.run(broadcast.pk))
+        self.assertEqual(Notification.objects.filter(broadcast=broadcast).count(), 5)
+        self.assertEqual(self.unread(), dict.fromkeys(self.client_ids, 1))
+
+    def test_resume_from_the_checkpoint(self):
+        broadcast, _ = broadcasts.create('Hello', {'role': 'client'}, self.admin)
+        first_two = sorted(self.client_ids)[1]
+        Broadcast.objects.filter(pk=broadcast.pk).update(status='failed', last_user_id=first_two, processed=2)
+        out = StringIO()
+        call_command('resume_broadcasts', stdout=out)
+        self.assertIn(f'{broadcast.pk}: done, 5 recipient(s)', out.getvalue())
+        self.assertEqual(Notification.objects.filter(broadcast=broadcast).count(), 3)
+
+    def test_finished_broadcast_is_not_run_again(self):
+        broadcast, _ = broadcasts.create('Hello', {'role': 'client'}, self.admin)
+        jobs.work(burst=True)
+        self.assertFalse(broadcasts.run(broadcast.pk))
+
+    def test_api(self):
+        self.login(self.clients[0].user)
+        response = self.api.post('/notifications/broadcasts/', {'content': 'Hi', 'audience': {}}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.login(self.admin)
+        response = self.api.post('/notifications/broadcasts/', {'content': 'Hi', 'audience': {'role': 'robot'}},
+                                 format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.api.post('/notifications/broadcasts/', {'content': 'Hi', 'audience': {'role': 'client'}},
+                                 format='json')
+        self.assertEqual(response.status_code, 202)
+        jobs.work(burst=True)
+        detail = self.api.get(f"/notifications/broadcasts/{response.data['id']}/")
+        self.assertEqual((detail.data['status'], detail.data['processed']), ('done', 5))
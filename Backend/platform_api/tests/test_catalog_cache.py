@@ -0,0 +1,69 @@
+from django.db import transaction
+
+from .. import catalog_cache
+from ..models import FAQ, Category, Skill
+from .factories import APITestCase, make_staff
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        Skill.objects.create(name='python')
+        FAQ.objects.create(question='How?', answer='Like this')
+
+    def names(self, path):
+        return sorted(row.get('name') or row.get('question') for row in self.api.get(path).json())
+
+    def test_served_from_memory_after_the_first_request(self):
+        self.api.get('/skills/')
+        with self.assertNumQueries(0):
+            response = self.api.get('/skills/')
+        self.assertEqual(response.json()[0]['name'], 'python')
+
+    def test_writes_invalidate_on_commit(self):
+        self.assertEqual(self.names('/skills/'), ['python'])
+        with self.captureOnCommitCallbacks(execute=True):
+            skill = Skill.objects.create(name='django')
+        self.assertEqual(self.names('/skills/'), ['django', 'python'])
+        with self.captureOnCommitCallbacks(execute=True):
+            skill.name = 'flask'
+            skill.save()
+        self.assertEqual(self.names('/skills/'), ['flask', 'python'])
+        with self.captureOnCommitCallbacks(execute=True):
+            skill.delete()
+        self.assertEqual(self.names('/skills/'), ['python'])
+
+    def test_rolled_back_write_keeps_the_version(self):
+        version = catalog_cache.get_version('categories')
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Category.objects.create(name='design')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(catalog_cache.get_version('categories'), version)
+
+    def test_bump_from_another_process_rebuilds(self):
+        before = catalog_cache.get_catalog('faq')
+        # what a commit in another process does to the shared version token
+        catalog_cache.cache.set(catalog_cache._version_key('faq'), 'elsewhere', timeout=None)
+        FAQ.objects.create(question='Who?', answer='Us')
+        after = catalog_cache.get_catalog('faq')
+        self.assertNotEqual(before.digest, after.digest)
+        self.assertEqual(len(after.data), 2)
+
+    def test_admin_endpoints_invalidate(self):
+        self.login(make_staff())
+        self.assertEqual(self.names('/faq/'), ['How?'])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post('/admin/faq/', {'question': 'Why?', 'answer': 'Because'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.names('/faq/'), ['How?', 'Why?'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.delete(f"/admin/faq/{response.data['id']}/")
+        self.assertEqual(self.names('/faq/'), ['How?'])
+
+    def test_sparse_fields_bypass_the_rendered_body(self):
+        response = self.api.get('/skills/', {'fields': 'name'})
+        self.assertEqual(response.json(), [{'name': 'python'}])
@@ -0,0 +1,62 @@
+from ..models import CommunityComment, CommunityPost
+from .factories import APITestCase, make_user
+
+
+class CommentTreeTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.login(make_user())
+        self.post = CommunityPost.objects.create(owner=self.user, description='Thread')
+        # first
+        # ├── reply 1
+        # │   └── reply 1.1
+        # └── reply 2
+        # second
+        self.first = self.comment('first')
+        self.reply1 = self.comment('reply 1', self.first)
+        self.reply11 = self.comment('reply 1.1', self.reply1)
+        self.reply2 = self.comment('reply 2', self.first)
+        self.second = self.comment('second')
+
+    def comment(self, text, parent=None):
+        return CommunityComment.objects.create(post=self.post, user=self.user, parent=parent, comment=text)
+
+    def url(self):
+        return f'/community/posts/{self.post.pk}/comments/'
+
+    def test_tree_is_built_in_memory(self):
+        with self.assertNumQueries(1):
+            tree = self.post.comment_tree()
+            self.assertEqual([node.comment for node in tree], ['first', 'second'])
+            self.assertEqual([node.comment for node in tree[0].loaded_replies], ['reply 1', 'reply 2'])
+            self.assertEqual(tree[0].loaded_replies[0].loaded_replies[0].comment, 'reply 1.1')
+            self.assertEqual(tree[0].loaded_replies_count, 2)
+
+    def test_thread_costs_the_same_whatever_its_size(self):
+        _, before = self.count_queries(self.url())
+        for index in range(5):
+            self.comment(f'deep {index}', self.reply11)
+        response, after = self.count_queries(self.url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(before, after)
+        self.assertEqual(response.data[0]['replies'][0]['replies'][0]['replies_count'], 5)
+
+    def test_depth_limits_levels_but_keeps_counts(self):
+        response = self.api.get(self.url(), {'depth': 1})
+        self.assertEqual(response.data[0]['replies'], [])
+        self.assertEqual(response.data[0]['replies_count'], 2)
+
+    def test_page_size_limits_each_level(self):
+        response = self.api.get(self.url(), {'page_size': 1})
+        self.assertEqual([comment['comment'] for comment in response.data], ['first'])
+        self.assertEqual([reply['comment'] for reply in response.data[0]['replies']], ['reply 1'])
+
+    def test_subtree(self):
+        response = self.api.get(self.url(), {'parent_id': self.reply1.pk})
+        self.assertEqual([comment['comment'] for comment in response.data], ['reply 1.1'])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.api.get(self.url(), {'depth': 'x'}).status_code, 400)
+        other = CommunityPost.objects.create(owner=self.user, description='Other')
+        stranger = CommunityComment.objects.create(post=other, user=self.user, comment='elsewhere')
+        self.assertEqual(self.api.get(self.url(), {'parent_id': stranger.pk}).status_code, 404)
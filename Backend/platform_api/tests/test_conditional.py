@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.http import http_date
+
+from ..models import Deliverable, Skill
+from .factories import APITestCase, make_client, make_company, make_freelancer, make_project
+
+
+class ConditionalGetTests(APITestCase):
+    def revalidate(self, path, etag, **params):
+        return self.api.get(path, params, HTTP_IF_NONE_MATCH=etag)
+
+    def assertRevalidates(self, path):
+        """The first GET carries an ETag that answers 304 until the resource changes; returns the ETag"""
+        response = self.api.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('no-cache', response['Cache-Control'])
+        not_modified = self.revalidate(path, response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        return response['ETag']
+
+    def test_client_profile(self):
+        client = make_client(city='Oran')
+        path = f'/clients/{client.pk}/'
+        etag = self.assertRevalidates(path)
+        # a revalidation is answered from one validator query
+        with self.assertNumQueries(1):
+            self.revalidate(path, etag)
+        client.city = 'Alger'
+        client.save()
+        self.assertEqual(self.revalidate(path, etag).status_code, 200)
+
+    def test_client_user_change_is_a_change(self):
+        client = make_client()
+        path = f'/clients/{client.pk}/'
+        etag = self.assertRevalidates(path)
+        client.user.first_name = 'Renamed'
+        client.user.save()
+        response = self.revalidate(path, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['first_name'], 'Renamed')
+
+    def test_freelancer_profile(self):
+        freelancer = make_freelancer()
+        path = f'/freelancers/{freelancer.pk}/'
+        etag = self.assertRevalidates(path)
+        freelancer.description = 'Now with a bio'
+        with self.captureOnCommitCallbacks(execute=True):
+            freelancer.save()
+        self.assertEqual(self.revalidate(path, etag).status_code, 200)
+
+    def test_company_profile_and_last_modified(self):
+        company = make_company()
+        path = f'/companies/{company.pk}/'
+        self.assertRevalidates(path)
+        future = http_date((timezone.now() + timedelta(minutes=1)).timestamp())
+        self.assertEqual(self.api.get(path, HTTP_IF_MODIFIED_SINCE=future).status_code, 304)
+        past = http_date((timezone.now() - timedelta(days=1)).timestamp())
+        self.assertEqual(self.api.get(path, HTTP_IF_MODIFIED_SINCE=past).status_code, 200)
+
+    def test_project_detail_sees_child_edits_and_deletions(self):
+        project = make_project(phases=2, deliverables=2)
+        self.login(project.negotiation.client.user)
+        path = f'/projects/{project.pk}/'
+        etag = self.assertRevalidates(path)
+
+        deliverable = Deliverable.objects.filter(phase__project=project).first()
+        deliverable.textcontent = 'done'
+        deliverable.save()
+        edited = self.revalidate(path, etag)
+        self.assertEqual(edited.status_code, 200)
+
+        # a deletion never moves max(updated_at); the row count catches it
+        Deliverable.objects.filter(phase__project=project).exclude(pk=deliverable.pk).first().delete()
+        self.assertEqual(self.revalidate(path, edited['ETag']).status_code, 200)
+
+    def test_project_detail_checks_access_before_answering_304(self):
+        project = make_project()
+        self.login(project.negotiation.client.user)
+        etag = self.api.get(f'/projects/{project.pk}/')['ETag']
+        self.login(make_client().user)
+        self.assertEqual(self.revalidate(f'/projects/{project.pk}/', etag).status_code, 403)
+
+    def test_variants_have_their_own_etag(self):
+        client = make_client()
+        path = f'/clients/{client.pk}/'
+        full = self.api.get(path)['ETag']
+        sparse = self.api.get(path, {'fields': 'user'})['ETag']
+        self.assertNotEqual(full, sparse)
+        self.assertEqual(self.revalidate(path, full, fields='user').status_code, 200)
+
+    def test_catalog(self):
+        Skill.objects.create(name='django')
+        etag = self.assertRevalidates('/skills/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='react')
+        response = self.revalidate('/skills/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
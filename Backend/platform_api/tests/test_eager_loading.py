@@ -0,0 +1,38 @@
+from ..models import Negotiation, Project
+from ..serializers import NegotiationSerializer, ProjectSerializer
+from .factories import APITestCase, make_client, make_freelancer, make_project
+
+
+class EagerLoadingTests(APITestCase):
+    def test_negotiation_plan_follows_nested_serializers(self):
+        queryset = NegotiationSerializer.setup_eager_loading(Negotiation.objects.all())
+        self.assertTrue(queryset.query.select_related)
+        self.assertIn('client', queryset.query.select_related)
+        self.assertIn('freelancer', queryset.query.select_related)
+
+    def test_project_list_costs_the_same_for_one_or_many_projects(self):
+        client = make_client()
+        self.login(client.user)
+        make_project(client)
+        _, one = self.count_queries(f'/projects/user/{client.pk}/')
+        for _ in range(4):
+            make_project(client, make_freelancer())
+        response, many = self.count_queries(f'/projects/user/{client.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(one, many)
+
+    def test_negotiation_detail_renders_related_objects(self):
+        project = make_project()
+        negotiation = project.negotiation
+        self.login(negotiation.client.user)
+        response = self.api.get(f'/negotiations/{negotiation.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['client']['user']['id'], negotiation.client.pk)
+        self.assertEqual(response.data['freelancer']['user']['id'], negotiation.freelancer.pk)
+        self.assertEqual(response.data['request']['id'], negotiation.request_id)
+        self.assertEqual([phase['title'] for phase in response.data['phases']], ['Initial Phase'])
+
+    def test_project_plan_reaches_the_negotiation(self):
+        queryset = ProjectSerializer.setup_eager_loading(Project.objects.all())
+        self.assertIn('negotiation', queryset.query.select_related)
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase
+
+from .. import events, tokens
+from ..models import Notification
+from .factories import APITestCase, make_user
+
+
+class EventHubTests(SimpleTestCase):
+    def setUp(self):
+        self.hub = events.EventHub(buffer_size=10, queue_size=2)
+
+    def test_ids_increase(self):
+        first = self.hub.publish([1], 'ping', {})
+        second = self.hub.publish([1], 'ping', {})
+        self.assertGreater(second.id, first.id)
+
+    def test_since_replays_the_user_events_after_the_cursor(self):
+        first = self.hub.publish([1, 2], 'a', {})
+        second = self.hub.publish([1], 'b', {})
+        self.hub.publish([2], 'c', {})
+        self.assertEqual(self.hub.since(1, 0), [first, second])
+        self.assertEqual(self.hub.since(1, first.id), [second])
+        self.assertEqual(self.hub.head(), self.hub.since(2, first.id)[-1].id)
+
+    def test_replay_buffer_is_bounded(self):
+        for _ in range(15):
+            self.hub.publish([1], 'ping', {})
+        self.assertEqual(len(self.hub.since(1, 0)), 10)
+
+    async def test_slow_subscriber_loses_its_oldest_events(self):
+        subscription = self.hub.subscribe(1)
+        published = [self.hub.publish([1], 'ping', {'n': n}) for n in range(3)]
+        await asyncio.sleep(0)
+        self.assertEqual([subscription.queue.get_nowait(), subscription.queue.get_nowait()], published[1:])
+        self.assertEqual(subscription.dropped, 1)
+        self.hub.unsubscribe(subscription)
+        self.assertEqual(self.hub.connected_users(), set())
+
+    async def test_wait_returns_the_next_event(self):
+        cursor = self.hub.head()
+        with mock.patch.object(events, 'hub', self.hub):
+            waiting = asyncio.ensure_future(events.wait_for_events(1, cursor, timeout=5))
+            await asyncio.sleep(0)
+            self.assertEqual(self.hub.connected_users(), {1})
+            event = self.hub.publish([1], 'ping', {})
+            self.assertEqual(await waiting, [event])
+            self.assertEqual(await events.wait_for_events(1, event.id, timeout=0), [])
+        self.assertEqual(self.hub.stats()['streams'], 0)
+
+    async def test_stream_replays_then_sends_live_events(self):
+        old = self.hub.publish([1], 'old', {'n': 1})
+        with mock.patch.object(events, 'hub', self.hub):
+            frames = events.stream(1, last_event_id=old.id - 1)
+            self.assertEqual(await anext(frames), 'retry: 3000\n\n')
+            self.assertEqual(await anext(frames), f'id: {old.id}\nevent: old\ndata: {{"n":1}}\n\n')
+            live = asyncio.ensure_future(anext(frames))
+            await asyncio.sleep(0)
+            new = self.hub.publish([1], 'new', {'n': 2})
+            self.assertEqual(await live, f'id: {new.id}\nevent: new\ndata: {{"n":2}}\n\n')
+            await frames.aclose()
+        self.assertEqual(self.hub.connected_users(), set())
+
+
+class EventPollTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.auth = {'Authorization': f"Bearer {tokens.issue_tokens(self.user)['access']}"}
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get('/events/poll/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/events/poll/', headers={'Authorization': 'Bearer forged'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_cursor_then_new_notifications(self):
+        response = await self.async_client.get('/events/poll/', headers=self.auth)
+        cursor = json.loads(response.content)['cursor']
+
+        def notify():
+            with self.captureOnCommitCallbacks(execute=True):
+                return Notification.objects.create(receiver=self.user, content='Your offer was accepted')
+
+        notification = await sync_to_async(notify)()
+        response = await self.async_client.get('/events/poll/', {'since': cursor, 'timeout': 0}, headers=self.auth)
+        body = json.loads(response.content)
+        self.assertEqual([(event['type'], event['data']['id']) for event in body['events']],
+                         [('notification', notification.pk)])
+        self.assertEqual(body['cursor'], body['events'][-1]['id'])
+
+    async def test_invalid_timeout(self):
+        response = await self.async_client.get('/events/poll/', {'since': 1, 'timeout': 'soon'}, headers=self.auth)
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,77 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from .. import freelancer_index
+from ..models import Category, Freelancer, FreelancerCategory, FreelancerSkill, Skill
+from .factories import APITestCase, make_freelancer
+
+SEARCH = '/freelancers/search/'
+
+
+class FreelancerIndexTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.python = Skill.objects.create(name='Python')
+        self.django = Skill.objects.create(name='Django')
+        self.web = Category.objects.create(name='Web')
+
+    def indexed_skills(self, freelancer):
+        return set(FreelancerSkill.objects.filter(freelancer_id=freelancer.pk).values_list('skill_id', flat=True))
+
+    def found(self, **params):
+        response = self.api.get(SEARCH, params)
+        self.assertEqual(response.status_code, 200)
+        return {row['user']['id'] for row in response.data['results']}
+
+    def test_terms_by_id_or_name(self):
+        self.assertEqual(freelancer_index.parse_terms([1, ' Python ', '2', True, '']), ({1, 2}, {'python'}))
+        self.assertEqual(freelancer_index.parse_terms('django,3'), ({3}, {'django'}))
+        self.assertEqual(freelancer_index.resolve_terms(Skill, ['python', self.django.pk, 'cobol']),
+                         {self.python.pk, self.django.pk})
+
+    def test_saving_a_freelancer_syncs_the_index(self):
+        freelancer = make_freelancer(skills=['python'], categories=['web'])
+        self.assertEqual(self.indexed_skills(freelancer), {self.python.pk})
+        self.assertTrue(FreelancerCategory.objects.filter(freelancer_id=freelancer.pk, category=self.web).exists())
+        freelancer.skills = ['django']
+        freelancer.save()
+        self.assertEqual(self.indexed_skills(freelancer), {self.django.pk})
+
+    def test_unrelated_save_leaves_the_index_alone(self):
+        freelancer = make_freelancer(skills=['python'])
+        freelancer = Freelancer.objects.get(pk=freelancer.pk)
+        freelancer.city = 'Oran'
+        with self.assertNumQueries(1):
+            freelancer.save(update_fields=['city'])
+
+    def test_search_matches_any_or_all_skills(self):
+        both = make_freelancer(skills=['python', 'django'])
+        python = make_freelancer(skills=['python'])
+        make_freelancer(skills=['rust'])
+        self.assertEqual(self.found(skills='python,django'), {both.pk, python.pk})
+        self.assertEqual(self.found(skills=f'python,{self.django.pk}', skills_mode='all'), {both.pk})
+
+    def test_search_combines_filters(self):
+        web = make_freelancer(skills=['python'], categories=['web'], wilaya='Alger', years_experience=5)
+        make_freelancer(skills=['python'], categories=['web'], wilaya='Oran', years_experience=5)
+        make_freelancer(skills=['python'], categories=[], wilaya='Alger', years_experience=5)
+        self.assertEqual(self.found(skills='python', categories='web', wilaya='Alger', min_experience=3), {web.pk})
+        self.assertEqual(self.found(skills='python', categories='web', wilaya='Alger', min_experience=6), set())
+
+    def test_unknown_term_matches_nothing(self):
+        make_freelancer(skills=['python'])
+        self.assertEqual(self.found(skills='cobol'), set())
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.api.get(SEARCH, {'skills_mode': 'some'}).status_code, 400)
+        self.assertEqual(self.api.get(SEARCH, {'min_rate': 'cheap'}).status_code, 400)
+
+    def test_rebuild_picks_up_new_catalog_names(self):
+        freelancer = make_freelancer(skills=['python', 'flask'])
+        self.assertEqual(self.indexed_skills(freelancer), {self.python.pk})
+        flask = Skill.objects.create(name='Flask')
+        out = StringIO()
+        call_command('rebuild_freelancer_index', batch_size=1, stdout=out)
+        self.assertIn('Indexed 1 freelancer(s)', out.getvalue())
+        self.assertEqual(self.indexed_skills(freelancer), {self.python.pk, flask.pk})
@@ -0,0 +1,158 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from .. import images, jobs
+from ..models import Company, Freelancer
+from .factories import APITestCase, make_company, make_freelancer
+
+
+def image_bytes(size=(40, 20), mode='RGB', format='JPEG', **save_options):
+    buffer = BytesIO()
+    Image.new(mode, size, 'red' if mode == 'RGB' else (255, 0, 0, 0)).save(buffer, format, **save_options)
+    return buffer.getvalue()
+
+
+def rotated_photo():
+    """A 40x20 JPEG whose EXIF says to display it turned a quarter (20x40), with GPS data and an ICC profile"""
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotate 90° clockwise
+    exif[0x8825] = {1: 'N', 2: (36.0, 45.0, 0.0)}  # GPS latitude
+    return image_bytes(exif=exif, icc_profile=b'\0' * 128)
+
+
+class ImagesTestCase(APITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root, IMAGES={'SIZES': (16, 64)})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def store(self, name, content):
+        return default_storage.save(name, ContentFile(content))
+
+    def open(self, name):
+        with default_storage.open(name, 'rb') as stored:
+            image = Image.open(BytesIO(stored.read()))
+            image.load()
+            return image
+
+
+class MakeThumbnailsTests(ImagesTestCase):
+    def test_exif_orientation_is_applied(self):
+        sizes = images.make_thumbnails(self.store('photo.jpg', rotated_photo()), fit='contain')
+        self.assertEqual(self.open(sizes['16']).size, (8, 16))
+
+    def test_metadata_is_stripped(self):
+        sizes = images.make_thumbnails(self.store('photo.jpg', rotated_photo()))
+        for name in sizes.values():
+            thumbnail = self.open(name)
+            self.assertEqual(thumbnail.format, 'WEBP')
+            self.assertFalse(thumbnail.getexif())
+            self.assertNotIn('icc_profile', thumbnail.info)
+
+    def test_photos_are_squares_and_never_upscaled(self):
+        sizes = images.make_thumbnails(self.store('photo.jpg', image_bytes((100, 30))))
+        self.assertEqual({size: self.open(name).size for size, name in sizes.items()},
+                         {'16': (16, 16), '64': (30, 30)})
+
+    def test_contain_keeps_the_shape_and_transparency(self):
+        name = self.store('logo.png', image_bytes((40, 20), mode='RGBA', format='PNG'))
+        sizes = images.make_thumbnails(name, fit='contain')
+        small, large = self.open(sizes['16']), self.open(sizes['64'])
+        self.assertEqual((small.size, large.size), ((16, 8), (40, 20)))
+        self.assertEqual(large.mode, 'RGBA')
+        self.assertEqual(large.getchannel('A').getextrema(), (0, 0))
+
+    def test_rerendering_replaces_the_files(self):
+        name = self.store('photo.jpg', image_bytes())
+        self.assertEqual(images.make_thumbnails(name), images.make_thumbnails(name))
+
+
+class ProcessTests(ImagesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = make_company()
+
+    def set_logo(self, content, name='Company_logos/logo.png'):
+        self.company.logo = self.store(name, content)
+        self.company.save()
+        return self.company.logo.name
+
+    def test_saving_an_image_queues_its_thumbnails(self):
+        name = self.set_logo(image_bytes(format='PNG'))
+        jobs.work(burst=True)
+        sizes = Company.objects.get(pk=self.company.pk).logo_sizes
+        self.assertEqual(set(sizes), {'16', '64'})
+        self.assertTrue(all(default_storage.exists(path) for path in sizes.values()))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_result_for_a_replaced_image_is_dropped(self):
+        old = self.set_logo(image_bytes(format='PNG'))
+        render = images.make_thumbnails
+        rendered = []
+
+        def replaced_meanwhile(name, fit='cover'):
+            # a new upload lands while the old image is being rendered
+            Company.objects.filter(pk=self.company.pk).update(logo='Company_logos/new.png')
+            rendered.append(render(name, fit))
+            return rendered[-1]
+
+        with mock.patch('platform_api.images.make_thumbnails', side_effect=replaced_meanwhile):
+            jobs.work(burst=True)
+        self.assertEqual(len(rendered), 1)
+        self.assertEqual(Company.objects.get(pk=self.company.pk).logo_sizes, {})
+        self.assertFalse(any(default_storage.exists(path) for path in rendered[0].values()))
+        self.assertTrue(default_storage.exists(old))
+
+    def test_replacing_an_image_discards_the_old_thumbnails(self):
+        self.set_logo(image_bytes(format='PNG'))
+        jobs.work(burst=True)
+        self.company.refresh_from_db()
+        old_sizes = self.company.logo_sizes
+        self.set_logo(image_bytes(format='PNG'), name='Company_logos/other.png')
+        jobs.work(burst=True)
+        self.assertFalse(any(default_storage.exists(path) for path in old_sizes.values()))
+        self.assertNotEqual(Company.objects.get(pk=self.company.pk).logo_sizes, old_sizes)
+
+    def test_undecodable_file_is_not_retried(self):
+        self.set_logo(b'not an image')
+        with self.assertLogs('platform_api.images', 'WARNING'):
+            jobs.work(burst=True)
+        self.assertFalse(jobs.depth()['failed'])
+        self.assertEqual(Company.objects.get(pk=self.company.pk).logo_sizes, {})
+
+
+class UploadPhotoTests(ImagesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.freelancer = make_freelancer()
+        self.login(self.freelancer.user)
+        self.url = f'/freelancers/{self.freelancer.pk}/upload-photo/'
+
+    def test_non_images_are_refused(self):
+        for upload in (SimpleUploadedFile('cv.pdf', b'%PDF-1.4 not a picture'),
+                       SimpleUploadedFile('photo.jpg', image_bytes()[:40])):
+            with self.subTest(name=upload.name):
+                response = self.api.post(self.url, {'photo': upload}, format='multipart')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Freelancer.objects.get(pk=self.freelancer.pk).profile_picture)
+
+    def test_upload_gets_thumbnails(self):
+        upload = SimpleUploadedFile('me.JPG', rotated_photo())
+        response = self.api.post(self.url, {'photo': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['freelancer']['profile_picture_sizes'], {})
+        jobs.work(burst=True)
+        freelancer = Freelancer.objects.get(pk=self.freelancer.pk)
+        self.assertTrue(freelancer.profile_picture.name.endswith('.jpg'))
+        self.assertEqual(set(freelancer.profile_picture_sizes), {'16', '64'})
@@ -0,0 +1,152 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from .. import broadcasts, jobs
+from ..models import Broadcast, Job
+from .factories import APITestCase, make_client, make_staff
+
+calls = []
+
+
+@jobs.task(priority=10)
+def record(value):
+    calls.append(value)
+
+
+@jobs.task(max_attempts=2)
+def explode():
+    raise ValueError('boom')
+
+
+@override_settings(JOBS={'BACKOFF_BASE': 10, 'BACKOFF_MAX': 60, 'LEASE': 300})
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        calls.clear()
+
+    def test_enqueue_needs_a_registered_task(self):
+        with self.assertRaises(LookupError):
+            jobs.enqueue(print)
+
+    def test_job_only_exists_if_the_caller_commits(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            jobs.enqueue(record, {'value': 1})
+            raise RuntimeError
+        self.assertFalse(Job.objects.exists())
+
+    def test_work_runs_ready_jobs_by_priority_and_deletes_them(self):
+        jobs.enqueue(record, {'value': 'late'}, priority=50)
+        jobs.enqueue(record, {'value': 'first'})
+        jobs.enqueue(record, {'value': 'delayed'}, delay=60)
+        jobs.work(burst=True)
+        self.assertEqual(calls, ['first', 'late'])
+        self.assertEqual(list(Job.objects.values_list('kwargs', flat=True)), [{'value': 'delayed'}])
+
+    def test_claim_hands_each_job_to_one_worker(self):
+        # SQLite has no SKIP LOCKED: this exercises the conditional UPDATE path
+        ids = {jobs.enqueue(record, {'value': n}).id for n in range(3)}
+        first = jobs.claim('a', limit=2)
+        second = jobs.claim('b', limit=2)
+        self.assertEqual((len(first), len(second)), (2, 1))
+        self.assertEqual({job.id for job in first + second}, ids)
+        self.assertEqual(jobs.claim('c'), [])
+        claimed = Job.objects.get(id=first[0].id)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), ('running', 'a', 1))
+
+    def test_claim_skips_a_job_another_worker_took_first(self):
+        job = jobs.enqueue(record, {'value': 1})
+        filter_jobs = Job.objects.filter
+
+        def won_by_another_worker(*args, **kwargs):
+            # the candidate was read, but another worker updates the row before this one does
+            if kwargs.get('id') == job.id:
+                filter_jobs(id=job.id).update(status='running', locked_by='other')
+            return filter_jobs(*args, **kwargs)
+
+        with mock.patch.object(Job.objects, 'filter', side_effect=won_by_another_worker):
+            self.assertEqual(jobs.claim('me'), [])
+        self.assertEqual(Job.objects.get(id=job.id).locked_by, 'other')
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        job = jobs.enqueue(explode)
+        with mock.patch('platform_api.jobs.random.random', return_value=0), self.assertLogs('platform_api.jobs'):
+            self.assertFalse(jobs.execute(jobs.claim('w')[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), ('queued', 1, ''))
+        self.assertIn('ValueError: boom', job.last_error)
+        self.assertAlmostEqual((job.run_at - timezone.now()).total_seconds(), 10, delta=1)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        with self.assertLogs('platform_api.jobs', 'ERROR'):
+            self.assertFalse(jobs.execute(jobs.claim('w')[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertEqual(jobs.claim('w'), [])
+
+        self.assertTrue(jobs.retry(job.id))
+        self.assertFalse(jobs.retry(job.id))
+        self.assertEqual(Job.objects.get(id=job.id).attempts, 0)
+
+    def test_backoff_is_exponential_and_capped(self):
+        with mock.patch('platform_api.jobs.random.random', return_value=0):
+            self.assertEqual([jobs.backoff(attempt) for attempt in (1, 2, 3, 4)], [10, 20, 40, 60])
+        with mock.patch('platform_api.jobs.random.random', return_value=1):
+            self.assertEqual(jobs.backoff(1), 11)
+
+    def test_requeue_expired_leases(self):
+        alive = jobs.enqueue(record, {'value': 1})
+        dead = jobs.enqueue(record, {'value': 2})
+        spent = jobs.enqueue(record, {'value': 3}, max_attempts=1)
+        jobs.claim('w', limit=3)
+        Job.objects.filter(id__in=[dead.id, spent.id]).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.requeue_expired(), 2)
+        statuses = dict(Job.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {alive.id: 'running', dead.id: 'queued', spent.id: 'failed'})
+        self.assertEqual(Job.objects.get(id=dead.id).last_error, 'Lease expired')
+
+    def test_depth(self):
+        jobs.enqueue(record, {'value': 1})
+        jobs.enqueue(record, {'value': 2}, delay=60)
+        jobs.enqueue(explode)
+        jobs.claim('w')
+        depth = jobs.depth()
+        self.assertEqual({key: depth[key] for key in ('queued', 'ready', 'running', 'failed')},
+                         {'queued': 2, 'ready': 1, 'running': 1, 'failed': 0})
+        self.assertEqual(depth['tasks'][jobs._name(record)], {'queued': 1, 'running': 1, 'failed': 0})
+
+
+class BroadcastOwnershipTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        make_client()
+        self.broadcast, _ = broadcasts.create('Hello', {'role': 'client'}, make_staff())
+        self.job = jobs.claim('w')[0]
+
+    def run_as(self, job):
+        with mock.patch.object(jobs._running, 'job', job, create=True):
+            return broadcasts.run(str(self.broadcast.pk))
+
+    def test_owning_job_takes_back_an_interrupted_run(self):
+        Broadcast.objects.filter(pk=self.broadcast.pk).update(status='running', job_id=self.job.id)
+        self.assertTrue(self.run_as(self.job))
+        self.assertEqual(Broadcast.objects.get(pk=self.broadcast.pk).status, 'done')
+
+    def test_other_jobs_find_it_busy(self):
+        Broadcast.objects.filter(pk=self.broadcast.pk).update(status='running', job_id=self.job.id + 1)
+        with self.assertRaises(broadcasts.BroadcastBusy):
+            self.run_as(self.job)
+        with self.assertRaises(broadcasts.BroadcastBusy):
+            self.run_as(None)
+        self.assertEqual(Broadcast.objects.get(pk=self.broadcast.pk).processed, 0)
+
+    def test_busy_broadcast_is_retried_by_the_queue(self):
+        Broadcast.objects.filter(pk=self.broadcast.pk).update(status='running', job_id=self.job.id + 1)
+        with self.assertLogs('platform_api.jobs', 'WARNING'):
+            self.assertFalse(jobs.execute(self.job))
+        job = Job.objects.get(id=self.job.id)
+        self.assertEqual(job.status, 'queued')
+        self.assertIn('BroadcastBusy', job.last_error)
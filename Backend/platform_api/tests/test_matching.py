@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+
+from .. import matching
+from ..models import Category, Freelancer, Negotiation, NegotiationPhase, Skill
+from .factories import APITestCase, make_client, make_freelancer, make_request
+
+
+def agree(freelancer, *budgets):
+    """An agreed negotiation of ``freelancer`` with one phase per budget"""
+    client = make_client()
+    negotiation = Negotiation.objects.create(
+        origin_type='request', request=make_request(client), client=client, freelancer=freelancer, status='agreed')
+    for budget in budgets:
+        NegotiationPhase.objects.create(negotiation=negotiation, title='Phase', budget=budget)
+
+
+def rows_by_id(matrix):
+    """``{freelancer id: (rate, budget_log, skill ids, category ids)}`` of every row"""
+    return {
+        int(freelancer_id): (
+            float(matrix.rate[row]),
+            None if np.isnan(matrix.budget_log[row]) else round(float(matrix.budget_log[row]), 5),
+            sorted(matrix.skill_ids[matrix.skill_rows == row].tolist()),
+            sorted(matrix.category_ids[matrix.category_rows == row].tolist()),
+        )
+        for row, freelancer_id in enumerate(matrix.ids)
+    }
+
+
+class MatrixDeltaTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        Skill.objects.create(name='python')
+        Skill.objects.create(name='django')
+        Category.objects.create(name='web')
+        self.freelancers = [make_freelancer(rate=4.0) for _ in range(3)]
+        agree(self.freelancers[0], 100, 300)
+        # every call past the first applies a delta; no full reload during a test
+        self.engine = matching.MatchingEngine(full_refresh=3600, delta_interval=0)
+        self.engine.matrix()
+
+    def test_delta_matches_a_full_load(self):
+        changed = self.freelancers[1]
+        changed.rate = 2.5
+        changed.skills = ['python', 'django']
+        changed.save()
+        agree(self.freelancers[2], 1000)
+        self.freelancers[2].save()
+        added = make_freelancer(skills=['django'], categories=[])
+        agree(added, 50)
+        added.save()
+        self.assertEqual(rows_by_id(self.engine.matrix()), rows_by_id(matching.FeatureMatrix.load()))
+
+    def test_delta_reloads_the_price_history_of_changed_rows(self):
+        freelancer = self.freelancers[0]
+        agree(freelancer, 1000)
+        freelancer.save()
+        matrix = self.engine.matrix()
+        expected = (math.log(400) + math.log(1000)) / 2
+        self.assertAlmostEqual(float(matrix.budget_log[matrix.row_of[freelancer.pk]]), expected, places=5)
+
+    def test_new_freelancer_gets_its_price_history(self):
+        added = make_freelancer()
+        agree(added, 200)
+        added.save()
+        matrix = self.engine.matrix()
+        self.assertAlmostEqual(float(matrix.budget_log[matrix.row_of[added.pk]]), math.log(200), places=5)
+
+    def test_nothing_saved_keeps_the_matrix(self):
+        matrix = self.engine.matrix()
+        with self.assertNumQueries(1):
+            self.assertIs(self.engine.matrix(), matrix)
+
+    def test_row_saved_in_the_watermark_instant_is_applied(self):
+        matrix = self.engine.matrix()
+        Freelancer.objects.filter(pk=self.freelancers[1].pk).update(rate=1.0, updated_at=matrix.watermark)
+        late = self.engine.matrix()
+        self.assertIsNot(late, matrix)
+        self.assertAlmostEqual(float(late.rate[late.row_of[self.freelancers[1].pk]]), 0.2, places=5)
+        with self.assertNumQueries(1):
+            self.assertIs(self.engine.matrix(), late)
+
+
+class TopTests(APITestCase):
+    def matrix(self, rates):
+        ids = np.arange(1, len(rates) + 1, dtype=np.int64)
+        empty = (np.empty(0, np.int32), np.empty(0, np.int32))
+        return matching.FeatureMatrix(
+            ids, np.array(rates, np.float32), np.full(len(rates), -1, np.int32),
+            np.full(len(rates), np.nan, np.float32), empty, empty, {}, None)
+
+    def features(self):
+        return matching.RequestFeatures(set(), set(), None, None, None)
+
+    def test_best_first_ties_by_id(self):
+        matrix = self.matrix([0.2, 0.8, 0.5, 0.8, 0.1])
+        self.assertEqual([match.freelancer_id for match in matrix.top(self.features(), 3)], [2, 4, 3])
+
+    def test_top_k_is_the_head_of_the_full_ranking(self):
+        rates = np.random.default_rng(7).choice([0.0, 0.25, 0.5, 1.0], 200).tolist()
+        matrix = self.matrix(rates)
+        ranking = matrix.top(self.features(), 200)
+        self.assertEqual([match.score for match in ranking], sorted((match.score for match in ranking), reverse=True))
+        for k in (1, 10, 57):
+            self.assertEqual(matrix.top(self.features(), k), ranking[:k])
+
+    def test_k_bounds(self):
+        matrix = self.matrix([0.5, 0.4])
+        self.assertEqual(len(matrix.top(self.features(), 10)), 2)
+        self.assertEqual(matrix.top(self.features(), 0), [])
+
+    def test_score_breakdown(self):
+        match = self.matrix([1.0]).top(self.features(), 1)[0]
+        self.assertEqual(match.breakdown['rate'], 1.0)
+        self.assertEqual(match.breakdown['budget'], matching.NEUTRAL_BUDGET_FIT)
+        expected = matching.WEIGHTS['rate'] + matching.WEIGHTS['budget'] * matching.NEUTRAL_BUDGET_FIT
+        self.assertAlmostEqual(match.score, expected, places=4)
+
+
+class MatchesEndpointTests(APITestCase):
+    def test_owner_only(self):
+        request = make_request()
+        make_freelancer()
+        path = f'/requests/{request.pk}/matches/'
+        self.login(make_client().user)
+        self.assertEqual(self.api.get(path).status_code, 403)
+        self.login(request.client.user)
+        response = self.api.get(path, {'k': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
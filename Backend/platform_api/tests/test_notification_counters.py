@@ -0,0 +1,88 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from .. import notifications
+from ..models import Notification, NotificationCounter
+from .factories import APITestCase, make_user
+
+UNREAD = '/notifications/unread-count/'
+MARK_READ = '/notifications/mark-read/'
+
+
+class UnreadCounterTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def notify(self, count=1, **fields):
+        return [Notification.objects.create(receiver=self.user, content=f'Note {index}', **fields)
+                for index in range(count)]
+
+    def assertReconciled(self):
+        self.assertEqual(notifications.unread_count(self.user.pk),
+                         Notification.objects.filter(receiver=self.user, seen=False).count())
+
+    def test_badge_is_one_primary_key_read(self):
+        self.notify(3)
+        self.login(self.user)
+        self.api.get(UNREAD)
+        response, queries = self.count_queries(UNREAD)
+        self.assertEqual(response.data, {'unread': 3})
+        self.assertEqual(queries, 1)
+
+    def test_saves_and_deletes_move_the_counter(self):
+        first, second, third = self.notify(3)
+        self.notify(seen=True)
+        first.seen = True
+        first.save()
+        first.save()
+        Notification.objects.only('id', 'content').get(pk=second.pk).delete()
+        deferred = Notification.objects.only('id', 'content').get(pk=third.pk)
+        deferred.seen = True
+        deferred.save()
+        self.assertEqual(notifications.unread_count(self.user.pk), 0)
+        self.assertReconciled()
+
+    def test_mark_one_read_counts_once(self):
+        note, _ = self.notify(2)
+        self.login(self.user)
+        for _ in range(2):
+            self.assertEqual(self.api.put(f'/notifications/{note.pk}/').status_code, 200)
+        self.assertEqual(self.api.get(UNREAD).data, {'unread': 1})
+
+    def test_mark_read_up_to(self):
+        notes = self.notify(4)
+        now = timezone.now()
+        for age, note in enumerate(reversed(notes)):
+            Notification.objects.filter(pk=note.pk).update(created_at=now - timedelta(minutes=age))
+        self.login(self.user)
+        response = self.api.post(MARK_READ, {'up_to': notes[1].pk}, format='json')
+        self.assertEqual(response.data, {'marked': 2, 'unread': 2})
+        response = self.api.post(MARK_READ, format='json')
+        self.assertEqual(response.data, {'marked': 2, 'unread': 0})
+        self.assertEqual(self.api.post(MARK_READ, {'up_to': 'last'}, format='json').status_code, 400)
+        self.assertReconciled()
+
+    def test_other_users_notifications_are_untouched(self):
+        other = make_user()
+        Notification.objects.create(receiver=other, content='Hi')
+        self.notify(2)
+        notifications.mark_read(self.user.pk)
+        self.assertEqual(notifications.unread_count(other.pk), 1)
+
+    def test_recompute_repairs_drift(self):
+        self.notify(3)
+        NotificationCounter.objects.filter(user=self.user).update(unread=42)
+        out = StringIO()
+        call_command('recompute_notification_counters', stdout=out)
+        self.assertIn('1 user(s) with unread notifications', out.getvalue())
+        self.assertReconciled()
+
+    def test_counter_never_goes_negative(self):
+        notifications.bump([self.user.pk], -5)
+        self.notify()
+        notifications.bump([self.user.pk], -5)
+        self.assertEqual(notifications.unread_count(self.user.pk), 0)
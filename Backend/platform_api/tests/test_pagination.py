@@ -0,0 +1,74 @@
+import base64
+import json
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.utils import timezone
+
+from ..models import CommunityPost
+from .factories import APITestCase, make_user
+
+URL = '/community/posts/'
+
+
+def cursor(link):
+    return parse_qs(urlparse(link).query)['cursor'][0]
+
+
+def forge(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.login(make_user())
+        now = timezone.now()
+        posts = [CommunityPost.objects.create(owner=self.user, description=str(index)) for index in range(7)]
+        # ties on created_at: three posts share one instant, two another
+        stamps = [now, now, now, now - timedelta(seconds=1), now - timedelta(seconds=1),
+                  now - timedelta(seconds=2), now - timedelta(seconds=3)]
+        for post, stamp in zip(posts, stamps):
+            CommunityPost.objects.filter(pk=post.pk).update(created_at=stamp)
+        self.expected = list(CommunityPost.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def walk(self, page_size):
+        pages = [self.api.get(URL, {'page_size': page_size}).data]
+        while pages[-1]['next']:
+            pages.append(self.api.get(URL, {'page_size': page_size, 'cursor': cursor(pages[-1]['next'])}).data)
+        return pages
+
+    def ids(self, page):
+        return [post['id'] for post in page['results']]
+
+    def test_forward_walk_visits_every_row_once_in_order(self):
+        for page_size in (1, 2, 3, 7):
+            pages = self.walk(page_size)
+            self.assertEqual([post_id for page in pages for post_id in self.ids(page)], self.expected)
+            self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_links_return_the_same_pages(self):
+        pages = self.walk(2)
+        for index in range(len(pages) - 1, 0, -1):
+            back = self.api.get(URL, {'page_size': 2, 'cursor': cursor(pages[index]['previous'])}).data
+            self.assertEqual(self.ids(back), self.ids(pages[index - 1]))
+
+    def test_new_rows_do_not_shift_the_next_page(self):
+        first = self.api.get(URL, {'page_size': 3}).data
+        CommunityPost.objects.create(owner=self.user, description='newer')
+        second = self.api.get(URL, {'page_size': 3, 'cursor': cursor(first['next'])}).data
+        self.assertEqual(self.ids(second), self.expected[3:6])
+
+    def test_malformed_cursors_are_404(self):
+        now = timezone.now().isoformat()
+        for bad in ['!!!', 'bm90IGpzb24', forge([now, 1]), forge({'p': [now], 'r': 0}),
+                    forge({'p': 'x', 'r': 0}), forge({'p': ['yesterday', 1], 'r': 0}),
+                    forge({'p': [now, 'one'], 'r': 0}), forge({'p': [None, None], 'r': 0}),
+                    forge({'p': [now, {'id': 1}], 'r': 0})]:
+            with self.subTest(cursor=bad):
+                self.assertEqual(self.api.get(URL, {'cursor': bad}).status_code, 404)
+
+    def test_page_size_is_capped(self):
+        response = self.api.get(URL, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertEqual(self.api.get(URL, {'page_size': 'x'}).status_code, 200)
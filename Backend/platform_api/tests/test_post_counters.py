@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import CommunityComment, CommunityLike, CommunityPost
+from .factories import APITestCase, make_user
+
+
+class PostCounterTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = make_user()
+        self.post = CommunityPost.objects.create(owner=self.owner, description='Hello')
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.likes_count, self.post.comments_count
+
+    def assertReconciled(self):
+        self.assertEqual(self.counts(), (self.post.likes.count(), self.post.comments.count()))
+
+    def test_like_and_unlike_through_the_api(self):
+        self.login(make_user())
+        url = f'/community/posts/{self.post.pk}/like/'
+        self.assertEqual(self.api.post(url).status_code, 201)
+        self.assertEqual(self.api.post(url).status_code, 400)
+        self.assertEqual(self.counts(), (1, 0))
+        self.assertEqual(self.api.delete(url).status_code, 204)
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_deleting_a_comment_removes_its_replies_from_the_count(self):
+        parent = CommunityComment.objects.create(post=self.post, user=self.owner, comment='parent')
+        reply = parent.reply(make_user(), 'reply')
+        reply.reply(self.owner, 'nested')
+        CommunityComment.objects.create(post=self.post, user=self.owner, comment='other')
+        self.assertEqual(self.counts(), (0, 4))
+        parent.delete()
+        self.assertReconciled()
+        self.assertEqual(self.counts(), (0, 1))
+
+    def test_deleting_a_user_updates_the_posts_they_touched(self):
+        visitor = make_user()
+        CommunityLike.objects.create(post=self.post, user=visitor)
+        CommunityComment.objects.create(post=self.post, user=visitor, comment='hi')
+        CommunityLike.objects.create(post=self.post, user=make_user())
+        visitor.delete()
+        self.assertReconciled()
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_deleting_the_post_skips_per_row_updates(self):
+        for _ in range(3):
+            CommunityLike.objects.create(post=self.post, user=make_user())
+        CommunityComment.objects.create(post=self.post, user=self.owner, comment='bye')
+        with CaptureQueriesContext(connection) as queries:
+            self.post.delete()
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+
+    def test_counters_never_go_negative(self):
+        like = CommunityLike.objects.create(post=self.post, user=make_user())
+        CommunityPost.objects.filter(pk=self.post.pk).update(likes_count=0)
+        like.delete()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_reconcile_command(self):
+        CommunityLike.objects.create(post=self.post, user=make_user())
+        CommunityPost.objects.filter(pk=self.post.pk).update(likes_count=7, comments_count=3)
+        out = StringIO()
+        call_command('reconcile_post_counters', '--dry-run', stdout=out)
+        self.assertIn('1 drifted post(s)', out.getvalue())
+        self.assertEqual(self.counts(), (7, 3))
+        call_command('reconcile_post_counters', stdout=StringIO())
+        self.assertReconciled()
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.test import RequestFactory, override_settings
+
+from .. import profile_cache
+from ..models import Review
+from ..profile_cache import VersionedLRUCache, freelancer_profiles
+from .factories import APITestCase, make_client, make_freelancer
+
+
+class FreelancerProfileCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.freelancer = make_freelancer(description='Backend developer')
+        self.path = f'/freelancers/{self.freelancer.pk}/'
+
+    def test_repeat_reads_run_no_query(self):
+        self.api.get(self.path)
+        with self.assertNumQueries(0):
+            response = self.api.get(self.path)
+        self.assertEqual(response.data['description'], 'Backend developer')
+
+    def test_profile_save_invalidates(self):
+        self.api.get(self.path)
+        self.freelancer.description = 'Full-stack developer'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.freelancer.save()
+        self.assertEqual(self.api.get(self.path).data['description'], 'Full-stack developer')
+
+    def test_user_save_invalidates(self):
+        self.api.get(self.path)
+        user = self.freelancer.user
+        user.first_name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(self.api.get(self.path).data['user']['first_name'], 'Renamed')
+
+    def test_review_invalidates_the_rating(self):
+        self.api.get(self.path)
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(client=make_client(), freelancer=self.freelancer, rating=4)
+        data = self.api.get(self.path).data
+        self.assertEqual((data['rating_count'], data['rate']), (1, 4))
+
+    def test_deleted_profile_is_not_served(self):
+        self.api.get(self.path)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.freelancer.delete()
+        self.assertEqual(self.api.get(self.path).status_code, 404)
+
+    def test_invalidation_waits_for_commit(self):
+        self.api.get(self.path)
+        self.freelancer.description = 'Uncommitted'
+        with self.captureOnCommitCallbacks(execute=False):
+            self.freelancer.save()
+            self.assertEqual(self.api.get(self.path).data['description'], 'Backend developer')
+
+    def test_cache_stats_are_exposed_to_staff_only(self):
+        freelancer_profiles.get(self.freelancer.pk, RequestFactory().get('/'))
+        stats = freelancer_profiles.stats()
+        self.assertGreaterEqual(stats['entries'], 1)
+        self.assertEqual(self.api.get('/admin/stats/cache/').status_code, 403)
+
+
+class VersionedLRUCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.loads = []
+        self.cache = VersionedLRUCache('test', self.load, ttl=60, max_entries=2)
+        self.request = RequestFactory().get('/')
+
+    def load(self, key, request):
+        self.loads.append(key)
+        return None if key == 'missing' else f'value {key} #{len(self.loads)}'
+
+    def test_hit_miss_and_lru_eviction(self):
+        self.cache.get('a', self.request)
+        self.cache.get('b', self.request)
+        self.cache.get('a', self.request)  # hit: a is now the most recent
+        self.cache.get('c', self.request)  # evicts b
+        self.cache.get('a', self.request)
+        self.cache.get('b', self.request)
+        self.assertEqual(self.loads, ['a', 'b', 'c', 'b'])
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['entries']), (2, 4, 2, 2))
+
+    def test_missing_objects_are_not_cached(self):
+        self.assertIsNone(self.cache.get('missing', self.request))
+        self.assertIsNone(self.cache.get('missing', self.request))
+        self.assertEqual(self.loads, ['missing', 'missing'])
+
+    def test_ttl_bounds_staleness(self):
+        with mock.patch.object(profile_cache.time, 'monotonic', return_value=1000.0):
+            self.cache.get('a', self.request)
+        with mock.patch.object(profile_cache.time, 'monotonic', return_value=1061.0):
+            self.cache.get('a', self.request)
+        self.assertEqual(self.loads, ['a', 'a'])
+
+    @override_settings(ALLOWED_HOSTS=['one.example.com', 'two.example.com'])
+    def test_entries_are_per_host(self):
+        self.cache.get('a', RequestFactory().get('/', HTTP_HOST='one.example.com'))
+        self.cache.get('a', RequestFactory().get('/', HTTP_HOST='two.example.com'))
+        self.assertEqual(self.loads, ['a', 'a'])
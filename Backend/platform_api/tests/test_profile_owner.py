@@ -0,0 +1,45 @@
+from .factories import APITestCase, make_client, make_company, make_freelancer, make_staff
+
+
+class ProfileOwnerTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.profiles = {
+            'freelancers': make_freelancer(),
+            'clients': make_client(),
+            'companies': make_company(industry='Retail'),
+        }
+
+    def test_other_users_cannot_edit_a_profile(self):
+        intruder = make_client().user
+        for kind, profile in self.profiles.items():
+            for user in (None, intruder):
+                with self.subTest(kind=kind, user=user):
+                    self.api.force_authenticate(user)
+                    response = self.api.put(f'/{kind}/{profile.user_id}/update/', {'city': 'Oran'}, format='json')
+                    self.assertEqual(response.status_code, 403)
+                    response = self.api.put(f'/{kind}/{profile.user_id}/password/',
+                                            {'old_password': 'pw', 'new_password': 'taken'}, format='json')
+                    self.assertEqual(response.status_code, 403)
+                    profile.user.refresh_from_db()
+                    self.assertTrue(profile.user.check_password('pw'))
+
+    def test_other_users_cannot_change_a_photo(self):
+        self.login(make_client().user)
+        for kind in ('freelancers', 'clients'):
+            profile = self.profiles[kind]
+            with self.subTest(kind=kind):
+                self.assertEqual(self.api.post(f'/{kind}/{profile.user_id}/upload-photo/').status_code, 403)
+                self.assertEqual(self.api.delete(f'/{kind}/{profile.user_id}/photo/').status_code, 403)
+
+    def test_owner_and_staff_can_edit(self):
+        company = self.profiles['companies']
+        self.login(company.user)
+        response = self.api.put(f'/companies/{company.user_id}/update/', {'industry': 'Logistics'}, format='json')
+        self.assertEqual((response.status_code, response.data['industry']), (200, 'Logistics'))
+        response = self.api.put(f'/companies/{company.user_id}/password/',
+                                {'old_password': 'pw', 'new_password': 'new-pw'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.login(make_staff())
+        response = self.api.put(f'/companies/{company.user_id}/update/', {'industry': 'Energy'}, format='json')
+        self.assertEqual(response.status_code, 200)
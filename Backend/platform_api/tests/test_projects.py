@@ -0,0 +1,28 @@
+from .factories import APITestCase, make_project, make_user
+
+
+class ProjectDetailTests(APITestCase):
+    def test_detail_nests_phases_and_deliverables(self):
+        project = make_project(phases=2, deliverables=3)
+        self.login(project.negotiation.client.user)
+        response = self.api.get(f'/projects/{project.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['negotiation']['id'], project.negotiation_id)
+        self.assertEqual([len(phase['deliverables']) for phase in response.data['phases']], [3, 3])
+        # phases reference the project instead of embedding it again
+        self.assertNotIn('project', response.data['phases'][0])
+
+    def test_query_count_does_not_grow_with_the_project(self):
+        small = make_project(phases=1, deliverables=1)
+        self.login(small.negotiation.client.user)
+        _, small_queries = self.count_queries(f'/projects/{small.pk}/')
+        large = make_project(small.negotiation.client, phases=6, deliverables=5)
+        response, large_queries = self.count_queries(f'/projects/{large.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_outsiders_are_refused(self):
+        project = make_project()
+        self.login(make_user())
+        self.assertEqual(self.api.get(f'/projects/{project.pk}/').status_code, 403)
+        self.assertEqual(self.api.get('/projects/999999/').status_code, 404)
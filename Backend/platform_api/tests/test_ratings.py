@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from .. import ratings
+from ..models import Freelancer, Review
+from .factories import APITestCase, make_client, make_freelancer, make_staff
+
+
+class RatingTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.freelancer = make_freelancer()
+
+    def review(self, rating, freelancer=None):
+        return Review.objects.create(client=make_client(), freelancer=freelancer or self.freelancer, rating=rating)
+
+    def totals(self, freelancer=None):
+        freelancer = Freelancer.objects.get(pk=(freelancer or self.freelancer).pk)
+        return freelancer.rating_sum, freelancer.rating_count, freelancer.rate
+
+    def assertReconciled(self, freelancer=None):
+        live = Review.objects.filter(freelancer=freelancer or self.freelancer, is_deleted=False)
+        stars = list(live.values_list('rating', flat=True))
+        self.assertEqual(self.totals(freelancer), (sum(stars), len(stars), sum(stars) / len(stars) if stars else None))
+
+    def test_new_reviews_move_the_totals(self):
+        self.review(5)
+        self.review(2)
+        self.assertEqual(self.totals(), (7, 2, 3.5))
+
+    def test_edit_soft_delete_and_delete(self):
+        review = self.review(4)
+        self.review(2)
+        review.rating = 5
+        review.save()
+        self.assertEqual(self.totals(), (7, 2, 3.5))
+        review.is_deleted = True
+        review.save()
+        self.assertEqual(self.totals(), (2, 1, 2.0))
+        review.delete()
+        self.assertEqual(self.totals(), (2, 1, 2.0))
+        Review.objects.get(rating=2).delete()
+        self.assertEqual(self.totals(), (0, 0, None))
+
+    def test_save_of_a_deferred_review_reads_its_counted_value(self):
+        review = self.review(3)
+        deferred = Review.objects.only('id', 'feedback').get(pk=review.pk)
+        deferred.is_deleted = True
+        deferred.save(update_fields=['is_deleted'])
+        self.assertReconciled()
+
+    def test_delete_of_a_deferred_review_reads_its_counted_value(self):
+        review = self.review(3)
+        self.review(5)
+        Review.objects.only('id').get(pk=review.pk).delete()
+        self.assertEqual(self.totals(), (5, 1, 5.0))
+
+    def test_review_api(self):
+        client = make_client()
+        self.login(client.user)
+        response = self.api.post('/reviews/', {'freelancer_id': self.freelancer.pk, 'rating': 4}, format='json')
+        self.assertEqual(response.status_code, 201)
+        review_id = response.data['id']
+        self.assertEqual(self.api.put(f'/reviews/{review_id}/', {'rating': 2}, format='json').status_code, 200)
+        self.assertEqual(self.totals(), (2, 1, 2.0))
+        self.login(make_staff())
+        self.assertEqual(self.api.delete(f'/reviews/{review_id}/').status_code, 200)
+        self.assertEqual(self.totals(), (0, 0, None))
+
+    def test_summary_and_histogram(self):
+        for rating in (5, 5, 3):
+            self.review(rating)
+        self.review(1).delete()
+        response = self.api.get(f'/reviews/freelancer/{self.freelancer.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rating'], {
+            'average': 13 / 3, 'count': 3, 'histogram': {'1': 0, '2': 0, '3': 1, '4': 0, '5': 2}})
+
+    def test_recompute_command_repairs_drift(self):
+        other = make_freelancer()
+        self.review(4)
+        self.review(5, other)
+        Freelancer.objects.filter(pk=self.freelancer.pk).update(rating_sum=40, rating_count=3)
+        out = StringIO()
+        call_command('recompute_ratings', dry_run=True, stdout=out)
+        self.assertIn('1 drifted freelancer(s)', out.getvalue())
+        self.assertEqual(self.totals()[:2], (40, 3))
+        call_command('recompute_ratings', stdout=out)
+        self.assertIn('Repaired 1 freelancer(s)', out.getvalue())
+        self.assertReconciled()
+        self.assertReconciled(other)
+
+    def test_recompute_all(self):
+        self.review(3)
+        Freelancer.objects.update(rating_sum=0, rating_count=0, rate=None)
+        self.assertEqual(ratings.recompute(), 1)
+        self.assertReconciled()
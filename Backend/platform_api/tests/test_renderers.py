@@ -0,0 +1,62 @@
+import json
+import uuid
+from io import BytesIO
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from .. import renderers
+from ..renderers import FastJSONParser, FastJSONRenderer, NDJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    data = {
+        'budget': Decimal('120.50'),
+        'when': datetime(2024, 5, 1, 12, 30, tzinfo=dt_timezone.utc),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'name': 'Zoë',
+        'nested': [1, None, True],
+    }
+
+    def test_same_document_as_drf(self):
+        fast = json.loads(FastJSONRenderer().render(self.data))
+        plain = json.loads(JSONRenderer().render(self.data))
+        self.assertEqual(fast, plain)
+        self.assertEqual(fast['budget'], 120.5)
+        self.assertEqual(fast['when'], '2024-05-01T12:30:00Z')
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_fallback_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_ndjson_renders_lists_line_by_line(self):
+        self.assertEqual(NDJSONRenderer().render([{'a': 1}, {'a': 2}]), b'{"a":1}\n{"a":2}\n')
+        self.assertEqual(NDJSONRenderer().render({'detail': 'x'}), b'{"detail":"x"}\n')
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, raw):
+        return FastJSONParser().parse(BytesIO(raw))
+
+    def test_parses_json(self):
+        self.assertEqual(self.parse(b'{"a": [1, 2.5, "x"]}'), {'a': [1, 2.5, 'x']})
+
+    def test_malformed_body_is_a_parse_error(self):
+        with self.assertRaises(ParseError):
+            self.parse(b'{"a": ')
+        with mock.patch.object(renderers, 'orjson', None), self.assertRaises(ParseError):
+            self.parse(b'{"a": ')
+
+
+class RendererSettingsTests(SimpleTestCase):
+    def test_fast_json_is_the_default_pair(self):
+        self.assertIs(api_settings.DEFAULT_RENDERER_CLASSES[0], FastJSONRenderer)
+        self.assertIn(FastJSONParser, api_settings.DEFAULT_PARSER_CLASSES)
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from .. import search
+from ..models import Request, SearchDocument
+from .factories import APITestCase, make_client, make_freelancer, make_request, make_staff
+
+SEARCH = '/search/'
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = make_client()
+        self.other = make_client()
+        self.own = make_request(self.owner, title='Mobile banking app')
+        self.foreign = make_request(self.other, title='Mobile game prototype')
+        self.freelancer = make_freelancer(description='I build mobile apps with Flutter')
+
+    def hits(self, **params):
+        response = self.api.get(SEARCH, params)
+        self.assertEqual(response.status_code, 200)
+        return {(hit['kind'], hit['object_id']) for hit in response.data['results']}
+
+    def test_anonymous_callers_are_refused(self):
+        self.assertEqual(self.api.get(SEARCH, {'q': 'mobile'}).status_code, 403)
+
+    def test_client_sees_only_their_own_requests(self):
+        self.login(self.owner.user)
+        self.assertEqual(self.hits(q='mobile'), {('request', self.own.pk), ('freelancer', self.freelancer.pk)})
+
+    def test_user_without_client_profile_sees_no_requests(self):
+        self.login(self.freelancer.user)
+        self.assertEqual(self.hits(q='mobile'), {('freelancer', self.freelancer.pk)})
+        self.assertEqual(self.hits(q='mobile', type='request'), set())
+
+    def test_staff_see_every_request(self):
+        self.login(make_staff())
+        self.assertEqual(self.hits(q='mobile', type='request'), {('request', self.own.pk), ('request', self.foreign.pk)})
+
+    def test_every_word_matches_by_prefix(self):
+        self.login(make_staff())
+        self.assertEqual(self.hits(q='mob gam'), {('request', self.foreign.pk)})
+        self.assertEqual(self.hits(q='mobile cobol'), set())
+
+    def test_matches_are_highlighted_and_escaped(self):
+        Request.objects.filter(pk=self.own.pk).delete()
+        make_request(self.owner, title='<b>Mobile</b> wallet')
+        self.login(self.owner.user)
+        response = self.api.get(SEARCH, {'q': 'wallet', 'type': 'request'})
+        self.assertEqual(response.data['results'][0]['title'], '&lt;b&gt;Mobile&lt;/b&gt; <mark>wallet</mark>')
+
+    def test_pages(self):
+        for index in range(3):
+            make_request(self.owner, title=f'Mobile kiosk {index}')
+        self.login(self.owner.user)
+        first = self.api.get(SEARCH, {'q': 'mobile', 'type': 'request', 'page_size': 2})
+        self.assertEqual(len(first.data['results']), 2)
+        self.assertIsNotNone(first.data['next'])
+        second = self.api.get(first.data['next'])
+        self.assertEqual(len(second.data['results']), 2)
+        self.assertIsNone(second.data['next'])
+        seen = {hit['object_id'] for hit in first.data['results'] + second.data['results']}
+        self.assertEqual(len(seen), 4)
+
+    def test_invalid_parameters(self):
+        self.login(self.owner.user)
+        self.assertEqual(self.api.get(SEARCH, {'q': '  '}).status_code, 400)
+        self.assertEqual(self.api.get(SEARCH, {'q': 'mobile', 'type': 'invoice'}).status_code, 400)
+        self.assertEqual(self.api.get(SEARCH, {'q': 'mobile', 'page': 'two'}).status_code, 400)
+
+    def test_documents_follow_their_source(self):
+        self.own.title = 'Desktop banking app'
+        self.own.save()
+        self.assertEqual(search.search('desktop')[0].object_id, self.own.pk)
+        self.own.delete()
+        self.assertEqual(search.search('desktop'), [])
+
+    def test_rebuild(self):
+        SearchDocument.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual({hit.object_id for hit in search.search('mobile', ['request'])}, {self.own.pk, self.foreign.pk})
@@ -0,0 +1,47 @@
+from ..serializers import get_sparse_spec, parse_field_paths
+from .factories import APITestCase, make_project
+
+
+class FieldPathTests(APITestCase):
+    def test_parse_nested_paths(self):
+        self.assertEqual(parse_field_paths('id,negotiation.status, negotiation.client'),
+                         {'id': {}, 'negotiation': {'status': {}, 'client': {}}})
+
+    def test_no_parameters_means_full_representation(self):
+        self.assertIsNone(get_sparse_spec())
+        self.assertEqual(get_sparse_spec(fields='id'), ({'id': {}}, {}))
+
+
+class SparseResponseTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = make_project(phases=1, deliverables=1)
+        self.login(self.project.negotiation.client.user)
+        self.url = f'/projects/{self.project.pk}/'
+
+    def test_fields_keeps_only_the_listed_fields(self):
+        response = self.api.get(self.url, {'fields': 'id,title'})
+        self.assertEqual(set(response.data), {'id', 'title'})
+
+    def test_relations_collapse_to_ids_unless_expanded(self):
+        response = self.api.get(self.url, {'fields': 'id,negotiation'})
+        self.assertEqual(response.data['negotiation'], self.project.negotiation_id)
+
+        response = self.api.get(self.url, {'fields': 'id,negotiation', 'expand': 'negotiation'})
+        self.assertEqual(response.data['negotiation']['id'], self.project.negotiation_id)
+
+    def test_nested_sub_fields(self):
+        response = self.api.get(self.url, {'fields': 'negotiation.status'})
+        self.assertEqual(response.data, {'negotiation': {'status': 'agreed'}})
+
+    def test_sparse_response_loads_less(self):
+        _, full = self.count_queries(self.url)
+        _, sparse = self.count_queries(self.url, fields='id,title')
+        self.assertLess(sparse, full)
+
+    def test_negotiation_detail_honours_fields(self):
+        negotiation = self.project.negotiation
+        response = self.api.get(f'/negotiations/{negotiation.pk}/', {'fields': 'id,status'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'agreed')
+        self.assertNotIn('client', response.data)
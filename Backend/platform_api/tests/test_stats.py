@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from .. import stats
+from ..models import JobInternshipOffer, Negotiation, Project, Request, StatCounter
+from .factories import APITestCase, make_client, make_company, make_freelancer, make_request, make_staff
+
+
+class DashboardCounterTests(APITestCase):
+    def assertReconciled(self):
+        """The incremental counters agree with a full recount"""
+        self.assertEqual(stats.dashboard(), stats.compute_counters())
+
+    def test_row_counters_follow_creates_and_deletes(self):
+        client, freelancer, company = make_client(), make_freelancer(), make_company()
+        JobInternshipOffer.objects.create(company=company, title='Intern', type='internship', requirements='-')
+        self.assertReconciled()
+        self.assertEqual(stats.dashboard()['posted_jobs'], 1)
+        freelancer.delete()
+        # cascades: the company's offers go with it
+        company.user.delete()
+        self.assertReconciled()
+        self.assertEqual(stats.dashboard()['clients'], 1)
+
+    def test_request_status_moves(self):
+        request = make_request(status='pending')
+        self.assertEqual(stats.dashboard()['active_requests'], 1)
+        for status in ('accepted', 'completed', 'pending'):
+            request.status = status
+            request.save()
+            self.assertReconciled()
+        # a row loaded with the status deferred is still moved correctly
+        deferred = Request.objects.only('id').get(pk=request.pk)
+        deferred.status = 'completed'
+        deferred.save()
+        self.assertReconciled()
+        deferred.delete()
+        self.assertReconciled()
+
+    def test_negotiations_and_their_projects(self):
+        client, freelancer = make_client(), make_freelancer()
+        negotiation = Negotiation.objects.create(origin_type='direct_hire', client=client, freelancer=freelancer,
+                                                 status='in_progress')
+        Project.objects.create(negotiation=negotiation, title='Site')
+        self.assertReconciled()
+        self.assertEqual(stats.dashboard()['active_projects'], 1)
+
+        negotiation.status = 'declined'
+        negotiation.save()
+        self.assertReconciled()
+        self.assertEqual(stats.dashboard()['declined_projects'], 1)
+
+        negotiation.status = 'agreed'
+        negotiation.save()
+        self.assertReconciled()
+
+        # deleting the client cascades through negotiation and project
+        client.user.delete()
+        self.assertReconciled()
+        self.assertEqual(stats.dashboard()['active_projects'], 0)
+
+    def test_recompute_repairs_drift(self):
+        make_request()
+        StatCounter.objects.filter(name='active_requests').update(value=42)
+        StatCounter.objects.filter(name='clients').delete()
+        call_command('recompute_stats', stdout=StringIO())
+        self.assertReconciled()
+
+    def test_dashboard_is_one_query_and_staff_only(self):
+        make_request()
+        self.login(make_client().user)
+        self.assertEqual(self.api.get('/admin/stats/').status_code, 403)
+        self.login(make_staff())
+        with self.assertNumQueries(1):
+            response = self.api.get('/admin/stats/')
+        self.assertEqual(response.data['active_requests'], 1)
+        self.assertEqual(response.data['clients'], 2)
@@ -0,0 +1,77 @@
+import json
+
+from rest_framework.request import Request as APIRequest
+from rest_framework.test import APIRequestFactory
+
+from ..models import Report, Request
+from ..serializers import RequestSerializer
+from ..streaming import get_stream_format, stream_queryset
+from .factories import APITestCase, make_client, make_request, make_staff
+
+
+def body(response):
+    return b''.join(response.streaming_content).decode()
+
+
+def drf_request(path='/', **params):
+    return APIRequest(APIRequestFactory().get(path, params))
+
+
+class StreamFormatTests(APITestCase):
+    def test_format_from_query_or_accept_header(self):
+        self.assertIsNone(get_stream_format(drf_request()))
+        self.assertEqual(get_stream_format(drf_request(stream='json')), 'json')
+        self.assertEqual(get_stream_format(drf_request(stream='true')), 'json')
+        self.assertEqual(get_stream_format(drf_request(stream='NDJSON')), 'ndjson')
+        self.assertIsNone(get_stream_format(drf_request(stream='xml')))
+        request = APIRequest(APIRequestFactory().get('/', HTTP_ACCEPT='application/x-ndjson'))
+        self.assertEqual(get_stream_format(request), 'ndjson')
+
+
+class StreamQuerysetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client_profile = make_client()
+        self.requests = [make_request(self.client_profile, title=f'Request {index}') for index in range(5)]
+
+    def test_json_array_across_chunk_boundaries(self):
+        for chunk_size in (1, 2, 5, 10):
+            response = stream_queryset(drf_request(), Request.objects.order_by('id'), RequestSerializer,
+                                       'json', chunk_size=chunk_size)
+            rows = json.loads(body(response))
+            self.assertEqual([row['title'] for row in rows], [f'Request {index}' for index in range(5)])
+
+    def test_empty_queryset_is_an_empty_array(self):
+        response = stream_queryset(drf_request(), Request.objects.none(), RequestSerializer, 'json')
+        self.assertEqual(json.loads(body(response)), [])
+
+    def test_ndjson_is_one_object_per_line(self):
+        response = stream_queryset(drf_request(), Request.objects.order_by('id'), RequestSerializer,
+                                   'ndjson', chunk_size=2)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = body(response).splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [request.pk for request in self.requests])
+
+    def test_sparse_fields_apply_to_streams(self):
+        response = stream_queryset(drf_request(fields='id,title'), Request.objects.all(), RequestSerializer, 'json')
+        self.assertEqual({key for row in json.loads(body(response)) for key in row}, {'id', 'title'})
+
+    def test_request_list_streams_on_demand(self):
+        self.login(self.client_profile.user)
+        response = self.api.get('/requests/', {'stream': 'json'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(json.loads(body(response))), 5)
+        self.assertIn('results', self.api.get('/requests/').data)
+
+    def test_admin_reports_stream(self):
+        staff = self.login(make_staff())
+        Report.objects.create(reporter=staff, type=Report.REPORT_TYPE_CHOICES[0][0], target_id=1, text='spam')
+        response = self.api.get('/admin/reports/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(body(response))['text'], 'spam')
+
+    def test_ndjson_accept_header_still_gets_errors(self):
+        self.login(self.client_profile.user)
+        response = self.api.get('/admin/reports/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(json.loads(response.content), {'detail': 'Forbidden'})
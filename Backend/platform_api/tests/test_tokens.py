@@ -0,0 +1,91 @@
+import time
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .. import tokens
+from ..models import RevokedToken
+from .factories import APITestCase, make_client
+
+PROTECTED = '/notifications/unread-count/'
+
+
+class SignedTokenTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_client().user
+        response = self.api.post('/auth/login/', {'email': self.user.email, 'password': 'pw'}, format='json')
+        self.pair = response.data['tokens']
+        # the login set a session cookie; only the bearer token may authenticate here
+        self.api.cookies.clear()
+
+    # SessionAuthentication comes first and sends no WWW-Authenticate, so DRF answers 403
+    def get(self, access):
+        return self.api.get(PROTECTED, HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def exchange(self, refresh):
+        return self.api.post('/auth/token/refresh/', {'refresh': refresh}, format='json')
+
+    def test_access_token_authenticates(self):
+        self.assertEqual(self.get(self.pair['access']).status_code, 200)
+
+    def test_logout_revokes_the_access_token(self):
+        self.assertEqual(self.get(self.pair['access']).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post('/auth/logout/', {'refresh': self.pair['refresh']}, format='json',
+                                     HTTP_AUTHORIZATION=f"Bearer {self.pair['access']}")
+        self.assertEqual(response.status_code, 200)
+        self.api.cookies.clear()
+        response = self.get(self.pair['access'])
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], 'Token revoked')
+        self.assertEqual(self.exchange(self.pair['refresh']).status_code, 401)
+
+    def test_refresh_rotation_rejects_a_replay(self):
+        first = self.exchange(self.pair['refresh'])
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.get(first.data['access']).status_code, 200)
+        second = self.exchange(self.pair['refresh'])
+        self.assertEqual(second.status_code, 401)
+        self.assertEqual(self.exchange(first.data['refresh']).status_code, 200)
+
+    def test_password_change_invalidates_both_tokens(self):
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertEqual(self.get(self.pair['access']).status_code, 403)
+        self.assertEqual(self.exchange(self.pair['refresh']).status_code, 401)
+
+    def test_refresh_token_is_not_an_access_token(self):
+        self.assertEqual(self.get(self.pair['refresh']).status_code, 403)
+        self.assertEqual(self.exchange(self.pair['access']).status_code, 401)
+
+    def test_expired_access_token_is_rejected(self):
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + tokens.get_lifetime(tokens.ACCESS) + 1):
+            self.assertEqual(self.get(self.pair['access']).status_code, 403)
+
+    def test_bearer_request_does_not_read_the_deny_list(self):
+        self.get(self.pair['access'])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.get(self.pair['access']).status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if 'revoked_tokens' in q['sql']])
+
+    def test_revocation_reloads_the_deny_list(self):
+        payload = tokens.decode(self.pair['access'], tokens.ACCESS)
+        self.assertFalse(tokens.is_revoked(payload))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(tokens.revoke(payload))
+        self.assertTrue(tokens.is_revoked(payload))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertFalse(tokens.revoke(payload))
+
+    @override_settings(AUTH_USER_LOCAL_CACHE_TTL=5)
+    def test_revocation_on_another_worker_is_seen_within_the_local_ttl(self):
+        payload = tokens.decode(self.pair['access'], tokens.ACCESS)
+        self.assertFalse(tokens.is_revoked(payload))
+        # a revocation on another worker: this process's version is not bumped
+        RevokedToken.objects.create(jti=payload['j'], expires_at=tokens.timezone.now() + tokens.timedelta(minutes=5))
+        self.assertFalse(tokens.is_revoked(payload))
+        with mock.patch('platform_api.tokens.time.monotonic', return_value=time.monotonic() + 6):
+            self.assertTrue(tokens.is_revoked(payload))
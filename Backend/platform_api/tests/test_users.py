@@ -0,0 +1,40 @@
+from ..models import CommunityPost
+from ..serializers import PublicUserSerializer
+from .factories import APITestCase, make_client, make_freelancer, make_user
+
+PRIVATE_FIELDS = {'password', 'groups', 'user_permissions', 'is_superuser', 'last_login'}
+
+
+class PublicUserCardTests(APITestCase):
+    def test_card_has_no_private_fields(self):
+        data = PublicUserSerializer(make_user()).data
+        self.assertFalse(PRIVATE_FIELDS & set(data))
+
+    def test_register_and_login_do_not_return_the_password_hash(self):
+        response = self.api.post('/auth/register/client/', {
+            'email': 'new@example.com', 'password': 'secret-pw', 'first_name': 'A', 'last_name': 'B',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(PRIVATE_FIELDS & set(response.data['user']))
+
+        response = self.api.post('/auth/login/', {'email': 'new@example.com', 'password': 'secret-pw'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(PRIVATE_FIELDS & set(response.data['user']))
+
+    def test_embedded_users_are_cards(self):
+        freelancer = make_freelancer()
+        response = self.api.get(f'/freelancers/{freelancer.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['email'], freelancer.user.email)
+        self.assertFalse(PRIVATE_FIELDS & set(response.data['user']))
+
+    def test_post_list_embeds_owners_without_a_query_per_row(self):
+        owner = self.login(make_client().user)
+        CommunityPost.objects.create(owner=owner, description='first')
+        self.api.get('/community/posts/')
+        for _ in range(5):
+            CommunityPost.objects.create(owner=make_user(), description='more')
+        with self.assertNumQueries(1):
+            response = self.api.get('/community/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all('password' not in post['owner'] for post in response.data['results']))
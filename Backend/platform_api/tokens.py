@@ -0,0 +1,170 @@
+import secrets
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache, caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .auth import LOCAL_CACHE_BACKENDS
+from .models import RevokedToken
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+# a refresh token can never be replayed as an access token (and vice versa)
+_SALTS = {
+    ACCESS: 'platform_api.tokens.access',
+    REFRESH: 'platform_api.tokens.refresh',
+}
+
+
+class TokenError(Exception):
+    pass
+
+
+def get_lifetime(kind):
+    """Lifetime of ``kind`` tokens in seconds, from settings.SIGNED_TOKENS"""
+    config = getattr(settings, 'SIGNED_TOKENS', {})
+    if kind == ACCESS:
+        return config.get('ACCESS_LIFETIME', 15 * 60)
+    return config.get('REFRESH_LIFETIME', 7 * 24 * 3600)
+
+
+def _user_fingerprint(user):
+    # changes with the password hash, so a password change invalidates every token
+    return user.get_session_auth_hash()[:12]
+
+
+def _sign(user, kind):
+    payload = {
+        'u': user.pk,
+        'j': secrets.token_urlsafe(9),
+        'i': int(time.time()),
+        'h': _user_fingerprint(user),
+    }
+    return signing.TimestampSigner(salt=_SALTS[kind]).sign_object(payload, compress=False)
+
+
+def issue_tokens(user):
+    """A fresh access/refresh pair for ``user``"""
+    return {
+        'access': _sign(user, ACCESS),
+        'refresh': _sign(user, REFRESH),
+        'token_type': 'Bearer',
+        'expires_in': get_lifetime(ACCESS),
+    }
+
+
+def decode(token, kind):
+    """Payload of a valid, unexpired and not revoked ``kind`` token
+
+    Access tokens are checked against this process's copy of the deny-list
+    (see ``is_revoked``), so a warm request never reads the database. Refresh
+    tokens are checked by the insert in ``refresh``.
+
+    Raises:
+        TokenError: if the token is malformed, forged, expired or revoked
+    """
+    try:
+        payload = signing.TimestampSigner(salt=_SALTS[kind]).unsign_object(token, max_age=get_lifetime(kind))
+    except signing.SignatureExpired:
+        raise TokenError('Token expired')
+    except (signing.BadSignature, ValueError):
+        raise TokenError('Invalid token')
+    payload['kind'] = kind
+    if kind == ACCESS and is_revoked(payload):
+        raise TokenError('Token revoked')
+    return payload
+
+
+def check_user(payload, user):
+    """Whether ``user`` is still the one the token was issued to (same password, still active)"""
+    return user is not None and user.is_active and payload['h'] == _user_fingerprint(user)
+
+
+# ---------- Deny-list ----------
+# A table, so a revocation holds in every worker and across restarts. Only
+# token ids are stored, each until the token would have expired anyway, so
+# the list never holds more than one lifetime's worth of revocations.
+#
+# Bearer requests do not read the table: each process keeps the ids of the
+# revoked access tokens in memory and reloads them when the version token in
+# the default cache moves, which every revocation does. Access tokens live
+# ACCESS_LIFETIME, so the copy stays small.
+
+_VERSION_KEY = 'tokens:revoked:version'
+
+_snapshot = {'version': None, 'loaded_at': 0.0, 'jtis': frozenset()}
+_snapshot_lock = threading.Lock()
+
+
+def _snapshot_max_age():
+    # with an in-process cache a revocation only bumps the version of the worker
+    # that handled it, so the others reload on a timer instead (see auth.user_cache_ttl)
+    if caches.settings['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        return getattr(settings, 'AUTH_USER_LOCAL_CACHE_TTL', 5)
+    return None
+
+
+def _revoked_access_jtis():
+    version = cache.get_or_set(_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    max_age = _snapshot_max_age()
+    snapshot = _snapshot
+    if snapshot['version'] == version and (max_age is None or time.monotonic() - snapshot['loaded_at'] < max_age):
+        return snapshot['jtis']
+    with _snapshot_lock:
+        now = timezone.now()
+        # a revoked access token expires within ACCESS_LIFETIME of now; the
+        # refresh tokens caught by the same window are harmless extras
+        jtis = frozenset(RevokedToken.objects.filter(
+            expires_at__gt=now, expires_at__lte=now + timedelta(seconds=get_lifetime(ACCESS)),
+        ).values_list('jti', flat=True))
+        # the version is read before the rows, so a revocation racing the
+        # reload leaves a stale version behind and triggers another reload
+        _snapshot.update(version=version, loaded_at=time.monotonic(), jtis=jtis)
+    return jtis
+
+
+def revoke(payload):
+    """Deny the token of ``payload``; False if it was already denied
+
+    The insert on the ``jti`` primary key is the check, so of two concurrent
+    revocations of the same token exactly one returns True.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=payload['i'] + get_lifetime(payload['kind']) - int(time.time()))
+    if expires_at <= now:
+        return True
+    RevokedToken.objects.filter(expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=payload['j'], expires_at=expires_at)
+    except IntegrityError:
+        return False
+    transaction.on_commit(lambda: cache.set(_VERSION_KEY, uuid.uuid4().hex, timeout=None))
+    return True
+
+
+def is_revoked(payload):
+    """Whether the access token of ``payload`` was revoked, from the in-process deny-list"""
+    return payload['j'] in _revoked_access_jtis()
+
+
+def refresh(token, load_user):
+    """Exchange a refresh token for a new pair; the old refresh token is revoked (rotation)
+
+    Raises:
+        TokenError: if the token is invalid, or was already exchanged (also by a concurrent call)
+    """
+    payload = decode(token, REFRESH)
+    user = load_user(payload['u'])
+    if not check_user(payload, user):
+        raise TokenError('Invalid token')
+    if not revoke(payload):
+        raise TokenError('Token revoked')
+    return issue_tokens(user)
@@ -1,5 +1,4 @@
 from django.urls import path, include
-from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static  import static
 from rest_framework.routers import DefaultRouter
@@ -12,18 +11,18 @@ urlpatterns = [
     path('users/', views.soft_get_user, name='soft_delete_user'),
     path('', views.getRoutes),
 
-    path("admin/", admin.site.urls),
-
     path('auth/register/freelancer/', views.register_freelancer, name='register_freelancer'),
     path('auth/register/client/', views.register_client, name='register_client'),
     path('auth/register/company/', views.register_company, name='register_company'),
     path('auth/login/', views.login_view, name='login'),
     path('auth/logout/', views.logout_view, name='logout'),
+    path('auth/token/refresh/', views.token_refresh, name='token_refresh'),
     path('auth/verify-email/<str:token>/', views.verify_email, name='verify_email'),
     path('auth/forgot-password/', views.forgot_password, name='forgot_password'),
     path('auth/reset-password/', views.reset_password, name='reset_password'),
 
     # Freelancers
+    path('freelancers/search/', views.search_freelancers, name='search_freelancers'),
     path('freelancers/<int:id>/', views.get_freelancer, name='get_freelancer'),
     path('freelancers/<int:id>/update/', views.update_freelancer, name='update_freelancer'),
     path('freelancers/<int:id>/password/', views.update_freelancer_password, name='update_freelancer_password'),
@@ -48,6 +47,7 @@ urlpatterns = [
     path('requests/', views.requests_list_create, name='requests_list_create'),
     path('requests/client/<int:client_id>/', views.list_client_requests, name='list_client_requests'),
     path('requests/<int:id>/', views.request_detail, name='request_detail'),
+    path('requests/<int:id>/matches/', views.request_matches, name='request_matches'),
     # Negotiations
     path('negotiations/directhire/<int:freelancer_id>/', views.create_direct_hire, name='create_direct_hire'),
     path('negotiations/<int:request_id>/create/', views.create_from_request, name='create_from_request'),
@@ -93,11 +93,15 @@ urlpatterns = [
     path('help/<int:id>/resolve/', views.resolve_help_request, name='resolve_help_request'),
 
     # Admin / Stats / Catalog
+    path('admin/stats/', views.admin_stats_dashboard, name='admin_stats_dashboard'),
     path('admin/stats/users/', views.admin_stats_users, name='admin_stats_users'),
     path('admin/stats/posts/', views.admin_stats_posts, name='admin_stats_posts'),
     path('admin/stats/requests/', views.admin_stats_requests, name='admin_stats_requests'),
     path('admin/stats/negotiations/', views.admin_stats_negotiations, name='admin_stats_negotiations'),
     path('admin/stats/projects/', views.admin_stats_projects, name='admin_stats_projects'),
+    path('admin/stats/cache/', views.admin_stats_cache, name='admin_stats_cache'),
+    path('admin/jobs/', views.admin_jobs, name='admin_jobs'),
+    path('admin/jobs/<int:job_id>/retry/', views.admin_retry_job, name='admin_retry_job'),
 
     path('admin/skills/', views.admin_add_skill, name='admin_add_skill'),
     path('admin/categories/', views.admin_add_category, name='admin_add_category'),
@@ -129,7 +133,18 @@ urlpatterns = [
     # Notifications
     path('notifications/', views.create_notification, name='create_notification'),
     path('notifications/my/', views.notifications_my, name='notifications_my'),
+    path('notifications/unread-count/', views.notifications_unread_count, name='notifications_unread_count'),
+    path('notifications/mark-read/', views.notifications_mark_read, name='notifications_mark_read'),
     path('notifications/<int:notification_id>/', views.notification_detail, name='notification_detail'),
+    path('notifications/broadcasts/', views.create_broadcast, name='create_broadcast'),
+    path('notifications/broadcasts/<uuid:broadcast_id>/', views.broadcast_detail, name='broadcast_detail'),
+
+    # Live events
+    path('events/stream/', views.events_stream, name='events_stream'),
+    path('events/poll/', views.events_poll, name='events_poll'),
+
+    # Search
+    path('search/', views.search_view, name='search'),
 
 ]
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,23 +1,38 @@
 from django.contrib.auth import authenticate, login, logout
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from .serializers import UserSerializer , AdminSerializer , ClientSerializer , FreelancerSerializer , CompanySerializer , FAQSerializer , SkillSerializer , CategorySerializer , ReviewSerializer , ReportSerializer , MediaFileSerializer , NotificationSerializer , HelpSerializer , JobInternshipOfferSerializer , RequestSerializer , NegotiationSerializer , NegotiationFloatingCommentSerializer , NegotiationPhaseSerializer , ProjectSerializer , ProjectPhaseSerializer  , DeliverableSerializer , CommunityPostSerializer , CommunityCommentSerializer , CommunityCommentDetailSerializer , CommunityLikeSerializer
+from .access import Access, negotiation_access, negotiation_phase_access, project_access, project_phase_access
+from .auth import get_profile, load_user
+from .catalog_cache import catalog_response
+from .conditional import ConditionalGet, newest
+from .pagination import paginate
+from .profile_cache import freelancer_profiles
+from . import broadcasts, events, freelancer_index, images, jobs, matching, notifications, ratings, search, stats, tokens
+from .authentication import aauthenticate
+from .streaming import get_stream_format, stream_queryset, stream_renderers
+from .serializers import UserSerializer , PublicUserSerializer , AdminSerializer , ClientSerializer , FreelancerSerializer , CompanySerializer , FAQSerializer , SkillSerializer , CategorySerializer , ReviewSerializer , ReportSerializer , MediaFileSerializer , NotificationSerializer , HelpSerializer , JobInternshipOfferSerializer , RequestSerializer , NegotiationSerializer , NegotiationFloatingCommentSerializer , NegotiationPhaseSerializer , ProjectSerializer , ProjectPhaseSerializer  , DeliverableSerializer , ProjectDetailSerializer , CommunityPostSerializer , CommunityCommentSerializer , CommunityCommentDetailSerializer , CommunityLikeSerializer , BroadcastSerializer , get_sparse_spec
 from .models import (
     User, Admin, Company, Client, Freelancer,
     Skill, Category, Review, FAQ, MediaFile, Report, Notification,
-    Help, JobInternshipOffer, Request,
+    Help, JobInternshipOffer, Request, Broadcast, Job,
     Negotiation, NegotiationPhase, NegotiationFloatingComment,
     Project, ProjectPhase, Deliverable,
     CommunityPost, CommunityComment, CommunityLike,
 )
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
 import os
-from django.db.models import Count, Q
+import uuid
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
 
 
 @api_view(['GET'])
@@ -25,6 +40,7 @@ def getRoutes(request):
     routes = [
         {'method': 'GET', 'path': '/auth/login/', 'description': 'Login'},
         {'method': 'POST', 'path': '/auth/logout/', 'description': 'Logout'},
+        {'method': 'POST', 'path': '/auth/token/refresh/', 'description': 'Exchange a refresh token for new tokens'},
         {'method': 'POST', 'path': '/auth/register/freelancer/', 'description': 'Register freelancer'},
         {'method': 'POST', 'path': '/auth/register/client/', 'description': 'Register client'},
         {'method': 'POST', 'path': '/auth/register/company/', 'description': 'Register company'},
@@ -32,6 +48,7 @@ def getRoutes(request):
         {'method': 'POST', 'path': '/auth/forgot-password/', 'description': 'Forgot password'},
         {'method': 'POST', 'path': '/auth/reset-password/', 'description': 'Reset password'},
 
+        {'method': 'GET', 'path': '/freelancers/search/', 'description': 'Search freelancers by skills, categories, location, experience and rate'},
         {'method': 'GET', 'path': '/freelancers/<id>/', 'description': 'Get freelancer profile'},
         {'method': 'PUT', 'path': '/freelancers/<id>/update/', 'description': 'Update freelancer profile'},
         {'method': 'PUT', 'path': '/freelancers/<id>/password/', 'description': 'Update freelancer password'},
@@ -49,6 +66,7 @@ def getRoutes(request):
         {'method': 'GET,POST', 'path': '/requests/', 'description': 'List or create requests'},
         {'method': 'GET', 'path': '/requests/client/<client_id>/', 'description': 'List requests for a client'},
         {'method': 'GET,PUT,DELETE', 'path': '/requests/<id>/', 'description': 'Get/update/soft-delete a request'},
+        {'method': 'GET', 'path': '/requests/<id>/matches/', 'description': 'Best-matching freelancers for a request'},
 
         {'method': 'POST', 'path': '/negotiations/directhire/<freelancer_id>/', 'description': 'Create direct-hire negotiation'},
         {'method': 'POST', 'path': '/negotiations/<request_id>/create/', 'description': 'Create negotiation from request'},
@@ -89,11 +107,15 @@ def getRoutes(request):
         {'method': 'GET', 'path': '/help/my/', 'description': 'List my help tickets'},
         {'method': 'PUT', 'path': '/help/<id>/resolve/', 'description': 'Resolve help ticket (admin)'},
 
+        {'method': 'GET', 'path': '/admin/stats/', 'description': 'Admin: all dashboard counters in one call'},
         {'method': 'GET', 'path': '/admin/stats/users/', 'description': 'Admin: count freelancers/clients/companies'},
         {'method': 'GET', 'path': '/admin/stats/posts/', 'description': 'Admin: count posted jobs'},
         {'method': 'GET', 'path': '/admin/stats/requests/', 'description': 'Admin: count active requests'},
         {'method': 'GET', 'path': '/admin/stats/negotiations/', 'description': 'Admin: active & declined negotiations'},
         {'method': 'GET', 'path': '/admin/stats/projects/', 'description': 'Admin: active & declined projects'},
+        {'method': 'GET', 'path': '/admin/stats/cache/', 'description': 'Admin: freelancer profile cache counters'},
+        {'method': 'GET', 'path': '/admin/jobs/', 'description': 'Admin: background job queue depth and recent failures'},
+        {'method': 'POST', 'path': '/admin/jobs/<id>/retry/', 'description': 'Admin: queue a failed background job again'},
 
         {'method': 'POST', 'path': '/admin/skills/', 'description': 'Admin: add skill'},
         {'method': 'POST', 'path': '/admin/categories/', 'description': 'Admin: add category'},
@@ -102,14 +124,24 @@ def getRoutes(request):
 
         {'method': 'GET', 'path': '/admin/reports/', 'description': 'Admin: list reports'},
         {'method': 'POST', 'path': '/admin/reports/<id>/resolve/', 'description': 'Admin: resolve report'},
+
+        {'method': 'GET', 'path': '/search/', 'description': 'Full-text search over your requests, offers, community posts and freelancer bios (authenticated)'},
+
+        {'method': 'GET', 'path': '/notifications/unread-count/', 'description': 'Unread notification count (badge)'},
+        {'method': 'POST', 'path': '/notifications/mark-read/', 'description': 'Mark all (or up to an id) notifications read'},
+        {'method': 'POST', 'path': '/notifications/broadcasts/', 'description': 'Admin: notify every user of an audience (background fan-out)'},
+        {'method': 'GET', 'path': '/notifications/broadcasts/<id>/', 'description': 'Admin: broadcast progress'},
+
+        {'method': 'GET', 'path': '/events/stream/', 'description': 'Server-Sent Events: live notifications, negotiation comments and phase status changes'},
+        {'method': 'GET', 'path': '/events/poll/', 'description': 'Long-poll fallback of the event stream (?since=<cursor>)'},
     ]
     return Response(routes)
 
 # User views ----------------------------------
 @api_view(['GET'])
 def soft_get_user(request):
-    data = Client.objects.all()
-    serializer = ClientSerializer(data , many = True)
+    data = Client.objects.select_related('user')
+    serializer = ClientSerializer(data , many = True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -133,7 +165,7 @@ def register_freelancer(request):
         # create freelancer profile
         freelancer_data = data.get('freelancer', {})
         Freelancer.objects.create(user_id=user.id, **freelancer_data)
-        return Response({'user': UserSerializer(user).data}, status=status.HTTP_201_CREATED)
+        return Response({'user': PublicUserSerializer(user, context={'request': request}).data}, status=status.HTTP_201_CREATED)
     return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -153,7 +185,7 @@ def register_client(request):
         user.set_password(password)
         user.save()
         Client.objects.create(user_id=user.id)
-        return Response({'user': UserSerializer(user).data}, status=status.HTTP_201_CREATED)
+        return Response({'user': PublicUserSerializer(user, context={'request': request}).data}, status=status.HTTP_201_CREATED)
     return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -193,7 +225,7 @@ def register_company(request):
             'industry': data.get('industry', ''),
         }
         Company.objects.create(user_id=user.id, **company_data)
-        return Response({'user': UserSerializer(user).data}, status=status.HTTP_201_CREATED)
+        return Response({'user': PublicUserSerializer(user, context={'request': request}).data}, status=status.HTTP_201_CREATED)
     return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -209,10 +241,38 @@ def login_view(request):
     if user is None:
         return Response({'detail': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
     login(request, user)
-    return Response({'detail': 'Logged in', 'user': UserSerializer(user).data}, status=status.HTTP_200_OK)
+    return Response({
+        'detail': 'Logged in',
+        'user': PublicUserSerializer(user, context={'request': request}).data,
+        # for API clients: send "Authorization: Bearer <access>", renew at /auth/token/refresh/
+        'tokens': tokens.issue_tokens(user),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def token_refresh(request):
+    """POST /auth/token/refresh - exchange a refresh token for a new access/refresh pair"""
+    refresh_token = request.data.get('refresh')
+    if not refresh_token:
+        return Response({'detail': 'refresh token required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return Response(tokens.refresh(refresh_token, load_user))
+    except tokens.TokenError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+
 
 @api_view(['POST'])
 def logout_view(request):
+    """POST /auth/logout - end the session and revoke the presented access token and optional refresh token"""
+    if isinstance(request.auth, dict) and request.auth.get('kind') == tokens.ACCESS:
+        tokens.revoke(request.auth)
+    refresh_token = request.data.get('refresh')
+    if refresh_token:
+        try:
+            tokens.revoke(tokens.decode(refresh_token, tokens.REFRESH))
+        except tokens.TokenError:
+            pass  # already expired or revoked
     logout(request)
     return Response({'detail': 'Logged out'}, status=status.HTTP_200_OK)
 
@@ -243,15 +303,52 @@ def reset_password(request):
 
 
 # ---------- Profile endpoints (freelancer/client/company) ----------
-@api_view(['GET'])
-def _is_owner_or_staff(request, freelancer):
-    return request.user.is_staff or freelancer.user == request.user
+def _is_owner_or_staff(request, profile):
+    return request.user.is_staff or profile.user_id == request.user.id
 
 
 @api_view(['GET'])
 def get_freelancer(request, id):
-    freelancer = Freelancer.objects.get(user=id)
-    return Response(FreelancerSerializer(freelancer).data)
+    """GET /freelancers/:id - freelancer profile from the profile cache, 304 when the client's copy is current"""
+    profile = freelancer_profiles.get(id, request)
+    if profile is None:
+        return Response({'detail': 'Freelancer not found'}, status=status.HTTP_404_NOT_FOUND)
+    conditional = ConditionalGet(request, *profile.stamps, last_modified=newest(*profile.stamps))
+    not_modified = conditional.not_modified()
+    if not_modified:
+        return not_modified
+    if get_sparse_spec(request=request) is None:
+        return conditional.finalize(Response(profile.data))
+    freelancer = FreelancerSerializer.setup_eager_loading(Freelancer.objects.filter(user=id), get_sparse_spec(request=request)).first()
+    return conditional.finalize(Response(FreelancerSerializer(freelancer, context={'request': request}).data))
+
+@api_view(['GET'])
+def search_freelancers(request):
+    """GET /freelancers/search - freelancers filtered through the skill/category index, cursor paginated
+       ?skills=&categories= take ids or names (comma separated), matched any (default) or all
+       with ?skills_mode=all / ?categories_mode=all; also ?wilaya=&city=&min_experience=&min_rate=
+    """
+    params = request.query_params
+    filters = {}
+    for field, catalog in (('skills', Skill), ('categories', Category)):
+        mode = params.get(f'{field}_mode', 'any')
+        if mode not in ('any', 'all'):
+            return Response({'detail': f'{field}_mode must be "any" or "all"'}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get(field):
+            term_ids = freelancer_index.resolve_terms(catalog, params[field])
+            if not term_ids:
+                return paginate(request, Freelancer.objects.none(), FreelancerSerializer, ordering=('-user_id',))
+            filters[field] = term_ids
+            filters[f'{field}_all'] = mode == 'all'
+    try:
+        if params.get('min_experience'):
+            filters['min_experience'] = int(params['min_experience'])
+        if params.get('min_rate'):
+            filters['min_rate'] = float(params['min_rate'])
+    except ValueError:
+        return Response({'detail': 'min_experience and min_rate must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+    qs = freelancer_index.search_queryset(wilaya=params.get('wilaya'), city=params.get('city'), **filters)
+    return paginate(request, qs, FreelancerSerializer, ordering=('-user_id',))
 
 @api_view(['PUT'])
 def update_freelancer(request, id):
@@ -260,7 +357,7 @@ def update_freelancer(request, id):
     except Freelancer.DoesNotExist:
         return Response({'detail': 'Freelancer not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if not _is_owner_or_staff(request._request, freelancer):
+    if not _is_owner_or_staff(request, freelancer):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     
     user_fields = ['first_name', 'last_name']
@@ -273,7 +370,7 @@ def update_freelancer(request, id):
             setattr(user, field, value)
         user.save()
     
-    serializer = FreelancerSerializer(freelancer, data=freelancer_data, partial=True)
+    serializer = FreelancerSerializer(freelancer, data=freelancer_data, partial=True, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
@@ -282,7 +379,7 @@ def update_freelancer(request, id):
 @api_view(['PUT'])
 def update_freelancer_password(request, id):
     freelancer = Freelancer.objects.get(user=id)
-    if not _is_owner_or_staff(request._request, freelancer):
+    if not _is_owner_or_staff(request, freelancer):
             return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     user = freelancer.user
     old = request.data.get('old_password')
@@ -297,8 +394,16 @@ def update_freelancer_password(request, id):
 
 @api_view(['GET'])
 def get_client(request, id):
-    client = Client.objects.get(user=id)
-    return Response(ClientSerializer(client).data)
+    """GET /clients/:id - client profile, 304 when the client's copy is current"""
+    stamps = Client.objects.filter(user=id).values_list('updated_at', 'user__updated_at').first()
+    if stamps is None:
+        return Response({'detail': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
+    conditional = ConditionalGet(request, *stamps, last_modified=newest(*stamps))
+    not_modified = conditional.not_modified()
+    if not_modified:
+        return not_modified
+    client = ClientSerializer.setup_eager_loading(Client.objects.filter(user=id), get_sparse_spec(request=request)).first()
+    return conditional.finalize(Response(ClientSerializer(client, context={'request': request}).data))
 
 
 @api_view(['PUT'])
@@ -308,7 +413,7 @@ def update_client(request, id):
     except Client.DoesNotExist:
         return Response({'detail': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if not _is_owner_or_staff(request._request, client):
+    if not _is_owner_or_staff(request, client):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     
 
@@ -322,7 +427,7 @@ def update_client(request, id):
         user.save()
     
     client_data = {k: v for k, v in request.data.items() if k not in user_fields}
-    serializer = ClientSerializer(client, data=client_data, partial=True)
+    serializer = ClientSerializer(client, data=client_data, partial=True, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
@@ -332,7 +437,7 @@ def update_client(request, id):
 @api_view(['PUT'])
 def update_client_password(request, id):
     client = Client.objects.get(user=id)
-    if not _is_owner_or_staff(request._request, client):
+    if not _is_owner_or_staff(request, client):
             return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     user = client.user
     old = request.data.get('old_password')
@@ -348,11 +453,16 @@ def update_client_password(request, id):
 
 @api_view(['GET'])
 def get_company(request, id):
-    try:
-        company = Company.objects.get(user_id=id)
-    except Company.DoesNotExist:
+    """GET /companies/:id - company profile, 304 when the client's copy is current"""
+    stamp = Company.objects.filter(user_id=id).values_list('updated_at', flat=True).first()
+    if stamp is None:
         return Response({'detail': 'Company not found'}, status=status.HTTP_404_NOT_FOUND)
-    return Response(CompanySerializer(company).data)
+    conditional = ConditionalGet(request, stamp, last_modified=stamp)
+    not_modified = conditional.not_modified()
+    if not_modified:
+        return not_modified
+    company = Company.objects.get(user_id=id)
+    return conditional.finalize(Response(CompanySerializer(company, context={'request': request}).data))
 
 
 @api_view(['PUT'])
@@ -363,7 +473,7 @@ def update_company(request, id):
         return Response({'detail': 'Company not found'}, status=status.HTTP_404_NOT_FOUND)
     if not _is_owner_or_staff(request, company):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = CompanySerializer(company, data=request.data, partial=True)
+    serializer = CompanySerializer(company, data=request.data, partial=True, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
@@ -378,7 +488,7 @@ def update_company_password(request, id):
         return Response({'detail': 'Company not found'}, status=status.HTTP_404_NOT_FOUND)
     if not _is_owner_or_staff(request, company):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    user = company.user_id
+    user = company.user
     old = request.data.get('old_password')
     new = request.data.get('new_password')
     if not old or not new:
@@ -403,31 +513,33 @@ def soft_delete_user(request, id):
 # ---------- Request endpoints ----------
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(stream_renderers())
 def requests_list_create(request):
-    """GET /requests - list requests for current user (or all if staff)
+    """GET /requests - list requests for current user (or all if staff), cursor paginated
+       or streamed whole with ?stream=json|ndjson
        POST /requests - create a new request (client only)
     """
     if request.method == 'GET':
         if request.user.is_staff:
             qs = Request.objects.all()
         else:
-            try:
-                client = Client.objects.get(user=request.user)
-            except Client.DoesNotExist:
+            client = get_profile(request.user, 'client_profile')
+            if client is None:
                 return Response({'detail': 'No client profile for user'}, status=status.HTTP_404_NOT_FOUND)
             qs = Request.objects.filter(client=client)
-        serializer = RequestSerializer(qs, many=True)
-        return Response(serializer.data)
+        fmt = get_stream_format(request)
+        if fmt:
+            return stream_queryset(request, qs, RequestSerializer, fmt)
+        return paginate(request, qs, RequestSerializer)
 
     # POST request - create new request
-    try:
-         client = Client.objects.get(user=request.user)
-    except Client.DoesNotExist:
+    client = get_profile(request.user, 'client_profile')
+    if client is None:
         return Response({'detail': 'Only clients can create requests'}, status=status.HTTP_403_FORBIDDEN)
     
     data = request.data.copy()
     # Don't include client in data, pass it to save() instead
-    serializer = RequestSerializer(data=data)
+    serializer = RequestSerializer(data=data, context={'request': request})
     if serializer.is_valid():
         serializer.save(client=client)  # Pass the client object directly
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -443,7 +555,7 @@ def list_client_requests(request, client_id):
         return Response({'detail': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
     
     qs = Request.objects.filter(client=client)
-    serializer = RequestSerializer(qs, many=True)
+    serializer = RequestSerializer(qs, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -458,12 +570,12 @@ def request_detail(request, id):
     if request.method == 'GET':
         if not (is_owner or request.user.is_staff):
             return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-        return Response(RequestSerializer(req).data)
+        return Response(RequestSerializer(req, context={'request': request}).data)
 
     if request.method == 'PUT':
         if not (is_owner or request.user.is_staff):
             return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-        serializer = RequestSerializer(req, data=request.data, partial=True)
+        serializer = RequestSerializer(req, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -478,27 +590,62 @@ def request_detail(request, id):
         return Response({'detail': 'Request cancelled (soft deleted)'} , status=status.HTTP_200_OK)
 
 
+MATCHES_DEFAULT_K = 10
+MATCHES_MAX_K = 50
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def request_matches(request, id):
+    """GET /requests/:id/matches?k= - top-k freelancers for a request (owner or staff), with score breakdown"""
+    row = Request.objects.filter(id=id).values(
+        'client_id', 'title', 'category', 'budget_min', 'budget_max', 'client__wilaya').first()
+    if row is None:
+        return Response({'detail': 'Request not found'}, status=status.HTTP_404_NOT_FOUND)
+    if row['client_id'] != request.user.id and not request.user.is_staff:
+        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        k = max(1, min(int(request.query_params.get('k', MATCHES_DEFAULT_K)), MATCHES_MAX_K))
+    except ValueError:
+        return Response({'detail': 'k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    features = matching.request_features(
+        row['title'], row['category'], row['budget_min'], row['budget_max'], row['client__wilaya'])
+    # over-fetch: rows of freelancers deleted or deactivated since the last full refresh are dropped below
+    matches = matching.engine.top(features, 2 * k)
+    freelancers = FreelancerSerializer.setup_eager_loading(
+        Freelancer.objects.filter(user__in=[match.freelancer_id for match in matches], user__is_active=True),
+        get_sparse_spec(request=request),
+    ).in_bulk()
+    results = [
+        {'score': match.score, 'breakdown': match.breakdown,
+         'freelancer': FreelancerSerializer(freelancers[match.freelancer_id], context={'request': request}).data}
+        for match in matches if match.freelancer_id in freelancers
+    ][:k]
+    return Response({'request': id, 'results': results})
+
+
 # ---------- Negotiation endpoints ----------
 @api_view(['POST'])
 def create_direct_hire(request, freelancer_id):
     """POST /negotiations/directhire/:freelancerId - client initiates a direct hire negotiation"""
-    client = Client.objects.filter(user_id=request.user).first()
+    client = get_profile(request.user, 'client_profile')
     if not client:
         return Response({'detail': 'Only clients can initiate direct hire'}, status=status.HTTP_403_FORBIDDEN)
-    freelancer = Freelancer.objects.filter(id=freelancer_id).first()
+    freelancer = Freelancer.objects.filter(pk=freelancer_id).first()
     if not freelancer:
         return Response({'detail': 'Freelancer not found'}, status=status.HTTP_404_NOT_FOUND)
     data = {
         'origin_type': 'direct_hire',
-        'client_id': client.id,
-        'freelancer_id': freelancer.id,
+        'client_id': client.pk,
+        'freelancer_id': freelancer.pk,
         'status': 'in_progress',
         'client_agreed': True,
     }
-    serializer = NegotiationSerializer(data=data)
+    serializer = NegotiationSerializer(data=data, context={'request': request})
     if serializer.is_valid():
-        negotiation = serializer.save()
-        return Response(NegotiationSerializer(negotiation).data, status=status.HTTP_201_CREATED)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -509,16 +656,16 @@ def create_from_request(request, request_id):
     if not req:
         return Response({'detail': 'Request not found'}, status=status.HTTP_404_NOT_FOUND)
     # Only client who created request or staff can create negotiation for it
-    if not (request.user.is_staff or req.client_id.user_id.id == request.user.id):
+    if not (request.user.is_staff or req.client_id == request.user.id):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     data = request.data.copy()
     data['origin_type'] = 'request'
     data['request_id'] = req.id
-    data['client_id'] = req.client_id.id
-    serializer = NegotiationSerializer(data=data)
+    data['client_id'] = req.client_id
+    serializer = NegotiationSerializer(data=data, context={'request': request})
     if serializer.is_valid():
-        negotiation = serializer.save()
-        return Response(NegotiationSerializer(negotiation).data, status=status.HTTP_201_CREATED)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -527,19 +674,19 @@ def negotiation_detail(request, id):
     """GET /negotiations/:id - return negotiation and its phases
        DELETE /negotiations/:id - soft delete (set status to 'declined')
     """
-    negotiation = Negotiation.objects.filter(id=id).first()
-    if not negotiation:
+    access = negotiation_access(request, id)
+    if not access:
         return Response({'detail': 'Negotiation not found'}, status=status.HTTP_404_NOT_FOUND)
     # ownership: client or freelancer or staff
-    client_user_id = negotiation.client_id.user_id.id if negotiation.client_id else None
-    freelancer_user_id = negotiation.freelancer_id.user_id.id if negotiation.freelancer_id else None
-    is_owner = request.user.is_staff or request.user.id in (client_user_id, freelancer_user_id)
-    if not is_owner:
+    if not access.allows(request.user):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    negotiation = access.object
     if request.method == 'GET':
-        data = NegotiationSerializer(negotiation).data
-        phases = NegotiationPhase.objects.filter(negotiation_id=negotiation)
-        data['phases'] = NegotiationPhaseSerializer(phases, many=True).data
+        negotiation = NegotiationSerializer.setup_eager_loading(
+            Negotiation.objects.filter(id=id), get_sparse_spec(request=request)).first()
+        data = NegotiationSerializer(negotiation, context={'request': request}).data
+        phases = NegotiationPhase.objects.filter(negotiation=negotiation)
+        data['phases'] = NegotiationPhaseSerializer(phases, many=True, context={'request': request}).data
         return Response(data)
     # DELETE -> soft delete by setting status
     negotiation.status = 'declined'
@@ -551,20 +698,18 @@ def negotiation_detail(request, id):
 @api_view(['POST'])
 def add_phase(request, id):
     """POST /negotiations/:id/phases - add a phase to negotiation"""
-    negotiation = Negotiation.objects.filter(id=id).first()
-    if not negotiation:
+    access = negotiation_access(request, id)
+    if not access:
         return Response({'detail': 'Negotiation not found'}, status=status.HTTP_404_NOT_FOUND)
     # only negotiation participants or staff
-    client_user_id = negotiation.client_id.user_id.id if negotiation.client_id else None
-    freelancer_user_id = negotiation.freelancer_id.user_id.id if negotiation.freelancer_id else None
-    if not (request.user.is_staff or request.user.id in (client_user_id, freelancer_user_id)):
+    if not access.allows(request.user):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     data = request.data.copy()
-    data['negotiation_id'] = negotiation.id
-    serializer = NegotiationPhaseSerializer(data=data)
+    data['negotiation_id'] = access.object.id
+    serializer = NegotiationPhaseSerializer(data=data, context={'request': request})
     if serializer.is_valid():
         phase = serializer.save()
-        return Response(NegotiationPhaseSerializer(phase).data, status=status.HTTP_201_CREATED)
+        return Response(NegotiationPhaseSerializer(phase, context={'request': request}).data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -573,16 +718,14 @@ def negotiation_phase_detail(request, phase_id):
     """PUT /negotiations/phases/:phaseId - update
        DELETE /negotiations/phases/:phaseId - delete
     """
-    phase = NegotiationPhase.objects.filter(id=phase_id).first()
-    if not phase:
+    access = negotiation_phase_access(request, phase_id)
+    if not access:
         return Response({'detail': 'Phase not found'}, status=status.HTTP_404_NOT_FOUND)
-    negotiation = phase.negotiation_id
-    client_user_id = negotiation.client_id.user_id.id if negotiation.client_id else None
-    freelancer_user_id = negotiation.freelancer_id.user_id.id if negotiation.freelancer_id else None
-    if not (request.user.is_staff or request.user.id in (client_user_id, freelancer_user_id)):
+    if not access.allows(request.user):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    phase = access.object
     if request.method == 'PUT':
-        serializer = NegotiationPhaseSerializer(phase, data=request.data, partial=True)
+        serializer = NegotiationPhaseSerializer(phase, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -595,14 +738,13 @@ def negotiation_phase_detail(request, phase_id):
 @api_view(['POST'])
 def agree_negotiation(request, id):
     """POST /negotiations/:id/agree - current user agrees to negotiation"""
-    negotiation = Negotiation.objects.filter(id=id).first()
-    if not negotiation:
+    access = negotiation_access(request, id)
+    if not access:
         return Response({'detail': 'Negotiation not found'}, status=status.HTTP_404_NOT_FOUND)
-    client_user_id = negotiation.client_id.user_id.id if negotiation.client_id else None
-    freelancer_user_id = negotiation.freelancer_id.user_id.id if negotiation.freelancer_id else None
-    if request.user.id == client_user_id:
+    negotiation = access.object
+    if access.is_client(request.user):
         negotiation.client_agreed = True
-    elif request.user.id == freelancer_user_id:
+    elif access.is_freelancer(request.user):
         negotiation.freelancer_agreed = True
     else:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
@@ -610,22 +752,25 @@ def agree_negotiation(request, id):
     if negotiation.client_agreed and negotiation.freelancer_agreed:
         negotiation.status = 'agreed'
     negotiation.save()
-    return Response(NegotiationSerializer(negotiation).data)
+    return Response(NegotiationSerializer(negotiation, context={'request': request}).data)
 
 
 @api_view(['POST'])
 def decline_negotiation(request, id):
     """POST /negotiations/:id/decline - current user declines and provides reason"""
-    negotiation = Negotiation.objects.filter(id=id).first()
-    if not negotiation:
+    access = negotiation_access(request, id)
+    if not access:
         return Response({'detail': 'Negotiation not found'}, status=status.HTTP_404_NOT_FOUND)
+    if not access.allows(request.user):
+        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    negotiation = access.object
     reason = request.data.get('reason', '')
     # set declined_by and decline_reason
     negotiation.declined_by = request.user
     negotiation.decline_reason = reason
     negotiation.status = 'declined'
     negotiation.save()
-    return Response(NegotiationSerializer(negotiation).data)
+    return Response(NegotiationSerializer(negotiation, context={'request': request}).data)
 
 
 # ---------- Comments (negotiation + project) ----------
@@ -637,8 +782,8 @@ def negotiation_comments(request, id):
     if not negotiation:
         return Response({'detail': 'Negotiation not found'}, status=status.HTTP_404_NOT_FOUND)
     if request.method == 'GET':
-        qs = NegotiationFloatingComment.objects.filter(negotiation=negotiation).exclude(status='deleted')
-        return Response(NegotiationFloatingCommentSerializer(qs, many=True).data)
+        qs = NegotiationFloatingComment.objects.filter(negotiation=negotiation).exclude(status='deleted').select_related('user')
+        return Response(NegotiationFloatingCommentSerializer(qs, many=True, context={'request': request}).data)
 
     # POST - create
     text = request.data.get('comment')
@@ -658,7 +803,7 @@ def negotiation_comments(request, id):
         parent=parent,
 
     )
-    return Response(NegotiationFloatingCommentSerializer(comment).data, status=status.HTTP_201_CREATED)
+    return Response(NegotiationFloatingCommentSerializer(comment, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
 # @api_view(['POST', 'GET'])
@@ -705,7 +850,7 @@ def update_or_delete_comment(request, id):
                 return Response({'detail': 'comment text required'}, status=status.HTTP_400_BAD_REQUEST)
             ncomment.comment = text
             ncomment.save()
-            return Response(NegotiationFloatingCommentSerializer(ncomment).data)
+            return Response(NegotiationFloatingCommentSerializer(ncomment, context={'request': request}).data)
         # DELETE soft-delete via status
         ncomment.status = 'deleted'
         ncomment.save()
@@ -722,7 +867,7 @@ def resolve_comment(request, id):
             return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
         ncomment.status = 'resolved'
         ncomment.save()
-        return Response(NegotiationFloatingCommentSerializer(ncomment).data)
+        return Response(NegotiationFloatingCommentSerializer(ncomment, context={'request': request}).data)
 
 
 @api_view(['POST'])
@@ -739,7 +884,7 @@ def reply_to_comment(request, id):
             comment=text,
             parent=parent_n,
         )
-        return Response(NegotiationFloatingCommentSerializer(reply).data, status=status.HTTP_201_CREATED)
+        return Response(NegotiationFloatingCommentSerializer(reply, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
     return Response({'detail': 'Parent comment not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -748,17 +893,11 @@ def reply_to_comment(request, id):
 @api_view(['GET'])
 def list_projects_for_user(request, user_id):
     """GET /projects/:user_id - list projects where the user is client or freelancer"""
-    user = User.objects.filter(id=user_id).first()
-    if not user:
+    if not User.objects.filter(id=user_id).exists():
         return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
-    client = Client.objects.filter(user_id=user).first()
-    freelancer = Freelancer.objects.filter(user_id=user).first()
-    qs = Project.objects.none()
-    if client:
-        qs = qs | Project.objects.filter(negotiation_id__client_id=client)
-    if freelancer:
-        qs = qs | Project.objects.filter(negotiation_id__freelancer_id=freelancer)
-    serializer = ProjectSerializer(qs.distinct(), many=True)
+    # Client/Freelancer share the user's primary key, so no profile lookups are needed
+    qs = Project.objects.filter(Q(negotiation__client_id=user_id) | Q(negotiation__freelancer_id=user_id))
+    serializer = ProjectSerializer(qs, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -767,46 +906,38 @@ def project_phases_list_create(request, id):
     """GET /projects/:id/phases - list phases
        POST /projects/:id/phases - add phase to project
     """
-    project = Project.objects.filter(id=id).first()
-    if not project:
+    access = project_access(request, id)
+    if not access:
         return Response({'detail': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
-    negotiation = project.negotiation_id
-    client_user_id = negotiation.client_id.user_id.id if negotiation and negotiation.client_id else None
-    freelancer_user_id = negotiation.freelancer_id.user_id.id if negotiation and negotiation.freelancer_id else None
+    if not access.allows(request.user):
+        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     if request.method == 'GET':
-        if not (request.user.is_staff or request.user.id in (client_user_id, freelancer_user_id)):
-            return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-        phases = ProjectPhase.objects.filter(project_id=project)
-        return Response(ProjectPhaseSerializer(phases, many=True).data)
+        phases = ProjectPhase.objects.filter(project_id=id)
+        return Response(ProjectPhaseSerializer(phases, many=True, context={'request': request}).data)
 
     # POST
-    if not (request.user.is_staff or request.user.id in (client_user_id, freelancer_user_id)):
-        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     data = request.data.copy()
-    data['project_id'] = project.id
-    serializer = ProjectPhaseSerializer(data=data)
+    data['project_id'] = access.object.id
+    serializer = ProjectPhaseSerializer(data=data, context={'request': request})
     if serializer.is_valid():
         phase = serializer.save()
-        return Response(ProjectPhaseSerializer(phase).data, status=status.HTTP_201_CREATED)
+        return Response(ProjectPhaseSerializer(phase, context={'request': request}).data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['PUT', 'DELETE'])
 def project_phase_detail(request, id, phase_id):
     """PUT/DELETE project phase"""
-    project = Project.objects.filter(id=id).first()
-    if not project:
-        return Response({'detail': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
-    phase = ProjectPhase.objects.filter(id=phase_id, project_id=project).first()
-    if not phase:
+    access = project_phase_access(request, phase_id, project_id=id)
+    if not access:
+        if not Project.objects.filter(id=id).exists():
+            return Response({'detail': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
         return Response({'detail': 'Phase not found'}, status=status.HTTP_404_NOT_FOUND)
-    negotiation = project.negotiation_id
-    client_user_id = negotiation.client_id.user_id.id if negotiation and negotiation.client_id else None
-    freelancer_user_id = negotiation.freelancer_id.user_id.id if negotiation and negotiation.freelancer_id else None
-    if not (request.user.is_staff or request.user.id in (client_user_id, freelancer_user_id)):
+    if not access.allows(request.user):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    phase = access.object
     if request.method == 'PUT':
-        serializer = ProjectPhaseSerializer(phase, data=request.data, partial=True)
+        serializer = ProjectPhaseSerializer(phase, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -819,75 +950,67 @@ def project_phase_detail(request, id, phase_id):
 
 @api_view(['POST'])
 def start_phase(request, phase_id):
-    phase = ProjectPhase.objects.filter(id=phase_id).first()
-    if not phase:
+    access = project_phase_access(request, phase_id)
+    if not access:
         return Response({'detail': 'Phase not found'}, status=status.HTTP_404_NOT_FOUND)
-    project = phase.project_id
-    negotiation = project.negotiation_id
-    freelancer_user_id = negotiation.freelancer_id.user_id.id if negotiation and negotiation.freelancer_id else None
     # only freelancer can start
-    if request.user.id != freelancer_user_id and not request.user.is_staff:
+    if not access.allows(request.user, role='freelancer'):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    phase = access.object
     phase.status = 'in_progress'
     phase.save()
-    return Response(ProjectPhaseSerializer(phase).data)
+    return Response(ProjectPhaseSerializer(phase, context={'request': request}).data)
 
 
 @api_view(['POST'])
 def submit_phase(request, phase_id):
-    phase = ProjectPhase.objects.filter(id=phase_id).first()
-    if not phase:
+    access = project_phase_access(request, phase_id)
+    if not access:
         return Response({'detail': 'Phase not found'}, status=status.HTTP_404_NOT_FOUND)
-    project = phase.project
-    negotiation = project.negotiation
-    freelancer_user_id = negotiation.freelancer.user.id if negotiation and negotiation.freelancer else None
-    if request.user.id != freelancer_user_id and not request.user.is_staff:
+    if not access.allows(request.user, role='freelancer'):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    phase = access.object
     phase.status = 'waiting_client_review'
     phase.save()
     # optionally create deliverable if provided
     data = request.data.copy()
     if data.get('link') or data.get('attachment') or data.get('textcontent') or data.get('title'):
         data['phase'] = phase.id
-        dser = DeliverableSerializer(data=data)
+        dser = DeliverableSerializer(data=data, context={'request': request})
         if dser.is_valid():
             dser.save()
-    return Response(ProjectPhaseSerializer(phase).data)
+    return Response(ProjectPhaseSerializer(phase, context={'request': request}).data)
 
 
 @api_view(['POST'])
 def approve_phase(request, phase_id):
-    phase = ProjectPhase.objects.filter(id=phase_id).first()
-    if not phase:
+    access = project_phase_access(request, phase_id)
+    if not access:
         return Response({'detail': 'Phase not found'}, status=status.HTTP_404_NOT_FOUND)
-    project = phase.project
-    negotiation = project.negotiation
-    client_user_id = negotiation.client.user.id if negotiation and negotiation.client else None
-    if request.user.id != client_user_id and not request.user.is_staff:
+    if not access.allows(request.user, role='client'):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    phase = access.object
     phase.status = 'done'
     phase.save()
-    return Response(ProjectPhaseSerializer(phase).data)
+    return Response(ProjectPhaseSerializer(phase, context={'request': request}).data)
 
 
 @api_view(['POST'])
 def next_phase(request, phase_id):
-    phase = ProjectPhase.objects.filter(id=phase_id).first()
-    if not phase:
+    access = project_phase_access(request, phase_id)
+    if not access:
         return Response({'detail': 'Phase not found'}, status=status.HTTP_404_NOT_FOUND)
-    project = phase.project
-    negotiation = project.negotiation
     # allow client or system (staff)
-    client_user_id = negotiation.client_id.user_id.id if negotiation and negotiation.client_id else None
-    if request.user.id != client_user_id and not request.user.is_staff:
+    if not access.allows(request.user, role='client'):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    phase = access.object
     # find next phase by created_at
-    next_phase = ProjectPhase.objects.filter(project_id=project, created_at__gt=phase.created_at).order_by('created_at').first()
+    next_phase = ProjectPhase.objects.filter(project_id=phase.project_id, created_at__gt=phase.created_at).order_by('created_at').first()
     if not next_phase:
         return Response({'detail': 'No next phase'}, status=status.HTTP_404_NOT_FOUND)
     next_phase.status = 'in_progress'
     next_phase.save()
-    return Response(ProjectPhaseSerializer(next_phase).data)
+    return Response(ProjectPhaseSerializer(next_phase, context={'request': request}).data)
 
 
 @api_view(['POST'])
@@ -896,47 +1019,66 @@ def reject_phase(request, phase_id):
     """POST /projects/phases/:phase_id/reject - client (or admin) rejects the phase submission
     Sets phase back to 'in_progress' so freelancer can rework the deliverable.
     """
-    phase = ProjectPhase.objects.filter(id=phase_id).first()
-    if not phase:
+    access = project_phase_access(request, phase_id)
+    if not access:
         return Response({'detail': 'Phase not found'}, status=status.HTTP_404_NOT_FOUND)
-    project = phase.project
-    negotiation = project.negotiation
-    client_user_id = negotiation.client.user_id.id if negotiation and negotiation.client else None
-    if request.user.id != client_user_id and not request.user.is_staff:
+    if not access.allows(request.user, role='client'):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    phase = access.object
     # move back to in_progress so freelancer resumes work
     phase.status = 'in_progress'
     phase.save()
-    return Response(ProjectPhaseSerializer(phase).data)
+    return Response(ProjectPhaseSerializer(phase, context={'request': request}).data)
+
+
+def _project_validators(id):
+    """Participants and change markers of everything GET /projects/:id renders, in one query
+
+    Returns ``(client_user_id, freelancer_user_id, *validators)`` or None.
+    """
+    phases = ProjectPhase.objects.filter(project=OuterRef('pk')).order_by().values('project')
+    deliverables = Deliverable.objects.filter(phase__project=OuterRef('pk')).order_by().values('phase__project')
+    return Project.objects.filter(id=id).annotate(
+        phases_changed=Subquery(phases.annotate(stamp=Max('updated_at')).values('stamp')),
+        phases_count=Subquery(phases.annotate(total=Count('id')).values('total')),
+        deliverables_changed=Subquery(deliverables.annotate(stamp=Max('updated_at')).values('stamp')),
+        deliverables_count=Subquery(deliverables.annotate(total=Count('id')).values('total')),
+    ).values_list(
+        'negotiation__client_id', 'negotiation__freelancer_id',
+        'updated_at', 'negotiation__updated_at', 'negotiation__request__updated_at',
+        'negotiation__declined_by__updated_at',
+        'negotiation__client__updated_at', 'negotiation__client__user__updated_at',
+        'negotiation__freelancer__updated_at', 'negotiation__freelancer__user__updated_at',
+        'phases_changed', 'phases_count', 'deliverables_changed', 'deliverables_count',
+    ).first()
 
 
 @api_view(['GET'])
 def get_project_detail(request, id):
-    project = Project.objects.filter(id=id).first()
-    if not project:
+    """GET /projects/:id - project with its phases and their deliverables
+    One query checks access and computes the validators, so revalidating an unchanged
+    project returns 304 without loading it; otherwise three more queries (project graph,
+    phases, deliverables) load it whatever the size.
+    """
+    row = _project_validators(id)
+    if row is None:
         return Response({'detail': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
-    negotiation = project.negotiation_id
-    client_user_id = negotiation.client_id.user_id.id if negotiation and negotiation.client_id else None
-    freelancer_user_id = negotiation.freelancer_id.user_id.id if negotiation and negotiation.freelancer_id else None
-    if not (request.user.is_staff or request.user.id in (client_user_id, freelancer_user_id)):
+    # the validator query already carries the participants, so the access check is free
+    if not Access(None, *row[:2]).allows(request.user):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    data = ProjectSerializer(project).data
-    phases = ProjectPhase.objects.filter(project_id=project)
-    data['phases'] = ProjectPhaseSerializer(phases, many=True).data
-    # include deliverables for each phase
-    for p in data['phases']:
-        items = Deliverable.objects.filter(phase_id_id=p['id'])
-        p['deliverables'] = DeliverableSerializer(items, many=True).data
-    return Response(data)
+    conditional = ConditionalGet(request, *row)
+    not_modified = conditional.not_modified()
+    if not_modified:
+        return not_modified
+    project = ProjectDetailSerializer.setup_eager_loading(Project.objects.filter(id=id), get_sparse_spec(request=request)).first()
+    return conditional.finalize(Response(ProjectDetailSerializer(project, context={'request': request}).data))
 
 
 # ---------- FAQ endpoints ----------
 @api_view(['GET'])
 def get_faqs(request):
-    """GET /faq - public list of FAQs"""
-    faqs = FAQ.objects.all()
-    serializer = FAQSerializer(faqs, many=True)
-    return Response(serializer.data)
+    """GET /faq - public list of FAQs, served from the catalog cache"""
+    return catalog_response(request, 'faq')
 
 
 @api_view(['POST'])
@@ -945,7 +1087,7 @@ def admin_add_faq(request):
     """POST /admin/faq - admin only"""
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = FAQSerializer(data=request.data)
+    serializer = FAQSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -962,7 +1104,7 @@ def admin_manage_faq(request, id):
     if not faq:
         return Response({'detail': 'FAQ not found'}, status=status.HTTP_404_NOT_FOUND)
     if request.method == 'PUT':
-        serializer = FAQSerializer(faq, data=request.data, partial=True)
+        serializer = FAQSerializer(faq, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -982,7 +1124,7 @@ def create_help(request):
         return Response({'detail': 'problem field is required'}, status=status.HTTP_400_BAD_REQUEST)
     
     data['user_id'] = request.user.id
-    serializer = HelpSerializer(data=data)
+    serializer = HelpSerializer(data=data, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -992,8 +1134,8 @@ def create_help(request):
 @api_view(['GET'])
 def my_help_requests(request):
     """GET /help/my - list help requests submitted by authenticated user"""
-    qs = Help.objects.filter(user=request.user)
-    serializer = HelpSerializer(qs, many=True)
+    qs = Help.objects.filter(user=request.user).select_related('user')
+    serializer = HelpSerializer(qs, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -1007,7 +1149,7 @@ def resolve_help_request(request, id):
         return Response({'detail': 'Help request not found'}, status=status.HTTP_404_NOT_FOUND)
     ticket.status = 'resolved'
     ticket.save()
-    return Response(HelpSerializer(ticket).data)
+    return Response(HelpSerializer(ticket, context={'request': request}).data)
 
 
 # ---------- Review endpoints ----------
@@ -1015,21 +1157,21 @@ def resolve_help_request(request, id):
 @permission_classes([IsAuthenticated])
 def create_review(request):
     """POST /reviews - client adds a review for a freelancer"""
-    client = Client.objects.filter(user_id=request.user).first()
+    client = get_profile(request.user, 'client_profile')
     if not client:
         return Response({'detail': 'Only clients can create reviews'}, status=status.HTTP_403_FORBIDDEN)
     data = request.data.copy()
     freelancer_id = data.get('freelancer_id')
     if not freelancer_id:
         return Response({'detail': 'freelancer_id is required'}, status=status.HTTP_400_BAD_REQUEST)
-    freelancer = Freelancer.objects.filter(id=freelancer_id).first()
+    freelancer = Freelancer.objects.filter(pk=freelancer_id).first()
     if not freelancer:
         return Response({'detail': 'Freelancer not found'}, status=status.HTTP_404_NOT_FOUND)
-    data['client'] = client.id
-    data['client_id'] = client.id
-    data['freelancer'] = freelancer.id
-    data['freelancer_id'] = freelancer.id
-    serializer = ReviewSerializer(data=data)
+    data['client'] = client.pk
+    data['client_id'] = client.pk
+    data['freelancer'] = freelancer.pk
+    data['freelancer_id'] = freelancer.pk
+    serializer = ReviewSerializer(data=data, context={'request': request})
     try:
         if serializer.is_valid():
             serializer.save()
@@ -1041,13 +1183,18 @@ def create_review(request):
 
 @api_view(['GET'])
 def list_reviews_for_freelancer(request, freelancer_id):
-    """GET /reviews/freelancer/{freelancerId} - list reviews for a freelancer"""
-    freelancer = Freelancer.objects.filter(id=freelancer_id).first()
-    if not freelancer:
+    """GET /reviews/freelancer/{freelancerId} - list reviews for a freelancer, with the rating summary and star histogram"""
+    summary = Freelancer.objects.filter(pk=freelancer_id).values('rate', 'rating_count').first()
+    if summary is None:
         return Response({'detail': 'Freelancer not found'}, status=status.HTTP_404_NOT_FOUND)
-    qs = Review.objects.filter(freelancer=freelancer, is_deleted=False)
-    serializer = ReviewSerializer(qs, many=True)
-    return Response(serializer.data)
+    qs = Review.objects.filter(freelancer_id=freelancer_id, is_deleted=False)
+    response = paginate(request, qs, ReviewSerializer)
+    response.data['rating'] = {
+        'average': summary['rate'],
+        'count': summary['rating_count'],
+        'histogram': ratings.histogram(freelancer_id),
+    }
+    return response
 
 
 @api_view(['PUT', 'DELETE'])
@@ -1056,14 +1203,16 @@ def update_or_delete_review(request, id):
     """PUT /reviews/{id} - owner only
        DELETE /reviews/{id} - soft delete (owner or admin)
     """
-    review = Review.objects.filter(id=id).first()
+    review = Review.objects.filter(id=id, is_deleted=False).first()
     if not review:
         return Response({'detail': 'Review not found'}, status=status.HTTP_404_NOT_FOUND)
-    owner_user_id = review.client.user_id.id if review.client and review.client.user_id else None
+    owner_user_id = review.client_id  # clients are keyed by their user id
     if request.method == 'PUT':
         if request.user.id != owner_user_id:
             return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-        serializer = ReviewSerializer(review, data=request.data, partial=True)
+        # a review stays attached to the client and freelancer it was written for
+        data = {k: v for k, v in request.data.items() if k not in ('client_id', 'freelancer_id')}
+        serializer = ReviewSerializer(review, data=data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -1118,7 +1267,7 @@ def upload_media(request):
         file_url=file_url,
         file_type=file_type,
     )
-    return Response(MediaFileSerializer(media).data, status=status.HTTP_201_CREATED)
+    return Response(MediaFileSerializer(media, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
@@ -1127,8 +1276,7 @@ def list_media(request, entity_type, entity_id):
     Excludes items marked as deleted (we mark deleted media by setting file_type='deleted').
     """
     qs = MediaFile.objects.filter(entity_type=entity_type, entity_id=entity_id).exclude(file_type='deleted')
-    serializer = MediaFileSerializer(qs, many=True)
-    return Response(serializer.data)
+    return paginate(request, qs, MediaFileSerializer)
 
 
 @api_view(['DELETE'])
@@ -1149,40 +1297,73 @@ def delete_media(request, id):
 
 
 # ---------- Admin / Stats / Catalog endpoints ----------
+@api_view(['GET'])
+def admin_stats_dashboard(request):
+    """GET /admin/stats - every dashboard figure in one query on the counters table"""
+    if not request.user.is_staff:
+        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(stats.dashboard())
+
+
 @api_view(['GET'])
 def admin_stats_users(request):
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    num_freelancers = Freelancer.objects.count()
-    num_clients = Client.objects.count()
-    num_companies = Company.objects.count()
-    return Response({'freelancers': num_freelancers, 'clients': num_clients, 'companies': num_companies})
+    figures = stats.dashboard()
+    return Response({'freelancers': figures['freelancers'], 'clients': figures['clients'], 'companies': figures['companies']})
+
+
+@api_view(['GET'])
+def admin_stats_cache(request):
+    """GET /admin/stats/cache - hit/miss counters of this worker's freelancer profile cache"""
+    if not request.user.is_staff:
+        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    return Response({'freelancer_profiles': freelancer_profiles.stats()})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def admin_jobs(request):
+    """GET /admin/jobs - background queue depth (by status and per task) and the latest failed jobs"""
+    if not request.user.is_staff:
+        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    failures = Job.objects.filter(status='failed').order_by('-id').values(
+        'id', 'task', 'kwargs', 'attempts', 'last_error', 'created_at')[:20]
+    return Response(dict(jobs.depth(), recent_failures=list(failures)))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def admin_retry_job(request, job_id):
+    """POST /admin/jobs/<job_id>/retry - queue a failed job again with a fresh attempt budget"""
+    if not request.user.is_staff:
+        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    if not jobs.retry(job_id):
+        return Response({'detail': 'No failed job with this id'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'detail': 'Job queued'})
 
 
 @api_view(['GET'])
 def admin_stats_posts(request):
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    num_posts = JobInternshipOffer.objects.count()
-    return Response({'posted_jobs': num_posts})
+    return Response({'posted_jobs': stats.dashboard()['posted_jobs']})
 
 
 @api_view(['GET'])
 def admin_stats_requests(request):
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    # consider 'active' requests as those pending or accepted
-    active_qs = Request.objects.filter(status__in=['pending', 'accepted'])
-    return Response({'active_requests': active_qs.count()})
+    # 'active' requests are those pending or accepted
+    return Response({'active_requests': stats.dashboard()['active_requests']})
 
 
 @api_view(['GET'])
 def admin_stats_negotiations(request):
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    active = Negotiation.objects.filter(status__in=['in_progress', 'agreed', 'completed']).count()
-    declined = Negotiation.objects.filter(status='declined').count()
-    return Response({'active_negotiations': active, 'declined_negotiations': declined})
+    figures = stats.dashboard()
+    return Response({'active_negotiations': figures['active_negotiations'], 'declined_negotiations': figures['declined_negotiations']})
 
 
 @api_view(['GET'])
@@ -1190,16 +1371,15 @@ def admin_stats_projects(request):
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     # Active projects: those whose negotiation is not declined
-    active = Project.objects.filter(~Q(negotiation__status='declined')).count()
-    declined = Project.objects.filter(negotiation__status='declined').count()
-    return Response({'active_projects': active, 'declined_projects': declined})
+    figures = stats.dashboard()
+    return Response({'active_projects': figures['active_projects'], 'declined_projects': figures['declined_projects']})
 
 
 @api_view(['POST'])
 def admin_add_skill(request):
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = SkillSerializer(data=request.data)
+    serializer = SkillSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -1210,7 +1390,7 @@ def admin_add_skill(request):
 def admin_add_category(request):
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = CategorySerializer(data=request.data)
+    serializer = CategorySerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -1219,24 +1399,28 @@ def admin_add_category(request):
 
 @api_view(['GET'])
 def list_skills(request):
-    qs = Skill.objects.all()
-    return Response(SkillSerializer(qs, many=True).data)
+    """GET /skills - served from the catalog cache"""
+    return catalog_response(request, 'skills')
 
 
 @api_view(['GET'])
 def list_categories(request):
-    qs = Category.objects.all()
-    return Response(CategorySerializer(qs, many=True).data)
+    """GET /categories - served from the catalog cache"""
+    return catalog_response(request, 'categories')
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(stream_renderers())
 def admin_list_reports(request):
+    """GET /admin/reports - cursor paginated, or streamed whole with ?stream=json|ndjson"""
     if not request.user.is_staff:
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     qs = Report.objects.all()
-    serializer = ReportSerializer(qs, many=True)
-    return Response(serializer.data)
+    fmt = get_stream_format(request)
+    if fmt:
+        return stream_queryset(request, qs, ReportSerializer, fmt)
+    return paginate(request, qs, ReportSerializer)
 
 
 @api_view(['POST'])
@@ -1249,7 +1433,7 @@ def admin_resolve_report(request, id):
         return Response({'detail': 'Report not found'}, status=status.HTTP_404_NOT_FOUND)
     rpt.status = 'resolved'
     rpt.save()
-    return Response(ReportSerializer(rpt).data)
+    return Response(ReportSerializer(rpt, context={'request': request}).data)
 
 
 # Community System APIs ============================================================
@@ -1259,18 +1443,17 @@ def admin_resolve_report(request, id):
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def community_posts(request):
-    """GET /community/posts - List all community posts (paginated)
+    """GET /community/posts - List community posts, newest first (cursor paginated)
     POST /community/posts - Create a new community post
     """
     if request.method == 'GET':
         # Get all posts with likes and comments count
-        posts = CommunityPost.objects.all().order_by('-created_at')
+        posts = CommunityPost.objects.all()
         # Optional: filter by owner
         owner_id = request.query_params.get('owner_id')
         if owner_id:
             posts = posts.filter(owner_id=owner_id)
-        serializer = CommunityPostSerializer(posts, many=True)
-        return Response(serializer.data)
+        return paginate(request, posts, CommunityPostSerializer)
     
     elif request.method == 'POST':
         # Create a new post
@@ -1285,7 +1468,7 @@ def community_posts(request):
             description=description,
             attachments=attachments
         )
-        return Response(CommunityPostSerializer(post).data, status=status.HTTP_201_CREATED)
+        return Response(CommunityPostSerializer(post, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
@@ -1300,7 +1483,7 @@ def community_post_detail(request, post_id):
         return Response({'detail': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = CommunityPostSerializer(post)
+        serializer = CommunityPostSerializer(post, context={'request': request})
         return Response(serializer.data)
     
     elif request.method == 'PUT':
@@ -1313,7 +1496,7 @@ def community_post_detail(request, post_id):
         post.description = description
         post.attachments = attachments
         post.save()
-        return Response(CommunityPostSerializer(post).data)
+        return Response(CommunityPostSerializer(post, context={'request': request}).data)
     
     elif request.method == 'DELETE':
         if post.owner_id != request.user.id:
@@ -1327,7 +1510,8 @@ def community_post_detail(request, post_id):
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def community_comments(request, post_id):
-    """GET /community/posts/<post_id>/comments - Get all comments for a post
+    """GET /community/posts/<post_id>/comments - Get the comment thread of a post
+    Optional query params: parent_id (subtree root), depth (levels), page_size (comments per level)
     POST /community/posts/<post_id>/comments - Create a comment on a post
     """
     post = CommunityPost.objects.filter(id=post_id).first()
@@ -1335,8 +1519,24 @@ def community_comments(request, post_id):
         return Response({'detail': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        comments = post.comments.filter(parent__isnull=True).order_by('created_at')
-        serializer = CommunityCommentDetailSerializer(comments, many=True)
+        params = {}
+        for name in ('parent_id', 'depth', 'page_size'):
+            value = request.query_params.get(name)
+            if value is None:
+                continue
+            try:
+                params[name] = int(value)
+            except ValueError:
+                return Response({'detail': f'{name} must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        parent_id = params.get('parent_id')
+        if parent_id is not None and not post.comments.filter(id=parent_id).exists():
+            return Response({'detail': 'Parent comment not found'}, status=status.HTTP_404_NOT_FOUND)
+        comments = post.comment_tree(
+            parent_id=parent_id,
+            max_depth=params.get('depth'),
+            page_size=params.get('page_size'),
+        )
+        serializer = CommunityCommentDetailSerializer(comments, many=True, context={'request': request})
         return Response(serializer.data)
     
     elif request.method == 'POST':
@@ -1358,7 +1558,7 @@ def community_comments(request, post_id):
             parent=parent,
             comment=comment_text
         )
-        return Response(CommunityCommentSerializer(comment).data, status=status.HTTP_201_CREATED)
+        return Response(CommunityCommentSerializer(comment, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
 @api_view(['PUT', 'DELETE'])
@@ -1382,7 +1582,7 @@ def community_comment_detail(request, post_id, comment_id):
         comment_text = request.data.get('comment', comment.comment)
         comment.comment = comment_text
         comment.save()
-        return Response(CommunityCommentSerializer(comment).data)
+        return Response(CommunityCommentSerializer(comment, context={'request': request}).data)
     
     elif request.method == 'DELETE':
         if comment.user_id != request.user.id:
@@ -1412,7 +1612,7 @@ def community_comment_reply(request, comment_id):
     # Use the model method to create reply
     reply = parent_comment.reply(request.user, reply_text)
     return Response(
-        CommunityCommentSerializer(reply).data,
+        CommunityCommentSerializer(reply, context={'request': request}).data,
         status=status.HTTP_201_CREATED
     )
 
@@ -1436,7 +1636,7 @@ def community_like(request, post_id):
         )
         if not created:
             return Response({'detail': 'Already liked'}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(CommunityLikeSerializer(like).data, status=status.HTTP_201_CREATED)
+        return Response(CommunityLikeSerializer(like, context={'request': request}).data, status=status.HTTP_201_CREATED)
     
     elif request.method == 'DELETE':
         like = CommunityLike.objects.filter(post=post, user=request.user).first()
@@ -1453,9 +1653,8 @@ def community_post_likes(request, post_id):
     if not post:
         return Response({'detail': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    likes = post.likes.all().order_by('-created_at')
-    serializer = CommunityLikeSerializer(likes, many=True)
-    return Response(serializer.data)
+    likes = post.likes.all()
+    return paginate(request, likes, CommunityLikeSerializer)
 
 
 # User Photo Upload APIs ====================================================
@@ -1472,20 +1671,23 @@ def upload_profile_photo_freelancer(request, id):
     except Freelancer.DoesNotExist:
         return Response({'detail': 'Freelancer not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if not _is_owner_or_staff(request._request, freelancer):
+    if not _is_owner_or_staff(request, freelancer):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     
     photo = request.FILES.get('photo')
     if not photo:
         return Response({'detail': 'photo file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if not images.is_image(photo):
+        return Response({'detail': 'photo must be an image'}, status=status.HTTP_400_BAD_REQUEST)
     
     # Delete old photo if exists
     if freelancer.profile_picture:
         if default_storage.exists(freelancer.profile_picture.name):
             default_storage.delete(freelancer.profile_picture.name)
     
-    # Save new photo to user_photos/ directory
-    filename = f"freelancer_{id}_{photo.name}"
+    # Save new photo to user_photos/ directory; a new name per upload, so its thumbnails
+    # (rendered by a background job, see images.py) never collide with the previous photo's
+    filename = f"freelancer_{id}_{uuid.uuid4().hex[:8]}{os.path.splitext(photo.name)[1].lower()}"
     save_path = f"user_photos/{filename}"
     saved_name = default_storage.save(save_path, ContentFile(photo.read()))
     photo_url = default_storage.url(saved_name)
@@ -1498,7 +1700,7 @@ def upload_profile_photo_freelancer(request, id):
     return Response({
         'detail': 'Photo uploaded successfully',
         'photo_url': photo_url,
-        'freelancer': FreelancerSerializer(freelancer).data
+        'freelancer': FreelancerSerializer(freelancer, context={'request': request}).data
     }, status=status.HTTP_200_OK)
 
 
@@ -1514,20 +1716,23 @@ def upload_profile_photo_client(request, id):
     except Client.DoesNotExist:
         return Response({'detail': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if not _is_owner_or_staff(request._request, client):
+    if not _is_owner_or_staff(request, client):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     
     photo = request.FILES.get('photo')
     if not photo:
         return Response({'detail': 'photo file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if not images.is_image(photo):
+        return Response({'detail': 'photo must be an image'}, status=status.HTTP_400_BAD_REQUEST)
     
     # Delete old photo if exists
     if client.profile_picture:
         if default_storage.exists(client.profile_picture.name):
             default_storage.delete(client.profile_picture.name)
     
-    # Save new photo to user_photos/ directory
-    filename = f"client_{id}_{photo.name}"
+    # Save new photo to user_photos/ directory; a new name per upload, so its thumbnails
+    # (rendered by a background job, see images.py) never collide with the previous photo's
+    filename = f"client_{id}_{uuid.uuid4().hex[:8]}{os.path.splitext(photo.name)[1].lower()}"
     save_path = f"user_photos/{filename}"
     saved_name = default_storage.save(save_path, ContentFile(photo.read()))
     photo_url = default_storage.url(saved_name)
@@ -1540,7 +1745,7 @@ def upload_profile_photo_client(request, id):
     return Response({
         'detail': 'Photo uploaded successfully',
         'photo_url': photo_url,
-        'client': ClientSerializer(client).data
+        'client': ClientSerializer(client, context={'request': request}).data
     }, status=status.HTTP_200_OK)
 
 
@@ -1555,7 +1760,7 @@ def delete_profile_photo_freelancer(request, id):
     except Freelancer.DoesNotExist:
         return Response({'detail': 'Freelancer not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if not _is_owner_or_staff(request._request, freelancer):
+    if not _is_owner_or_staff(request, freelancer):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     
     if freelancer.profile_picture:
@@ -1578,7 +1783,7 @@ def delete_profile_photo_client(request, id):
     except Client.DoesNotExist:
         return Response({'detail': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if not _is_owner_or_staff(request._request, client):
+    if not _is_owner_or_staff(request, client):
         return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     
     if client.profile_picture:
@@ -1608,24 +1813,22 @@ def offers_list_create(request):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        try:
-            company = Company.objects.get(user=request.user)
-        except Company.DoesNotExist:
+        company = get_profile(request.user, 'company_profile')
+        if company is None:
             return Response(
                 {'detail': 'Company profile not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        serializer = JobInternshipOfferSerializer(data=request.data)
+        serializer = JobInternshipOfferSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save(company=company)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'GET':
-        offers = JobInternshipOffer.objects.all().order_by('-created_at')
-        serializer = JobInternshipOfferSerializer(offers, many=True)
-        return Response(serializer.data)
+        offers = JobInternshipOffer.objects.all()
+        return paginate(request, offers, JobInternshipOfferSerializer)
 
 
 @api_view(['PUT', 'DELETE', 'GET'])
@@ -1644,7 +1847,7 @@ def offers_detail(request, offer_id):
         )
     
     if request.method == 'GET':
-        serializer = JobInternshipOfferSerializer(offer)
+        serializer = JobInternshipOfferSerializer(offer, context={'request': request})
         return Response(serializer.data)
     
     # For PUT and DELETE, only company owner can modify
@@ -1655,7 +1858,7 @@ def offers_detail(request, offer_id):
         )
     
     if request.method == 'PUT':
-        serializer = JobInternshipOfferSerializer(offer, data=request.data, partial=True)
+        serializer = JobInternshipOfferSerializer(offer, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -1682,7 +1885,7 @@ def offers_by_company(request, company_id):
         )
     
     offers = JobInternshipOffer.objects.filter(company=company).order_by('-created_at')
-    serializer = JobInternshipOfferSerializer(offers, many=True)
+    serializer = JobInternshipOfferSerializer(offers, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -1699,7 +1902,7 @@ def reports_list_create(request):
     if request.method == 'POST':
         data = request.data.copy()
         
-        serializer = ReportSerializer(data=data)
+        serializer = ReportSerializer(data=data, context={'request': request})
         if serializer.is_valid():
             serializer.save(reporter=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -1707,8 +1910,8 @@ def reports_list_create(request):
     
     elif request.method == 'GET':
         # Get all reports by the authenticated user
-        reports = Report.objects.filter(reporter=request.user).order_by('-created_at')
-        serializer = ReportSerializer(reports, many=True)
+        reports = Report.objects.filter(reporter=request.user).select_related('reporter').order_by('-created_at')
+        serializer = ReportSerializer(reports, many=True, context={'request': request})
         return Response(serializer.data)
 
 
@@ -1755,20 +1958,81 @@ def create_notification(request):
         )
     
     data = request.data.copy()
-    serializer = NotificationSerializer(data=data)
+    serializer = NotificationSerializer(data=data, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_broadcast(request):
+    """POST /notifications/broadcasts - Admin only - notify every active user matching an audience
+    Body: {content, audience: {role?, wilaya?, skill?, project?}, id?}. The notifications are inserted
+    by the job workers (poll GET /notifications/broadcasts/<id>); re-posting an existing id is a no-op.
+    """
+    if request.user.role != 'admin':
+        return Response({'detail': 'Only admins can broadcast notifications'}, status=status.HTTP_403_FORBIDDEN)
+    serializer = BroadcastSerializer(data=request.data, context={'request': request})
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    broadcast_id = request.data.get('id')
+    try:
+        broadcast_id = uuid.UUID(str(broadcast_id)) if broadcast_id else None
+    except ValueError:
+        return Response({'detail': 'id must be a UUID'}, status=status.HTTP_400_BAD_REQUEST)
+    audience = serializer.validated_data.get('audience') or {}
+    if not isinstance(audience, dict):
+        return Response({'detail': 'audience must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        broadcast, created = broadcasts.create(
+            serializer.validated_data['content'], audience, request.user, broadcast_id=broadcast_id)
+    except broadcasts.AudienceError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(BroadcastSerializer(broadcast, context={'request': request}).data,
+                    status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def broadcast_detail(request, broadcast_id):
+    """GET /notifications/broadcasts/<id> - Admin only - broadcast status and progress"""
+    if request.user.role != 'admin':
+        return Response({'detail': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    broadcast = Broadcast.objects.filter(id=broadcast_id).first()
+    if broadcast is None:
+        return Response({'detail': 'Broadcast not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(BroadcastSerializer(broadcast, context={'request': request}).data)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def notifications_my(request):
-    """GET /notifications/my - Get all notifications for authenticated user"""
-    notifications = Notification.objects.filter(receiver=request.user).order_by('-created_at')
-    serializer = NotificationSerializer(notifications, many=True)
-    return Response(serializer.data)
+    """GET /notifications/my - Notifications for authenticated user, newest first (cursor paginated)"""
+    qs = Notification.objects.filter(receiver=request.user)
+    return paginate(request, qs, NotificationSerializer)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notifications_unread_count(request):
+    """GET /notifications/unread-count - unread notifications of the authenticated user (badge)"""
+    return Response({'unread': notifications.unread_count(request.user.id)})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def notifications_mark_read(request):
+    """POST /notifications/mark-read - mark all notifications read, or those up to {"up_to": <notification id>}"""
+    up_to = request.data.get('up_to')
+    if up_to is not None:
+        try:
+            up_to = int(up_to)
+        except (TypeError, ValueError):
+            return Response({'detail': 'up_to must be a notification id'}, status=status.HTTP_400_BAD_REQUEST)
+    marked = notifications.mark_read(request.user.id, up_to=up_to)
+    return Response({'marked': marked, 'unread': notifications.unread_count(request.user.id)})
 
 
 @api_view(['PUT', 'DELETE'])
@@ -1793,10 +2057,12 @@ def notification_detail(request, notification_id):
         )
     
     if request.method == 'PUT':
-        # Mark as read
+        # Mark as read: a conditional UPDATE, so concurrent calls take the counter down once
+        with transaction.atomic():
+            if Notification.objects.filter(pk=notification.pk, seen=False).update(seen=True):
+                notifications.bump([notification.receiver_id], -1)
         notification.seen = True
-        notification.save()
-        return Response(NotificationSerializer(notification).data)
+        return Response(NotificationSerializer(notification, context={'request': request}).data)
     
     elif request.method == 'DELETE':
         notification.delete()
@@ -1806,3 +2072,106 @@ def notification_detail(request, notification_id):
         )
 
 
+# ---------- Search endpoints ----------
+SEARCH_MAX_PAGE_SIZE = 50
+SEARCH_MAX_PAGE = 20
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_view(request):
+    """GET /search?q= - ranked full-text search with prefix matching and <mark> highlighting
+       ?type=request,offer,post,freelancer narrows the kinds; paged with ?page=&page_size=
+       Request hits are limited to the caller's own requests (staff see all)
+    """
+    query = request.query_params.get('q', '').strip()
+    if not search.query_terms(query):
+        return Response({'detail': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+    unknown = set(kinds) - set(search.SOURCES)
+    if unknown:
+        return Response({'detail': f'Unknown type: {", ".join(sorted(unknown))}'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        page = max(1, int(request.query_params.get('page', 1)))
+        page_size = max(1, min(int(request.query_params.get('page_size', 20)), SEARCH_MAX_PAGE_SIZE))
+    except ValueError:
+        return Response({'detail': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if page > SEARCH_MAX_PAGE:
+        return Response({'detail': 'Refine the query to see more results'}, status=status.HTTP_400_BAD_REQUEST)
+
+    only = None
+    if not request.user.is_staff:
+        client = get_profile(request.user, 'client_profile')
+        only = {'request': Request.objects.filter(client=client) if client else Request.objects.none()}
+
+    # one extra row tells whether a next page exists without counting every match
+    hits = search.search(query, kinds, limit=page_size + 1, offset=(page - 1) * page_size, only=only)
+    url = request.build_absolute_uri()
+    has_next = len(hits) > page_size and page < SEARCH_MAX_PAGE
+    return Response({
+        'next': replace_query_param(url, 'page', page + 1) if has_next else None,
+        'previous': replace_query_param(url, 'page', page - 1) if page > 1 else None,
+        'results': [hit._asdict() for hit in hits[:page_size]],
+    })
+
+
+# ---------- Event stream endpoints ----------
+# Plain async Django views rather than DRF: an open stream must not hold a
+# worker thread, which it would under the (sync) DRF request cycle. Serve with
+# an ASGI server (uvicorn core.asgi:application).
+def _event_cursor(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+
+async def _event_user(request):
+    try:
+        return await aauthenticate(request), None
+    except AuthenticationFailed as exc:
+        return None, JsonResponse({'detail': str(exc.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+@require_GET
+async def events_stream(request):
+    """GET /events/stream - text/event-stream of the authenticated user's events
+       (notification, negotiation_comment, phase_status); resumes after the Last-Event-ID header or ?since=
+    """
+    user, error = await _event_user(request)
+    if error is not None:
+        return error
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                            status=status.HTTP_401_UNAUTHORIZED)
+    last_event_id = _event_cursor(request.headers.get('Last-Event-ID') or request.GET.get('since'))
+    response = StreamingHttpResponse(events.stream(user.id, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: flush every frame
+    return response
+
+
+@require_GET
+async def events_poll(request):
+    """GET /events/poll?since=<cursor>&timeout= - events after the cursor, waiting up to timeout seconds for one
+       Without since, returns no events and the current cursor to start from.
+    """
+    user, error = await _event_user(request)
+    if error is not None:
+        return error
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                            status=status.HTTP_401_UNAUTHORIZED)
+    since = _event_cursor(request.GET.get('since'))
+    if since is None:
+        return JsonResponse({'events': [], 'cursor': events.hub.head()})
+    max_timeout = events.get_config('LONG_POLL_TIMEOUT')
+    try:
+        timeout = max(0.0, min(float(request.GET.get('timeout', max_timeout)), max_timeout))
+    except ValueError:
+        return JsonResponse({'detail': 'timeout must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    found = await events.wait_for_events(user.id, since, timeout)
+    return JsonResponse({
+        'events': [events.as_dict(event) for event in found],
+        'cursor': found[-1].id if found else since,
+    }, encoder=JSONEncoder)